@@ -0,0 +1,116 @@
+"""Non-blocking HTTP helpers behind the async scraping APIs."""
+
+import requests
+from ask2api import (
+    Config,
+    build_anthropic_headers,
+    build_anthropic_payload,
+    build_openai_headers,
+    build_openai_payload,
+    parse_anthropic_response,
+    parse_openai_response,
+)
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+def require_httpx():
+    """Return the httpx module.
+
+    Raises:
+        RuntimeError: If httpx is not installed.
+    """
+    if httpx is None:
+        raise RuntimeError(
+            "The async APIs require the 'httpx' package: pip install websense[async]"
+        )
+    return httpx
+
+
+def async_client(
+    max_connections: int = 100, timeout: float = 60.0
+) -> "httpx.AsyncClient":
+    """Create an AsyncClient shared by concurrent fetches and LLM calls.
+
+    Args:
+        max_connections: Max open connections across all hosts.
+        timeout: Default request timeout in seconds; fetches pass their own.
+
+    Returns:
+        A new AsyncClient; close it with `await client.aclose()`.
+    """
+    module = require_httpx()
+    return module.AsyncClient(
+        timeout=timeout,
+        limits=module.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
+
+
+def to_response(response: "httpx.Response") -> requests.Response:
+    """Convert an httpx response to a requests.Response.
+
+    The rest of the pipeline (cleaner, recorders, metrics) works on
+    `requests.Response`, so async fetches hand it the same type.
+
+    Args:
+        response: A response whose body has been read.
+
+    Returns:
+        An equivalent requests.Response, redirect history included.
+    """
+    converted = requests.Response()
+    converted.status_code = response.status_code
+    converted.reason = response.reason_phrase
+    converted.headers = CaseInsensitiveDict(response.headers)
+    converted._content = response.content
+    converted.url = str(response.url)
+    converted.history = [to_response(hop) for hop in response.history]
+    return converted
+
+
+async def agenerate_api_response(
+    user_content: str | list[dict],
+    schema: dict,
+    config: Config,
+    client: "httpx.AsyncClient",
+) -> dict:
+    """Async counterpart of `ask2api.generate_api_response`.
+
+    Builds the same provider payload and parses the answer the same way, but
+    sends the request through an AsyncClient so the event loop is not blocked.
+
+    Args:
+        user_content: Prompt text (or content parts).
+        schema: JSON schema of the answer.
+        config: ask2api Config selecting the provider, model and endpoint.
+        client: AsyncClient used for the request.
+
+    Returns:
+        The parsed structured answer.
+
+    Raises:
+        httpx.HTTPStatusError: If the API returns an error status.
+        ValueError: If the Anthropic API reports an error in its body.
+    """
+    if config.provider == "anthropic":
+        headers = build_anthropic_headers(config)
+        payload = build_anthropic_payload(user_content, schema, config)
+    else:
+        headers = build_openai_headers(config)
+        payload = build_openai_payload(user_content, schema, config)
+    response = await client.post(config.url, headers=headers, json=payload)
+    response.raise_for_status()
+    response_json = response.json()
+
+    if config.provider == "anthropic":
+        if "error" in response_json:
+            raise ValueError(f"Anthropic API error: {response_json['error']}")
+        return parse_anthropic_response(response_json)
+    return parse_openai_response(response_json)
@@ -0,0 +1,252 @@
+"""Micro-batching of small extraction requests into shared LLM calls."""
+
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .parser import DEFAULT_PROMPT, Parser
+from .schema import EMPTY, CompiledSchema, compile_schema
+
+
+def batch_schema(schema: dict) -> dict:
+    """Wrap a schema into an array of {index, data} results.
+
+    Args:
+        schema: Schema of a single extraction.
+
+    Returns:
+        Schema of a batched extraction answer.
+    """
+    return {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"index": {"type": "integer"}, "data": schema},
+                    "required": ["index", "data"],
+                    "additionalProperties": False,
+                },
+            }
+        },
+        "required": ["results"],
+        "additionalProperties": False,
+    }
+
+
+def _results(answer: dict, compiled: CompiledSchema) -> dict[int, dict]:
+    """Map page indices to the batched answer's well-formed data.
+
+    Indices given more than once are dropped. Required fields that are
+    empty are accepted, since a single call would return them just the same.
+    """
+    if not isinstance(answer, dict):
+        return {}
+    items = [
+        r
+        for r in answer.get("results") or []
+        if isinstance(r, dict) and isinstance(r.get("index"), int)
+    ]
+    counts = Counter(r["index"] for r in items)
+    return {
+        r["index"]: r["data"]
+        for r in items
+        if counts[r["index"]] == 1 and _well_formed(r.get("data"), compiled)
+    }
+
+
+def _well_formed(data, compiled: CompiledSchema) -> bool:
+    """Return True if data matches the schema's types and shape."""
+    return all(message == EMPTY for _, message in compiled.validate(data))
+
+
+class _Batch:
+    """Requests waiting for the same schema."""
+
+    def __init__(self, compiled: CompiledSchema) -> None:
+        self.compiled = compiled
+        self.items: list[tuple[str, Future]] = []
+        self.chars = 0
+        self.timer: threading.Timer | None = None
+
+
+class ExtractionBatcher:
+    """Packs small pages with the same schema into one LLM request.
+
+    Each `submit` returns a Future. Pending pages are grouped by schema and
+    sent together once a group reaches `max_batch` pages or `max_chars`
+    characters, or `max_wait` seconds after its first page arrived. The
+    model answers with an array of {index, data} results, which are mapped
+    back to the callers' futures. Pages the batched answer misses or lists
+    twice, or whose data has the wrong types or shape, are retried with a
+    regular `Parser.extract` call, as is every page when the answer itself
+    cannot be parsed. Any other error of the batched call, such as a connection,
+    auth or rate-limit error, is raised to every future of the batch rather
+    than retried page by page.
+
+    LLM calls run on a thread pool, never on the submitting thread. Pages
+    longer than `max_chars` are extracted on their own right away.
+    """
+
+    def __init__(
+        self,
+        parser: Parser,
+        max_batch: int = 8,
+        max_chars: int = 12000,
+        max_wait: float = 0.05,
+        prompt: str | None = None,
+        max_workers: int = 4,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            parser: Parser used for batched and fallback calls.
+            max_batch: Max pages per LLM call.
+            max_chars: Max characters of content per LLM call.
+            max_wait: Seconds a page may wait for others before its batch
+                is sent.
+            prompt: Optional custom extraction prompt.
+            max_workers: Max LLM calls running at once.
+        """
+        self.parser = parser
+        self.max_batch = max_batch
+        self.max_chars = max_chars
+        self.max_wait = max_wait
+        self.prompt = prompt
+        self.batches = 0
+        self.fallbacks = 0
+        self._pending: dict[str, _Batch] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self) -> "ExtractionBatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Send pending batches and wait for every running LLM call."""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def submit(self, content: str, schema: dict = None, example: dict = None) -> Future:
+        """Queue a page for extraction.
+
+        Args:
+            content: The text content to extract data from.
+            schema: Optional JSON schema for the output.
+            example: Optional JSON example to infer schema from.
+
+        Returns:
+            A Future resolving to the extracted data.
+
+        Raises:
+            ValueError: If neither schema nor example is provided.
+        """
+        compiled = compile_schema(schema, example)
+
+        future = Future()
+        if len(content) >= self.max_chars:
+            self._executor.submit(self._run_single, content, compiled, future)
+            return future
+
+        key = compiled.key
+        ready = []
+        with self._lock:
+            batch = self._pending.get(key)
+            if batch and batch.chars + len(content) > self.max_chars:
+                ready.append(self._take(key))
+                batch = None
+            if batch is None:
+                batch = self._pending[key] = _Batch(compiled)
+            batch.items.append((content, future))
+            batch.chars += len(content)
+            if len(batch.items) >= self.max_batch:
+                ready.append(self._take(key))
+            elif batch.timer is None:
+                batch.timer = threading.Timer(self.max_wait, self._flush_key, (key,))
+                batch.timer.daemon = True
+                batch.timer.start()
+        for taken in ready:
+            self._executor.submit(self._run, taken)
+        return future
+
+    def extract(self, content: str, schema: dict = None, example: dict = None) -> dict:
+        """Extract a page through the batcher and wait for its result."""
+        return self.submit(content, schema, example).result()
+
+    def flush(self) -> None:
+        """Send every pending batch now, without waiting for the answers."""
+        with self._lock:
+            batches = [self._take(key) for key in list(self._pending)]
+        for batch in batches:
+            self._executor.submit(self._run, batch)
+
+    def _take(self, key: str) -> _Batch:
+        """Remove a pending batch and stop its timer (caller holds the lock)."""
+        batch = self._pending.pop(key)
+        if batch.timer:
+            batch.timer.cancel()
+        return batch
+
+    def _flush_key(self, key: str) -> None:
+        """Timer callback: send a batch that waited max_wait seconds."""
+        with self._lock:
+            batch = self._take(key) if key in self._pending else None
+        if batch:
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch: _Batch) -> None:
+        """Send a batch and resolve its futures."""
+        if len(batch.items) == 1:
+            content, future = batch.items[0]
+            self._run_single(content, batch.compiled, future)
+            return
+
+        pages = "\n\n".join(
+            f"### Page {i}\n{content}" for i, (content, _) in enumerate(batch.items)
+        )
+        prompt = (
+            f"{self.prompt or DEFAULT_PROMPT}\n"
+            f"The content holds {len(batch.items)} separate pages, each under a "
+            "'### Page <index>' header. Extract the data of each page on its "
+            "own and return one result per page with its index."
+        )
+        with self._lock:
+            self.batches += 1
+        try:
+            answer = self.parser.extract(
+                pages,
+                schema=batch.compiled.derive("batch", batch_schema),
+                prompt=prompt,
+                truncate=False,
+            )
+            results = _results(answer, batch.compiled)
+        except (ValueError, KeyError, TypeError):
+            # An unparseable answer: every page is retried on its own
+            results = {}
+        except Exception as e:
+            for _, future in batch.items:
+                future.set_exception(e)
+            return
+
+        for i, (content, future) in enumerate(batch.items):
+            if i in results:
+                future.set_result(results[i])
+            else:
+                with self._lock:
+                    self.fallbacks += 1
+                self._run_single(content, batch.compiled, future)
+
+    def _run_single(
+        self, content: str, compiled: CompiledSchema, future: Future
+    ) -> None:
+        """Extract one page with a regular call and resolve its future."""
+        try:
+            future.set_result(
+                self.parser.extract(content, schema=compiled, prompt=self.prompt)
+            )
+        except Exception as e:
+            future.set_exception(e)
@@ -0,0 +1,500 @@
+"""Offline, reproducible benchmarks for the scrape pipeline.
+
+Pages are served from a local stub HTTP server and LLM calls go to a
+deterministic stub, so runs need no network access or API key.
+"""
+
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from ask2api import Config
+
+from .fetcher import Fetcher
+from .index import LocalIndex
+from .instrumentation import Instrumentation, MemorySink
+from .scraper import Scraper
+from .searcher import Searcher
+
+
+WORKLOADS = ("content", "scrape", "search-scrape")
+
+_VM_HWM = re.compile(r"^VmHWM:\s+(\d+) kB", re.M)
+
+BENCH_EXAMPLE = {
+    "title": "Example product",
+    "summary": "Short description",
+    "price": 9.99,
+    "in_stock": True,
+    "tags": ["tag"],
+}
+
+_WORDS = (
+    "adapter battery cable camera charger compact design display durable energy "
+    "fabric filter frame guide kettle keyboard lamp laptop lens light market "
+    "material memory monitor motor network office outdoor panel portable power "
+    "premium printer processor quality review router sensor service speaker "
+    "stainless steel storage studio system tablet travel update value warranty "
+    "wireless wooden"
+).split()
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    """Return a capitalized sentence of random vocabulary words."""
+    words = " ".join(rng.choice(_WORDS) for _ in range(length))
+    return words.capitalize() + "."
+
+
+def synthetic_page(index: int, seed: int = 0) -> str:
+    """Generate a deterministic product-like HTML page.
+
+    Args:
+        index: Page number; different numbers give different pages.
+        seed: Corpus seed.
+
+    Returns:
+        HTML with navigation, article text, a spec table, links and a footer.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    title = f"{rng.choice(_WORDS).capitalize()} {rng.choice(_WORDS)} {index}"
+    nav = "".join(f'<li><a href="/c/{w}">{w}</a></li>' for w in rng.sample(_WORDS, 8))
+    paragraphs = "".join(
+        f"<p>{' '.join(_sentence(rng, rng.randint(8, 20)) for _ in range(4))}</p>"
+        for _ in range(rng.randint(10, 30))
+    )
+    rows = "".join(
+        f"<tr><td>{rng.choice(_WORDS)}</td><td>{rng.randint(1, 999)}</td></tr>"
+        for _ in range(rng.randint(3, 12))
+    )
+    links = "".join(
+        f'<li><a href="/p/{rng.randint(0, 999)}?utm_source=bench">'
+        f"{_sentence(rng, 3)}</a></li>"
+        for _ in range(10)
+    )
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{title}</title>"
+        "<style>body { font-family: sans-serif; }</style>"
+        "<script>window.analytics = [];</script></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<main><article><h1>{title}</h1>{paragraphs}"
+        f"<h2>Specifications</h2><table><tr><th>Spec</th><th>Value</th></tr>"
+        f"{rows}</table><h2>Related</h2><ul>{links}</ul></article></main>"
+        "<footer><p>Copyright Example Store. All rights reserved.</p></footer>"
+        "</body></html>"
+    )
+
+
+def synthetic_corpus(pages: int = 50, seed: int = 0) -> dict[str, bytes]:
+    """Generate a deterministic corpus of HTML pages.
+
+    Args:
+        pages: Number of pages.
+        seed: Corpus seed.
+
+    Returns:
+        Mapping of page name to UTF-8 encoded HTML.
+    """
+    return {
+        f"page-{i:04d}.html": synthetic_page(i, seed).encode("utf-8")
+        for i in range(pages)
+    }
+
+
+def load_corpus(directory: str | Path) -> dict[str, bytes]:
+    """Load recorded HTML pages from a directory.
+
+    Args:
+        directory: Directory containing `*.html` files.
+
+    Returns:
+        Mapping of file name to raw page bytes, sorted by name.
+
+    Raises:
+        ValueError: If the directory contains no HTML files.
+    """
+    files = sorted(Path(directory).glob("*.html"))
+    if not files:
+        raise ValueError(f"No .html files found in {directory}")
+    return {f.name: f.read_bytes() for f in files}
+
+
+def record_corpus(
+    urls: list[str], directory: str | Path, fetcher: Fetcher | None = None
+) -> list[Path]:
+    """Fetch pages and store their raw HTML as a benchmark corpus.
+
+    Args:
+        urls: Pages to record.
+        directory: Target directory, created if missing.
+        fetcher: Optional Fetcher; defaults to Fetcher().
+
+    Returns:
+        Paths of the recorded files.
+    """
+    fetcher = fetcher or Fetcher()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for url in urls:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        path = directory / f"{digest}.html"
+        path.write_bytes(fetcher.fetch(url).content)
+        paths.append(path)
+    return paths
+
+
+class CorpusServer:
+    """Serves a corpus over HTTP on localhost from a background thread."""
+
+    def __init__(self, pages: dict[str, bytes], host: str = "127.0.0.1") -> None:
+        """Initialize the server.
+
+        Args:
+            pages: Mapping of page name to raw HTML bytes.
+            host: Interface to bind; the port is picked automatically.
+        """
+        self.pages = pages
+        self.host = host
+        self._server: ThreadingHTTPServer | None = None
+
+    def url(self, name: str) -> str:
+        """Return the URL a page is served at."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/{name}"
+
+    @property
+    def urls(self) -> list[str]:
+        """URLs of all pages, in corpus order."""
+        return [self.url(name) for name in self.pages]
+
+    def __enter__(self) -> "CorpusServer":
+        pages = self.pages
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = pages.get(unquote(urlsplit(self.path).path.lstrip("/")))
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _fake_value(schema: dict, seed: str):
+    """Build a deterministic value matching a JSON schema."""
+    kind = schema.get("type", "string")
+    digest = int(hashlib.blake2b(seed.encode("utf-8"), digest_size=4).hexdigest(), 16)
+    if kind == "object":
+        return {
+            name: _fake_value(sub, f"{seed}.{name}")
+            for name, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [_fake_value(schema.get("items", {}), f"{seed}[0]")]
+    if kind == "integer":
+        return digest % 1000
+    if kind == "number":
+        return digest % 100000 / 100
+    if kind == "boolean":
+        return bool(digest & 1)
+    return f"value-{digest:08x}"
+
+
+class StubLLM:
+    """Deterministic stand-in for `generate_api_response`.
+
+    Returns schema-shaped data derived from a hash of the prompt after an
+    optional fixed delay, so repeated runs produce identical results.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Initialize the stub.
+
+        Args:
+            latency: Seconds to sleep per call, simulating model latency.
+        """
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str, schema: dict, config: Config) -> dict:
+        """Return fake structured output for the prompt."""
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return _fake_value(schema, seed)
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak RSS of this process to its current RSS.
+
+    Only Linux allows this (through `/proc/self/clear_refs`); elsewhere the
+    peak keeps covering the whole life of the process.
+
+    Returns:
+        True if the peak was reset.
+    """
+    try:
+        Path("/proc/self/clear_refs").write_text("5", encoding="ascii")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MiB.
+
+    On Linux this is VmHWM, which `reset_peak_rss` resets; elsewhere it is
+    `ru_maxrss`, the peak since the process started.
+    """
+    try:
+        status = Path("/proc/self/status").read_text(encoding="ascii")
+    except OSError:
+        status = ""
+    match = _VM_HWM.search(status)
+    if match:
+        return int(match.group(1)) / 1024
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not available on Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class BenchResult:
+    """Outcome of one workload run.
+
+    Attributes:
+        workload: Workload name, one of WORKLOADS.
+        items: Number of pages or queries processed.
+        errors: Number of items that raised.
+        wall: Total elapsed time in seconds.
+        throughput: Items per second.
+        peak_rss_mb: Peak RSS during the run, in MiB; on platforms where
+            the peak cannot be reset, the peak since the process started.
+        stages: Per-stage summary from MemorySink.
+    """
+
+    workload: str
+    items: int = 0
+    errors: int = 0
+    wall: float = 0.0
+    throughput: float = 0.0
+    peak_rss_mb: float = 0.0
+    stages: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        """Return the result as a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+def _bench_scraper(llm_latency: float, sink: MemorySink) -> Scraper:
+    """Create a Scraper wired to the stub LLM and a local-only fetcher."""
+    scraper = Scraper(
+        config=Config(api_key="bench", model="stub"),
+        instrumentation=Instrumentation(sink),
+    )
+    scraper.parser.generate = StubLLM(llm_latency)
+    scraper.fetcher = Fetcher(retries=0)
+    # Ignore proxy settings from the environment; the corpus is on localhost
+    scraper.fetcher.session.trust_env = False
+    return scraper
+
+
+def _content_workload(
+    scraper: Scraper, server: CorpusServer, max_results: int
+) -> tuple[list, Callable]:
+    """Fetch and clean every page."""
+    return server.urls, scraper.get_content
+
+
+def _scrape_workload(
+    scraper: Scraper, server: CorpusServer, max_results: int
+) -> tuple[list, Callable]:
+    """Fetch, clean and extract every page."""
+    return server.urls, partial(scraper.scrape, example=BENCH_EXAMPLE)
+
+
+def _search_scrape_workload(
+    scraper: Scraper, server: CorpusServer, max_results: int
+) -> tuple[list, Callable]:
+    """Search a local index of the corpus by page title, then scrape."""
+    index = LocalIndex().build(
+        (server.url(name), html.decode("utf-8", "replace"))
+        for name, html in server.pages.items()
+    )
+    scraper.searcher = Searcher(backend=index, min_interval=0)
+    queries = [doc["title"] for doc in index.docs if doc and doc["title"]]
+    run = partial(
+        scraper.search_and_scrape, example=BENCH_EXAMPLE, max_results=max_results
+    )
+    return queries, run
+
+
+_WORKLOADS = {
+    "content": _content_workload,
+    "scrape": _scrape_workload,
+    "search-scrape": _search_scrape_workload,
+}
+
+
+def _run_items(result: BenchResult, run: Callable, items: list, repeat: int) -> None:
+    """Run every item `repeat` times, counting items and errors on `result`."""
+    for _ in range(repeat):
+        for item in items:
+            result.items += 1
+            try:
+                run(item)
+            except Exception:
+                result.errors += 1
+
+
+def run_workload(
+    workload: str,
+    server: CorpusServer,
+    llm_latency: float = 0.0,
+    repeat: int = 1,
+    max_results: int = 3,
+) -> BenchResult:
+    """Run one workload against a running corpus server.
+
+    Args:
+        workload: One of WORKLOADS.
+        server: Running CorpusServer.
+        llm_latency: Stub LLM delay per call in seconds.
+        repeat: Number of passes over the corpus.
+        max_results: Sources per query for the search-scrape workload.
+
+    Returns:
+        The workload's BenchResult.
+
+    Raises:
+        ValueError: If the workload is unknown.
+    """
+    if workload not in _WORKLOADS:
+        raise ValueError(f"Unknown workload: {workload}")
+
+    sink = MemorySink()
+    scraper = _bench_scraper(llm_latency, sink)
+    items, run = _WORKLOADS[workload](scraper, server, max_results)
+    result = BenchResult(workload)
+    reset_peak_rss()
+    start = time.perf_counter()
+    _run_items(result, run, items, repeat)
+    result.wall = time.perf_counter() - start
+    result.peak_rss_mb = peak_rss_mb()
+    result.throughput = result.items / result.wall if result.wall else 0.0
+    result.stages = sink.summary()
+    return result
+
+
+def run_bench(
+    workloads: tuple[str, ...] = WORKLOADS,
+    corpus: dict[str, bytes] | None = None,
+    llm_latency: float = 0.0,
+    repeat: int = 1,
+) -> dict:
+    """Run several workloads over one corpus.
+
+    Args:
+        workloads: Workload names to run, in order.
+        corpus: Mapping of page name to HTML bytes. Defaults to
+            `synthetic_corpus()`.
+        llm_latency: Stub LLM delay per call in seconds.
+        repeat: Number of passes over the corpus per workload.
+
+    Returns:
+        A report with run settings and a result per workload.
+    """
+    corpus = corpus if corpus is not None else synthetic_corpus()
+    with CorpusServer(corpus) as server:
+        results = {
+            name: run_workload(name, server, llm_latency, repeat).to_dict()
+            for name in workloads
+        }
+    return {
+        "pages": len(corpus),
+        "llm_latency": llm_latency,
+        "repeat": repeat,
+        "python": sys.version.split()[0],
+        "workloads": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.2) -> list[str]:
+    """List regressions of a report against a baseline report.
+
+    A workload regresses when its throughput drops, or a stage's p95
+    latency grows, by more than `tolerance` relative to the baseline.
+
+    Args:
+        report: Report from `run_bench`.
+        baseline: Earlier report to compare against.
+        tolerance: Allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        Human-readable regression descriptions; empty if none.
+    """
+    regressions = []
+    for name, current in report["workloads"].items():
+        base = baseline.get("workloads", {}).get(name)
+        if base:
+            regressions.extend(_regressions(name, current, base, tolerance))
+    return regressions
+
+
+def _regressions(name: str, current: dict, base: dict, tolerance: float) -> list[str]:
+    """List one workload's throughput and stage p95 regressions."""
+    regressions = []
+    if current["throughput"] < base["throughput"] * (1 - tolerance):
+        regressions.append(
+            f"{name}: throughput {current['throughput']:.2f}/s "
+            f"vs baseline {base['throughput']:.2f}/s"
+        )
+    for stage, stats in current["stages"].items():
+        base_stats = base["stages"].get(stage)
+        if base_stats and stats["p95"] > base_stats["p95"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {stage} p95 {stats['p95'] * 1000:.1f}ms "
+                f"vs baseline {base_stats['p95'] * 1000:.1f}ms"
+            )
+    return regressions
+
+
+def load_report(path: str | Path) -> dict:
+    """Read a report written by `save_report`."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def save_report(report: dict, path: str | Path) -> None:
+    """Write a report as JSON, e.g. to use as a baseline."""
+    Path(path).write_text(json.dumps(report, indent=2), encoding="utf-8")
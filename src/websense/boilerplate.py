@@ -0,0 +1,198 @@
+"""Per-site boilerplate detection learned from the pages of each domain."""
+
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup, Tag
+
+
+BLOCK_TAGS = (
+    "div",
+    "section",
+    "article",
+    "aside",
+    "header",
+    "footer",
+    "nav",
+    "form",
+    "ul",
+    "ol",
+    "dl",
+    "table",
+    "p",
+)
+
+_SPACE = re.compile(r"\s+")
+
+
+def domain_of(url: str) -> str:
+    """Return the host of a URL without a leading "www."."""
+    host = (urlsplit(url).hostname or "").lower()
+    return host.removeprefix("www.")
+
+
+def _block_hash(tag: Tag, min_chars: int) -> str | None:
+    """Hash a block by its tag name and normalized text, or None if too short."""
+    text = _SPACE.sub(" ", tag.get_text(" ")).strip().lower()
+    if len(text) < min_chars:
+        return None
+    key = f"{tag.name}:{text}".encode("utf-8")
+    return hashlib.blake2b(key, digest_size=8).hexdigest()
+
+
+class BoilerplateModel:
+    """Learns which DOM blocks repeat across the pages of a domain.
+
+    Every block element of a page is hashed by its tag and normalized text,
+    and the number of pages each hash was seen on is counted per domain.
+    Each URL is counted once, so re-cleaning a page, or rendering it in
+    several formats, leaves the counts unchanged. Once a domain has
+    `min_pages` pages, blocks seen on at least `threshold` of them (menus,
+    headers and footers built from plain `div`s) are removed, so only
+    page-specific content reaches the LLM. Block counts are kept in a small
+    JSON file.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        threshold: float = 0.6,
+        min_pages: int = 3,
+        max_blocks: int = 20000,
+        min_chars: int = 20,
+    ) -> None:
+        """Initialize the model, loading it from disk if the file exists.
+
+        Args:
+            path: Optional JSON file the model is persisted to.
+            threshold: Fraction of a domain's pages a block must appear on to
+                be treated as boilerplate.
+            min_pages: Pages a domain needs before blocks are removed.
+            max_blocks: Block hashes kept per domain; the rarest are evicted.
+                Also caps the page URLs remembered per domain, oldest first.
+            min_chars: Shorter blocks are never treated as boilerplate, so
+                repeated field labels such as "Price" survive.
+
+        Raises:
+            ValueError: If threshold is not in (0, 1].
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.path = Path(path) if path else None
+        self.threshold = threshold
+        self.min_pages = min_pages
+        self.max_blocks = max_blocks
+        self.min_chars = min_chars
+        self.domains: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if self.path and self.path.is_file():
+            self._load()
+
+    def __enter__(self) -> "BoilerplateModel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.path:
+            self.save()
+
+    def _blocks(self, soup: BeautifulSoup) -> dict[str, list[Tag]]:
+        """Map each block hash of a tree to the tags that have it."""
+        blocks: dict[str, list[Tag]] = {}
+        for tag in soup.find_all(BLOCK_TAGS):
+            digest = _block_hash(tag, self.min_chars)
+            if digest:
+                blocks.setdefault(digest, []).append(tag)
+        return blocks
+
+    def learn(self, url: str, soup: BeautifulSoup) -> bool:
+        """Count the blocks of one page of a domain, unless already counted.
+
+        Args:
+            url: Page URL, used for its domain and to skip repeat visits.
+            soup: Parsed page.
+
+        Returns:
+            True if the page was new and its blocks were counted.
+        """
+        return self._update(url, self._blocks(soup))
+
+    def _update(self, url: str, blocks: dict) -> bool:
+        """Add a page's block hashes to its domain's counts on first sight."""
+        page = hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest()
+        with self._lock:
+            model = self.domains.setdefault(domain_of(url), {"pages": 0, "blocks": {}})
+            seen = model.setdefault("seen", {})
+            if page in seen:
+                return False
+            seen[page] = None
+            model["pages"] += 1
+            counts = model["blocks"]
+            for digest in blocks:
+                counts[digest] = counts.get(digest, 0) + 1
+            self._evict(model)
+            return True
+
+    def _evict(self, model: dict) -> None:
+        """Trim a domain's rarest block hashes and oldest page URLs."""
+        counts, seen = model["blocks"], model["seen"]
+        if len(counts) > self.max_blocks:
+            ranked = sorted(counts.items(), key=lambda c: c[1], reverse=True)
+            model["blocks"] = dict(ranked[: self.max_blocks])
+        while len(seen) > self.max_blocks:
+            del seen[next(iter(seen))]
+
+    def is_boilerplate(self, domain: str, digest: str) -> bool:
+        """Return True if a block hash is boilerplate for a domain."""
+        model = self.domains.get(domain)
+        if not model or model["pages"] < self.min_pages:
+            return False
+        return model["blocks"].get(digest, 0) / model["pages"] >= self.threshold
+
+    def strip(self, url: str, soup: BeautifulSoup) -> int:
+        """Learn from a page on first sight, then remove its boilerplate in place.
+
+        Args:
+            url: Page URL, used for its domain.
+            soup: Parsed page, modified in place.
+
+        Returns:
+            Number of blocks removed.
+        """
+        domain = domain_of(url)
+        blocks = self._blocks(soup)
+        self._update(url, blocks)
+        removed = 0
+        for digest, tags in blocks.items():
+            if not self.is_boilerplate(domain, digest):
+                continue
+            for tag in tags:
+                # Blocks nested in an already removed block are gone too
+                if not tag.decomposed:
+                    tag.decompose()
+                    removed += 1
+        return removed
+
+    def save(self, path: str | Path | None = None) -> None:
+        """Write the model to disk.
+
+        Args:
+            path: Target file; defaults to the path given at construction.
+
+        Raises:
+            ValueError: If no path is available.
+        """
+        path = Path(path) if path else self.path
+        if not path:
+            raise ValueError("No path given to save the boilerplate model to.")
+        with self._lock:
+            data = json.dumps({"domains": self.domains})
+        path.write_text(data, encoding="utf-8")
+
+    def _load(self) -> None:
+        """Read the model from its JSON file."""
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        self.domains = data["domains"]
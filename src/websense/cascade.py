@@ -0,0 +1,168 @@
+"""Model cascades: cheap model first, stronger models for failing output."""
+
+import dataclasses
+import threading
+from typing import Generator, Sequence
+
+from ask2api import Config
+
+from .metrics import MetricsRegistry
+from .schema import CompiledSchema, compile_schema, invalid_fields
+
+
+ESCALATE_MODES = ("page", "fields")
+
+# A cascade plan yields (config, schema) requests and is sent back each
+# answer, or the exception the call raised; it returns the final result.
+Plan = Generator[tuple[Config, dict], "dict | Exception", dict]
+
+
+class ModelCascade:
+    """Tries models from cheapest to strongest until the output validates.
+
+    Each answer is validated against the extraction schema (types, enums,
+    required fields present and non-empty). If it fails, the next model is
+    asked again: for the whole page (`escalate="page"`), or only for the
+    failing top-level fields (`escalate="fields"`), whose present and valid
+    answers are merged into the earlier result. An answer that cannot be
+    parsed counts as a failure of the whole page. The last model's answer is
+    returned even if it still fails validation.
+
+    Escalation counts are kept in `stats` and, with a registry, exported as
+    `websense_llm_escalations_total`.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[str | Config],
+        escalate: str = "fields",
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        """Initialize the cascade.
+
+        Args:
+            models: Model names (resolved against the parser's config) or
+                full Configs, from cheapest to strongest.
+            escalate: "fields" to re-ask only failing fields, or "page" to
+                re-run the whole extraction.
+            metrics: Optional registry for escalation counts.
+
+        Raises:
+            ValueError: If fewer than two models are given or the mode is
+                unknown.
+        """
+        if len(models) < 2:
+            raise ValueError("A cascade needs at least two models.")
+        if escalate not in ESCALATE_MODES:
+            raise ValueError(f"Unknown escalation mode: {escalate}")
+        self.models = list(models)
+        self.escalate = escalate
+        self.metrics = metrics
+        self.stats = {"pages": 0, "escalations": 0, "escalated_pages": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def escalation_rate(self) -> float:
+        """Fraction of pages that needed more than the first model."""
+        pages = self.stats["pages"]
+        return self.stats["escalated_pages"] / pages if pages else 0.0
+
+    def configs(self, base: Config) -> list[Config]:
+        """Resolve the cascade's models against a base config."""
+        return [
+            m if isinstance(m, Config) else dataclasses.replace(base, model=m)
+            for m in self.models
+        ]
+
+    def plan(self, schema: "dict | CompiledSchema", base: Config) -> Plan:
+        """Drive one extraction through the cascade.
+
+        Args:
+            schema: JSON schema of the extraction, or its compiled form.
+            base: Config that model names are resolved against.
+
+        Yields:
+            (config, schema) for each LLM call to make.
+
+        Returns:
+            The final extraction result.
+        """
+        compiled = compile_schema(schema)
+        configs = self.configs(base)
+        result, fields, level = None, None, 0
+        for level, config in enumerate(configs):
+            if level:
+                self._record(config.model, "fields" if fields else "page")
+            last = level == len(configs) - 1
+            answer = yield from self._ask(config, compiled, result, fields, last)
+            if answer is None:
+                continue
+            result = answer
+            issues = compiled.validate(result)
+            if not issues:
+                break
+            fields = self._fields(result, issues, compiled.schema)
+        # Every level past the first was an escalation
+        self._finish(level)
+        return result
+
+    def _ask(
+        self,
+        config: Config,
+        compiled: CompiledSchema,
+        result: dict | None,
+        fields: list | None,
+        last: bool,
+    ) -> Plan:
+        """Ask a model for the failing fields, or the whole page if None."""
+        if fields:
+            return (yield from self._ask_fields(config, compiled, result, fields))
+        return (yield from self._ask_page(config, compiled, last))
+
+    def _ask_page(self, config: Config, compiled: CompiledSchema, last: bool) -> Plan:
+        """Ask a model for the whole page.
+
+        Returns:
+            The answer, or None if it failed and a stronger model is left.
+        """
+        answer = yield config, compiled.schema
+        if not isinstance(answer, Exception):
+            return answer
+        if last:
+            raise answer
+        return None
+
+    def _ask_fields(
+        self, config: Config, compiled: CompiledSchema, result: dict, fields: list
+    ) -> Plan:
+        """Re-ask a model for failing fields and merge the valid answers.
+
+        Returns:
+            The result with each field the answer holds a present, valid
+            value for replaced; unchanged if the call failed.
+        """
+        answer = yield config, compiled.subschema(fields)
+        if not isinstance(answer, dict):
+            return result
+        valid = compiled.valid_fields(answer, fields)
+        return {**result, **{f: answer[f] for f in valid}}
+
+    def _fields(self, result, issues: list, schema: dict) -> list[str] | None:
+        """Fields to re-ask, or None to re-run the whole page."""
+        if self.escalate != "fields" or not isinstance(result, dict):
+            return None
+        return invalid_fields(issues, schema) or None
+
+    def _record(self, model: str, mode: str) -> None:
+        if self.metrics:
+            self.metrics.counter(
+                "websense_llm_escalations_total",
+                "Cascade escalations by target model and mode.",
+                ("model", "mode"),
+            ).inc(model=model, mode=mode)
+
+    def _finish(self, escalations: int) -> None:
+        with self._lock:
+            self.stats["pages"] += 1
+            self.stats["escalations"] += escalations
+            self.stats["escalated_pages"] += bool(escalations)
@@ -1,10 +1,165 @@
 """HTML cleaning and normalization for WebSense."""
 
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from urllib.parse import urljoin
+
 from bs4 import BeautifulSoup
 
-from markdownify import markdownify as md
+from markdownify import MarkdownConverter
 from typing import Iterable
 
+from .boilerplate import BoilerplateModel
+from .compact import LINK_MODES, compact_markdown
+from .encoding import decode_html
+from .metrics import MetricsRegistry
+
+
+FORMATS = ("text", "markdown", "compact")
+VIEWS = (*FORMATS, "links", "title", "metadata")
+
+# Cleaner used inside pool worker processes, created once per worker
+_worker: "Cleaner | None" = None
+
+
+def _init_worker(noise: set[str], compact_links: str) -> None:
+    """Create the Cleaner of a pool worker process."""
+    global _worker
+    _worker = Cleaner(noise, compact_links=compact_links)
+
+
+def _convert_in_worker(fmt: str, html: str | bytes, encoding: str | None) -> str:
+    """Clean one page in a pool worker process."""
+    return _worker._convert(fmt, html, encoding)
+
+
+def _soup_to_text(soup: BeautifulSoup) -> str:
+    """Extract the text of a tree with blank lines and padding removed."""
+    lines = (line.strip() for line in soup.get_text(separator="\n").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _soup_links(soup: BeautifulSoup, base_url: str | None) -> list[str]:
+    """Collect unique link targets in document order, resolved against base_url."""
+    links = {}
+    for anchor in soup.find_all("a", href=True):
+        href = anchor["href"].strip()
+        if not href or href.startswith(("#", "javascript:", "mailto:", "tel:")):
+            continue
+        links.setdefault(urljoin(base_url, href) if base_url else href, None)
+    return list(links)
+
+
+def _soup_metadata(soup: BeautifulSoup) -> dict[str, str]:
+    """Collect <meta name|property content> pairs; the first occurrence wins."""
+    metadata = {}
+    for meta in soup.find_all("meta", content=True):
+        key = meta.get("name") or meta.get("property")
+        if key:
+            metadata.setdefault(key.lower(), meta["content"].strip())
+    return metadata
+
+
+def _soup_title(soup: BeautifulSoup) -> str | None:
+    """Return the text of the `<title>` element, or None if missing or empty."""
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    return title or None
+
+
+class CleanedPage:
+    """Views of one cleaned page, computed lazily from a single parse.
+
+    Each view (`text`, `markdown`, `links`, `title`, `metadata`) is derived
+    from the same cleaned tree on first access and memoized. Once every
+    requested view has been computed the tree is released.
+    """
+
+    def __init__(
+        self,
+        soup: BeautifulSoup,
+        cleaner: "Cleaner",
+        outputs: Iterable[str],
+        base_url: str | None = None,
+        size: int = 0,
+    ) -> None:
+        """Wrap a cleaned tree.
+
+        Args:
+            soup: Tree returned by `Cleaner.preprocess`.
+            cleaner: Cleaner whose converter and metrics are used.
+            outputs: Names of the views that may be read.
+            base_url: URL that relative links are resolved against.
+            size: Input size in characters, for metrics.
+        """
+        self.outputs = frozenset(outputs)
+        self.base_url = base_url
+        self._soup = soup
+        self._cleaner = cleaner
+        self._size = size
+        self._views: dict[str, object] = {}
+
+    # View name -> function of (page, cleaned tree) computing that view
+    _RENDERERS = {
+        "text": lambda page, soup: _soup_to_text(soup),
+        "markdown": lambda page, soup: page._cleaner._markdown.convert_soup(soup),
+        "compact": lambda page, soup: compact_markdown(
+            soup, page._cleaner.compact_links
+        ),
+        "links": lambda page, soup: _soup_links(soup, page.base_url),
+        "title": lambda page, soup: _soup_title(soup),
+        "metadata": lambda page, soup: _soup_metadata(soup),
+    }
+
+    def _view(self, name: str):
+        """Return a memoized view, computing it from the tree on first use."""
+        if name in self._views:
+            return self._views[name]
+        if name not in self.outputs:
+            raise ValueError(f"View {name!r} was not requested from process()")
+
+        start = time.perf_counter()
+        value = self._RENDERERS[name](self, self._soup)
+        if name in FORMATS:
+            self._cleaner._record(name, start, self._size, value)
+
+        self._views[name] = value
+        if self.outputs.issubset(self._views):
+            self._soup = None
+        return value
+
+    @property
+    def text(self) -> str:
+        """Plain text with whitespace normalized, as `Cleaner.to_text`."""
+        return self._view("text")
+
+    @property
+    def markdown(self) -> str:
+        """Markdown, as `Cleaner.to_markdown`."""
+        return self._view("markdown")
+
+    @property
+    def compact(self) -> str:
+        """Compact LLM markdown, as `Cleaner.to_compact_markdown`."""
+        return self._view("compact")
+
+    @property
+    def links(self) -> list[str]:
+        """Unique link URLs outside removed noise, in document order."""
+        return self._view("links")
+
+    @property
+    def title(self) -> str | None:
+        """Text of the `<title>` element, or None."""
+        return self._view("title")
+
+    @property
+    def metadata(self) -> dict[str, str]:
+        """Lowercased `<meta>` names or properties mapped to their content."""
+        return self._view("metadata")
+
 
 class Cleaner:
     """Handles the extraction of 'meaningful' text from HTML."""
@@ -21,53 +176,265 @@ class Cleaner:
         "svg",
     }
 
-    def __init__(self, noisy_elements: Iterable[str] | None = None) -> None:
+    def __init__(
+        self,
+        noisy_elements: Iterable[str] | None = None,
+        metrics: MetricsRegistry | None = None,
+        processes: int | None = None,
+        compact_links: str = "reference",
+        boilerplate: BoilerplateModel | None = None,
+    ) -> None:
         """Initialize the Cleaner with optional custom noisy elements.
 
         Args:
             noisy_elements: HTML tags to remove. Defaults to NOISE class attribute.
+            metrics: Optional registry for cleaning latency and size metrics.
+            processes: Number of worker processes to clean in. Parsing holds
+                the GIL, so threads calling a pooled Cleaner get real
+                parallelism. None cleans in the calling thread.
+            compact_links: How compact markdown keeps links: "reference"
+                or "drop".
+            boilerplate: Optional per-domain boilerplate model. Pages
+                cleaned with a `url` update it and lose the blocks it has
+                learned to repeat across that domain.
+
+        Raises:
+            ValueError: If the compact link mode is unknown, or a boilerplate
+                model is combined with worker processes.
         """
+        if compact_links not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {compact_links}")
+        if boilerplate and processes:
+            raise ValueError("Boilerplate learning requires in-process cleaning.")
         self.noise = set(noisy_elements or []) or self.NOISE
+        self.metrics = metrics
+        self.processes = processes
+        self.compact_links = compact_links
+        self.boilerplate = boilerplate
+        self._markdown = MarkdownConverter(heading_style="ATX")
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def __enter__(self) -> "Cleaner":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Start the persistent worker processes on first use."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.noise, self.compact_links),
+                )
+            return self._pool
+
+    def close(self) -> None:
+        """Shut down the worker processes, if any were started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _record(self, fmt: str, start: float, size: int, output: str) -> None:
+        """Record cleaning latency and character counts.
+
+        Args:
+            fmt: Output format, one of FORMATS.
+            start: perf_counter() value taken before cleaning.
+            size: Length of the input HTML.
+            output: Cleaned output.
+        """
+        if not self.metrics:
+            return
+        self.metrics.histogram(
+            "websense_clean_duration_seconds",
+            "HTML cleaning latency by output format.",
+            ("format",),
+        ).observe(time.perf_counter() - start, format=fmt)
+        chars = self.metrics.counter(
+            "websense_clean_chars_total",
+            "Characters into and out of the cleaner.",
+            ("format", "direction"),
+        )
+        chars.inc(size, format=fmt, direction="in")
+        chars.inc(len(output), format=fmt, direction="out")
 
-    def preprocess(self, html: str) -> BeautifulSoup:
+    def preprocess(
+        self, html: str | bytes, encoding: str | None = None, url: str | None = None
+    ) -> BeautifulSoup:
         """Parse HTML and remove noisy elements.
 
         Args:
-            html: Raw HTML content.
+            html: Raw HTML content, as text or undecoded bytes.
+            encoding: Encoding of byte input; sniffed from the bytes if omitted.
+            url: Page URL; with a boilerplate model, the page is learned from
+                and its domain's boilerplate blocks are removed.
 
         Returns:
             BeautifulSoup object with noisy elements removed.
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(decode_html(html, encoding), "html.parser")
 
         for tag in soup(self.noise):
             tag.decompose()
 
+        if self.boilerplate and url:
+            self.boilerplate.strip(url, soup)
+
         return soup
 
-    def to_text(self, html: str) -> str:
+    def _convert(
+        self,
+        fmt: str,
+        html: str | bytes,
+        encoding: str | None,
+        url: str | None = None,
+    ) -> str:
+        """Clean a page in the current process."""
+        soup = self.preprocess(html, encoding, url)
+        if fmt == "markdown":
+            return self._markdown.convert_soup(soup)
+        if fmt == "compact":
+            return compact_markdown(soup, self.compact_links)
+        return _soup_to_text(soup)
+
+    def _clean(
+        self, fmt: str, html: str | bytes, encoding: str | None, url: str | None
+    ) -> str:
+        """Clean a page in-process or in the pool, recording metrics."""
+        start = time.perf_counter()
+        if self.processes:
+            future = self._get_pool().submit(_convert_in_worker, fmt, html, encoding)
+            output = future.result()
+        else:
+            output = self._convert(fmt, html, encoding, url)
+        self._record(fmt, start, len(html), output)
+        return output
+
+    def to_text(
+        self, html: str | bytes, encoding: str | None = None, url: str | None = None
+    ) -> str:
         """Strips non-content tags and normalizes whitespace.
 
         Args:
-            html: Raw HTML content.
+            html: Raw HTML content, as text or undecoded bytes.
+            encoding: Encoding of byte input; sniffed from the bytes if omitted.
+            url: Optional page URL, used for boilerplate removal.
 
         Returns:
             Normalized plain text content.
         """
-        soup = self.preprocess(html)
-        # Get text and clean up whitespace
-        lines = (line.strip() for line in soup.get_text(separator="\n").splitlines())
-        return "\n".join(line for line in lines if line)
+        return self._clean("text", html, encoding, url)
 
-    def to_markdown(self, html: str) -> str:
+    def to_markdown(
+        self, html: str | bytes, encoding: str | None = None, url: str | None = None
+    ) -> str:
         """Converts HTML to Markdown format for better LLM comprehension.
 
+        The cleaned tree is converted directly, without serializing it back
+        to HTML and parsing it a second time.
+
         Args:
-            html: Raw HTML content.
+            html: Raw HTML content, as text or undecoded bytes.
+            encoding: Encoding of byte input; sniffed from the bytes if omitted.
+            url: Optional page URL, used for boilerplate removal.
 
         Returns:
             Markdown formatted content.
         """
+        return self._clean("markdown", html, encoding, url)
+
+    def to_compact_markdown(
+        self, html: str | bytes, encoding: str | None = None, url: str | None = None
+    ) -> str:
+        """Converts HTML to a token-minimizing markdown dialect for LLM input.
 
-        soup = self.preprocess(html)
-        return md(str(soup), heading_style="ATX")
+        Images, emphasis, tracking parameters and padding are dropped, and
+        link URLs are moved to a de-duplicated reference table at the end
+        (or dropped, see `compact_links`).
+
+        Args:
+            html: Raw HTML content, as text or undecoded bytes.
+            encoding: Encoding of byte input; sniffed from the bytes if omitted.
+            url: Optional page URL, used for boilerplate removal.
+
+        Returns:
+            Compact markdown content.
+        """
+        return self._clean("compact", html, encoding, url)
+
+    def process(
+        self,
+        html: str | bytes,
+        outputs: Iterable[str] | None = None,
+        encoding: str | None = None,
+        base_url: str | None = None,
+    ) -> CleanedPage:
+        """Parse a page once and expose several views of it.
+
+        Use this instead of separate `to_text`/`to_markdown` calls when more
+        than one view of a page is needed; each call of those parses the
+        page again. Views are computed lazily in the calling process, even
+        when the Cleaner has worker processes, since the tree cannot be
+        shared with them.
+
+        Args:
+            html: Raw HTML content, as text or undecoded bytes.
+            outputs: Views that will be read, from VIEWS. Defaults to all.
+            encoding: Encoding of byte input; sniffed from the bytes if omitted.
+            base_url: Page URL; relative links are resolved against it and
+                it is used for boilerplate removal.
+
+        Returns:
+            A CleanedPage with the requested views.
+
+        Raises:
+            ValueError: If an output name is unknown.
+        """
+        outputs = set(VIEWS if outputs is None else outputs)
+        unknown = outputs.difference(VIEWS)
+        if unknown:
+            raise ValueError(f"Unknown outputs: {', '.join(sorted(unknown))}")
+        soup = self.preprocess(html, encoding, base_url)
+        return CleanedPage(soup, self, outputs, base_url=base_url, size=len(html))
+
+    def map(
+        self,
+        pages: Iterable[str | bytes],
+        fmt: str = "markdown",
+        encodings: Iterable[str | None] | None = None,
+        chunksize: int = 8,
+    ) -> list[str]:
+        """Clean a batch of pages, in the worker processes if configured.
+
+        Pages are sent to the workers in chunks to amortize inter-process
+        overhead; raw bytes are cheaper to send than decoded text. Batches
+        are not recorded in the per-page metrics.
+
+        Args:
+            pages: Raw HTML pages.
+            fmt: Output format, "text", "markdown" or "compact".
+            encodings: Optional encoding per page.
+            chunksize: Pages per task sent to a worker.
+
+        Returns:
+            Cleaned pages in input order.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+        encodings = repeat(None) if encodings is None else encodings
+        if not self.processes:
+            return [self._convert(fmt, h, e) for h, e in zip(pages, encodings)]
+        return list(
+            self._get_pool().map(
+                _convert_in_worker, repeat(fmt), pages, encodings, chunksize=chunksize
+            )
+        )
@@ -7,8 +7,12 @@ from pathlib import Path
 import rich_click as click
 from ask2api import Config
 
+from . import bench as benchmarks
 from .cleaner import Cleaner
+from .compact import reduction
 from .fetcher import Fetcher
+from .instrumentation import ChromeTraceSink, Instrumentation
+from .profiling import StageProfiler
 from .scraper import Scraper
 from .searcher import Searcher
 
@@ -80,7 +84,15 @@ def parse_json_input(value: str) -> dict:
     )
 
 
-def _init_scraper(model, timeout, retries, user_agent) -> Scraper:
+def _init_scraper(
+    model,
+    timeout,
+    retries,
+    user_agent,
+    instrumentation=None,
+    compact=False,
+    cascade=None,
+) -> Scraper:
     """Initialize Scraper with custom settings.
 
     Args:
@@ -88,6 +100,9 @@ def _init_scraper(model, timeout, retries, user_agent) -> Scraper:
         timeout: Request timeout in seconds.
         retries: Number of retries.
         user_agent: User-Agent header string.
+        instrumentation: Optional Instrumentation for stage spans.
+        compact: Whether to send compact LLM markdown to the parser.
+        cascade: Optional comma-separated models, cheapest first.
 
     Returns:
         Configured Scraper instance.
@@ -96,12 +111,35 @@ def _init_scraper(model, timeout, retries, user_agent) -> Scraper:
     if model:
         config.model = model
 
-    scraper = Scraper(model=model, config=config)
+    scraper = Scraper(
+        model=model,
+        config=config,
+        instrumentation=instrumentation,
+        compact=compact,
+        cascade=[m.strip() for m in cascade.split(",")] if cascade else None,
+    )
     # Override fetcher with custom CLI settings
     scraper.fetcher = Fetcher(user_agent=user_agent, timeout=timeout, retries=retries)
     return scraper
 
 
+def _log_cascade(scraper: Scraper, kwargs: dict) -> None:
+    """Print how often the model cascade escalated, in verbose mode.
+
+    Args:
+        scraper: The scraper that ran the extraction.
+        kwargs: CLI command keyword arguments.
+    """
+    if not (kwargs["verbose"] and kwargs["cascade"]):
+        return
+    cascade = scraper.parser.cascade
+    stats = cascade.stats
+    print_info(
+        f"Cascade: {stats['escalated_pages']}/{stats['pages']} pages escalated "
+        f"({cascade.escalation_rate:.0%}), {stats['escalations']} escalations"
+    )
+
+
 def _handle_output(
     content: str, output: str | None, verbose: bool, header: str, success_msg: str
 ) -> None:
@@ -117,6 +155,85 @@ def _handle_output(
         click.echo(content)
 
 
+def _init_trace(path: str | None) -> ChromeTraceSink | None:
+    """Create a trace sink when --trace is given."""
+    return ChromeTraceSink() if path else None
+
+
+def _write_trace(trace: ChromeTraceSink | None, path: str, verbose: bool) -> None:
+    """Write collected trace events to disk.
+
+    Args:
+        trace: Trace sink, or None when tracing is disabled.
+        path: Output file path.
+        verbose: Whether to report the saved file.
+    """
+    if not trace:
+        return
+    trace.write(path)
+    if verbose:
+        print_success(f"Trace saved to: {path}")
+
+
+def _profile_options(command):
+    """Add the --profile, --profile-top and --profile-output options to a command."""
+    options = (
+        click.option(
+            "--profile",
+            is_flag=True,
+            help="Profile CPU time and allocations per pipeline stage",
+        ),
+        click.option(
+            "--profile-top",
+            type=int,
+            default=15,
+            help="Functions and allocation sites shown per stage [default: 15]",
+        ),
+        click.option(
+            "--profile-output",
+            type=click.Path(),
+            help="Dump merged cProfile data (.prof) to this file; implies --profile",
+        ),
+    )
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def _init_profiler(kwargs: dict) -> StageProfiler | None:
+    """Create and start a stage profiler when --profile is given."""
+    if not (kwargs["profile"] or kwargs["profile_output"]):
+        return None
+    profiler = StageProfiler()
+    profiler.start_tracing()
+    return profiler
+
+
+def _init_instrumentation(*sinks) -> Instrumentation | None:
+    """Combine the enabled sinks, or return None if there are none."""
+    sinks = [sink for sink in sinks if sink]
+    return Instrumentation(*sinks) if sinks else None
+
+
+def _write_profile(profiler: StageProfiler | None, kwargs: dict, verbose: bool) -> None:
+    """Print the per-stage profile to stderr and dump it if requested.
+
+    Args:
+        profiler: Stage profiler, or None when profiling is disabled.
+        kwargs: CLI command keyword arguments.
+        verbose: Whether to report the saved file.
+    """
+    if not profiler:
+        return
+    profiler.stop_tracing()
+    click.echo(profiler.summary(kwargs["profile_top"]), err=True)
+    path = kwargs["profile_output"]
+    if path and profiler.stats:
+        profiler.dump(path)
+        if verbose:
+            print_success(f"Profile saved to: {path}")
+
+
 def _load_scrape_inputs(kwargs):
     """Load schema and example inputs from CLI arguments.
 
@@ -198,13 +315,39 @@ def main() -> None:
 @click.option(
     "--no-markdown", is_flag=True, help="Disable markdown conversion (use plain text)"
 )
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Use compact LLM markdown: no images, emphasis or inline link URLs",
+)
 @click.option(
     "--truncate-length",
     type=int,
     default=12000,
     help="Max content length for extraction [default: 12000]",
 )
+@click.option(
+    "--prune",
+    type=int,
+    help="Keep only the content most relevant to the schema, up to this many chars",
+)
+@click.option(
+    "--repair",
+    type=int,
+    default=0,
+    help="Re-ask missing or invalid fields up to this many times [default: 0]",
+)
+@click.option(
+    "--cascade",
+    help="Comma-separated models, cheapest first; escalate when output is invalid",
+)
 @click.option("--prompt", "-p", help="Custom extraction prompt")
+@click.option(
+    "--trace",
+    type=click.Path(),
+    help="Write a Chrome trace (Perfetto) of pipeline stages to this file",
+)
+@_profile_options
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
 def scrape(url: str, **kwargs) -> None:
     """Scrape URL and extract structured data."""
@@ -214,9 +357,16 @@ def scrape(url: str, **kwargs) -> None:
     if verbose:
         _log_scrape_params(url, schema, example, kwargs)
 
+    trace, profiler = _init_trace(kwargs["trace"]), _init_profiler(kwargs)
     try:
         scraper = _init_scraper(
-            kwargs["model"], kwargs["timeout"], kwargs["retries"], kwargs["user_agent"]
+            kwargs["model"],
+            kwargs["timeout"],
+            kwargs["retries"],
+            kwargs["user_agent"],
+            _init_instrumentation(trace, profiler),
+            compact=kwargs["compact"],
+            cascade=kwargs["cascade"],
         )
         if verbose:
             styled_echo("⟳ Fetching and extracting...", "yellow")
@@ -229,6 +379,8 @@ def scrape(url: str, **kwargs) -> None:
             extract_kwargs={
                 "truncate_length": kwargs["truncate_length"],
                 "prompt": kwargs["prompt"],
+                "prune": kwargs["prune"],
+                "repair": kwargs["repair"],
             },
         )
 
@@ -239,12 +391,16 @@ def scrape(url: str, **kwargs) -> None:
             "📦 Result",
             "Result saved to",
         )
+        _log_cascade(scraper, kwargs)
         if verbose:
             print_success("Extraction complete!")
 
     except Exception as e:
         print_error(str(e) if isinstance(e, RuntimeError) else f"Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        _write_trace(trace, kwargs["trace"], verbose)
+        _write_profile(profiler, kwargs, verbose)
 
 
 @main.command()
@@ -263,26 +419,35 @@ def scrape(url: str, **kwargs) -> None:
 @click.option(
     "--no-markdown", is_flag=True, help="Output plain text instead of markdown"
 )
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Output compact LLM markdown: no images, emphasis or inline link URLs",
+)
 @click.option(
     "--output",
     "-o",
     type=click.Path(),
     help="Output file path (stdout if not specified)",
 )
+@_profile_options
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
 def content(url: str, **kwargs) -> None:
     """Fetch and clean webpage content."""
     verbose = kwargs["verbose"]
     _log_content_params(url, kwargs) if verbose else None
 
+    profiler = _init_profiler(kwargs)
     try:
-        result = _fetch_content(url, kwargs)
+        result = _fetch_content(url, kwargs, _init_instrumentation(profiler))
         _handle_output(
             result, kwargs["output"], verbose, "📄 Content", "Content saved to"
         )
         print_success("Content extraction complete!") if verbose else None
     except Exception as e:
         _handle_error(e)
+    finally:
+        _write_profile(profiler, kwargs, verbose)
 
 
 def _log_content_params(url: str, kwargs: dict) -> None:
@@ -294,33 +459,53 @@ def _log_content_params(url: str, kwargs: dict) -> None:
     """
     print_header()
     print_info(f"Target URL: {url}")
-    print_info(f"Format: {'plain text' if kwargs['no_markdown'] else 'markdown'}")
+    print_info(f"Format: {_content_format(kwargs)}")
     styled_echo("")
     styled_echo("⟳ Fetching content...", "yellow")
 
 
-def _fetch_content(url: str, kwargs: dict) -> str:
+def _content_format(kwargs: dict) -> str:
+    """Describe the output format selected by the content options."""
+    if kwargs["no_markdown"]:
+        return "plain text"
+    return "compact markdown" if kwargs["compact"] else "markdown"
+
+
+def _fetch_content(
+    url: str, kwargs: dict, instrumentation: Instrumentation | None = None
+) -> str:
     """Fetch and clean content from a URL.
 
     Args:
         url: Target URL.
         kwargs: CLI command keyword arguments.
+        instrumentation: Optional Instrumentation for fetch and clean spans.
 
     Returns:
         Cleaned content as string.
     """
+    instrumentation = instrumentation or Instrumentation()
     fetcher = Fetcher(
         user_agent=kwargs["user_agent"],
         timeout=kwargs["timeout"],
         retries=kwargs["retries"],
     )
-    response = fetcher.fetch(url)
+    with instrumentation.span("fetch", url=url):
+        response = fetcher.fetch(url)
     cleaner = Cleaner()
-    return (
-        cleaner.to_text(response.text)
-        if kwargs["no_markdown"]
-        else cleaner.to_markdown(response.text)
-    )
+    with instrumentation.span("clean", url=url):
+        html, encoding = response.content, response.encoding
+        if kwargs["no_markdown"]:
+            return cleaner.to_text(html, encoding)
+        if not kwargs["compact"]:
+            return cleaner.to_markdown(html, encoding)
+        page = cleaner.process(html, {"markdown", "compact"}, encoding, response.url)
+    if kwargs["verbose"]:
+        print_info(
+            f"Compact markdown: {len(page.compact):,} chars, "
+            f"{reduction(page.markdown, page.compact):.0%} smaller than markdown"
+        )
+    return page.compact
 
 
 def _handle_error(e: Exception) -> None:
@@ -418,12 +603,32 @@ def search(query: str, **kwargs) -> None:
 @click.option(
     "--no-markdown", is_flag=True, help="Disable markdown conversion (use plain text)"
 )
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Use compact LLM markdown: no images, emphasis or inline link URLs",
+)
 @click.option(
     "--truncate-length",
     type=int,
     default=12000,
     help="Max content length for extraction [default: 12000]",
 )
+@click.option(
+    "--prune",
+    type=int,
+    help="Keep only the content most relevant to the schema, up to this many chars",
+)
+@click.option(
+    "--repair",
+    type=int,
+    default=0,
+    help="Re-ask missing or invalid fields up to this many times [default: 0]",
+)
+@click.option(
+    "--cascade",
+    help="Comma-separated models, cheapest first; escalate when output is invalid",
+)
 @click.option("--prompt", "-p", help="Custom extraction prompt")
 @click.option(
     "--top-k",
@@ -432,6 +637,12 @@ def search(query: str, **kwargs) -> None:
     default=1,
     help="Number of top results to scrape and consolidate [default: 1]",
 )
+@click.option(
+    "--trace",
+    type=click.Path(),
+    help="Write a Chrome trace (Perfetto) of pipeline stages to this file",
+)
+@_profile_options
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
 def search_scrape(query: str, **kwargs) -> None:
     """Search web, scrape top-k results, and extract consolidated structured data."""
@@ -442,9 +653,16 @@ def search_scrape(query: str, **kwargs) -> None:
         query, top_k, schema, example, kwargs
     ) if verbose else None
 
+    trace, profiler = _init_trace(kwargs["trace"]), _init_profiler(kwargs)
     try:
         scraper = _init_scraper(
-            kwargs["model"], kwargs["timeout"], kwargs["retries"], kwargs["user_agent"]
+            kwargs["model"],
+            kwargs["timeout"],
+            kwargs["retries"],
+            kwargs["user_agent"],
+            _init_instrumentation(trace, profiler),
+            compact=kwargs["compact"],
+            cascade=kwargs["cascade"],
         )
         _log_search_start(top_k) if verbose else None
 
@@ -456,6 +674,8 @@ def search_scrape(query: str, **kwargs) -> None:
             extract_kwargs={
                 "truncate_length": kwargs["truncate_length"],
                 "prompt": kwargs["prompt"],
+                "prune": kwargs["prune"],
+                "repair": kwargs["repair"],
             },
             max_results=top_k,
         )
@@ -468,9 +688,13 @@ def search_scrape(query: str, **kwargs) -> None:
             "📦 Consolidated Result",
             "Result saved to",
         )
+        _log_cascade(scraper, kwargs)
         print_success("Search and extraction complete!") if verbose else None
     except Exception as e:
         _handle_error(e)
+    finally:
+        _write_trace(trace, kwargs["trace"], verbose)
+        _write_profile(profiler, kwargs, verbose)
 
 
 def _log_search_scrape_params(
@@ -529,5 +753,107 @@ def _log_sources(sources: list[dict]) -> None:
     styled_echo("")
 
 
+@main.command()
+@click.option(
+    "--workload",
+    "-w",
+    "workloads",
+    multiple=True,
+    type=click.Choice(benchmarks.WORKLOADS),
+    help="Workload to run; repeat for several [default: all]",
+)
+@click.option(
+    "--corpus",
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory of recorded .html pages (synthetic pages if not specified)",
+)
+@click.option(
+    "--pages",
+    type=int,
+    default=50,
+    help="Number of synthetic pages [default: 50]",
+)
+@click.option("--seed", type=int, default=0, help="Synthetic corpus seed [default: 0]")
+@click.option(
+    "--llm-latency",
+    type=float,
+    default=0.0,
+    help="Stub LLM delay per call in seconds [default: 0]",
+)
+@click.option(
+    "--repeat", type=int, default=1, help="Passes over the corpus [default: 1]"
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Baseline report JSON to compare against",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.2,
+    help="Allowed relative slowdown against the baseline [default: 0.2]",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(),
+    help="Save the report JSON to this file (e.g. as a new baseline)",
+)
+def bench(**kwargs) -> None:
+    """Benchmark the pipeline offline with a local corpus and a stub LLM."""
+    try:
+        corpus = (
+            benchmarks.load_corpus(kwargs["corpus"])
+            if kwargs["corpus"]
+            else benchmarks.synthetic_corpus(kwargs["pages"], kwargs["seed"])
+        )
+        report = benchmarks.run_bench(
+            kwargs["workloads"] or benchmarks.WORKLOADS,
+            corpus,
+            llm_latency=kwargs["llm_latency"],
+            repeat=kwargs["repeat"],
+        )
+    except Exception as e:
+        _handle_error(e)
+
+    _log_bench_report(report)
+    if kwargs["output"]:
+        benchmarks.save_report(report, kwargs["output"])
+        print_success(f"Report saved to: {kwargs['output']}")
+
+    if kwargs["baseline"]:
+        baseline = benchmarks.load_report(kwargs["baseline"])
+        regressions = benchmarks.compare(report, baseline, kwargs["tolerance"])
+        if regressions:
+            for regression in regressions:
+                print_error(f"Regression: {regression}")
+            sys.exit(1)
+        print_success("No regressions against baseline")
+
+
+def _log_bench_report(report: dict) -> None:
+    """Print throughput, memory and stage latencies for each workload.
+
+    Args:
+        report: Report from `run_bench`.
+    """
+    print_info(f"Pages: {report['pages']} | LLM latency: {report['llm_latency']}s")
+    for name, result in report["workloads"].items():
+        styled_echo(f"\n{name}", "cyan", bold=True)
+        styled_echo(
+            f"  {result['items']} items, {result['errors']} errors in "
+            f"{result['wall']:.2f}s ({result['throughput']:.1f}/s), "
+            f"peak RSS {result['peak_rss_mb']:.1f} MiB",
+            "white",
+        )
+        for stage, stats in result["stages"].items():
+            styled_echo(
+                f"  {stage:<8} p50 {stats['p50'] * 1000:8.1f}ms  "
+                f"p95 {stats['p95'] * 1000:8.1f}ms  p99 {stats['p99'] * 1000:8.1f}ms",
+                "bright_black",
+            )
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,157 @@
+"""Token-minimizing markdown dialect for LLM input."""
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+from markdownify import MarkdownConverter, chomp
+
+
+LINK_MODES = ("reference", "drop")
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "yclid",
+    "mc_cid",
+    "mc_eid",
+    "_hsenc",
+    "_hsmi",
+    "igshid",
+    "ref_src",
+    "spm",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "vero_")
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_INNER_SPACES = re.compile(r"(?<=\S) {2,}(?=\S)")
+_SEPARATOR_ROW = re.compile(r"^\|(?: -+ \|)+$")
+_EMPTY_ROW = re.compile(r"^\|(?: *\|)+$")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+
+def strip_tracking(url: str) -> str:
+    """Remove analytics query parameters and empty fragments from a URL.
+
+    Args:
+        url: Absolute or relative URL.
+
+    Returns:
+        The URL without tracking parameters.
+    """
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def reduction(original: str, compact: str) -> float:
+    """Return the fraction by which `compact` is shorter than `original`."""
+    return 1 - len(compact) / len(original) if original else 0.0
+
+
+def _plain(self, el, text, parent_tags):
+    """Keep the text of an emphasis element without its markup."""
+    return text
+
+
+class CompactMarkdownConverter(MarkdownConverter):
+    """Markdown converter that spends as few tokens as possible on markup.
+
+    Images are dropped, emphasis is reduced to its text, link URLs are
+    de-duplicated into a reference table at the end of the document (or
+    dropped), tables get a header row and minimal separators, and runs of
+    blank lines and spaces are collapsed. A converter collects link
+    references while converting, so use one instance per thread.
+    """
+
+    convert_b = convert_strong = convert_em = convert_i = _plain
+    convert_del = convert_s = convert_sub = convert_sup = _plain
+
+    def __init__(self, links: str = "reference", **options) -> None:
+        """Create a converter.
+
+        Args:
+            links: "reference" to number unique URLs in a trailing table, or
+                "drop" to keep only the link text.
+            **options: Extra markdownify options.
+
+        Raises:
+            ValueError: If the link mode is unknown.
+        """
+        if links not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {links}")
+        options.setdefault("heading_style", "ATX")
+        options.setdefault("table_infer_header", True)
+        super().__init__(**options)
+        self.links = links
+        self._references: dict[str, int] = {}
+
+    def convert_soup(self, soup: BeautifulSoup) -> str:
+        """Convert a tree and append the link reference table."""
+        self._references = {}
+        markdown = _collapse(super().convert_soup(soup))
+        if not self._references:
+            return markdown
+        table = "\n".join(f"[{n}]: {url}" for url, n in self._references.items())
+        return f"{markdown}\n\n{table}"
+
+    def convert_a(self, el, text, parent_tags):
+        prefix, suffix, text = chomp(text)
+        if not text:
+            return ""
+        href = (el.get("href") or "").strip()
+        if (
+            self.links == "drop"
+            or "_noformat" in parent_tags
+            or not href
+            or href.startswith(("#", "javascript:"))
+        ):
+            return f"{prefix}{text}{suffix}"
+        url = strip_tracking(href)
+        number = self._references.setdefault(url, len(self._references) + 1)
+        return f"{prefix}[{text}][{number}]{suffix}"
+
+    def convert_img(self, el, text, parent_tags):
+        return ""
+
+    def convert_hr(self, el, text, parent_tags):
+        return "\n\n"
+
+
+def _collapse(markdown: str) -> str:
+    """Squeeze whitespace and table padding outside code fences."""
+    lines, in_fence = [], False
+    for line in markdown.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            line = line.rstrip()
+            if _SEPARATOR_ROW.match(line):
+                line = "|" + "---|" * line.count("---")
+            elif _EMPTY_ROW.match(line):
+                continue
+            else:
+                line = _INNER_SPACES.sub(" ", line)
+        lines.append(line)
+    return _BLANK_RUNS.sub("\n\n", "\n".join(lines)).strip("\n")
+
+
+def compact_markdown(soup: BeautifulSoup, links: str = "reference") -> str:
+    """Convert a cleaned tree to compact markdown.
+
+    Args:
+        soup: Tree returned by `Cleaner.preprocess`.
+        links: Link mode, see `CompactMarkdownConverter`.
+
+    Returns:
+        Compact markdown.
+    """
+    return CompactMarkdownConverter(links=links).convert_soup(soup)
@@ -0,0 +1,77 @@
+"""Near-duplicate detection for cleaned page content."""
+
+import hashlib
+import re
+
+
+_TOKEN = re.compile(r"\w+")
+
+
+def simhash(text: str, ngram: int = 3, bits: int = 64) -> int:
+    """Compute a SimHash fingerprint over word n-gram shingles.
+
+    Args:
+        text: Cleaned page content.
+        ngram: Number of words per shingle.
+        bits: Fingerprint width in bits (at most 64).
+
+    Returns:
+        Integer fingerprint; similar texts differ in few bits.
+    """
+    weights = [0] * bits
+    for value in map(_hash, _shingles(_TOKEN.findall(text.lower()), ngram)):
+        for i in range(bits):
+            weights[i] += 1 if value >> i & 1 else -1
+
+    return sum(1 << i for i, w in enumerate(weights) if w > 0)
+
+
+def _shingles(words: list[str], ngram: int) -> list[str]:
+    """Word n-grams of a text; short texts form a single shingle."""
+    if len(words) < ngram:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i : i + ngram]) for i in range(len(words) - ngram + 1)]
+
+
+def _hash(shingle: str) -> int:
+    """64-bit hash of a shingle."""
+    digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Count differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateFilter:
+    """Tracks fingerprints of seen documents and flags near-duplicates."""
+
+    def __init__(self, threshold: int = 3, ngram: int = 3) -> None:
+        """Initialize the filter.
+
+        Args:
+            threshold: Max Hamming distance for two documents to count as duplicates.
+            ngram: Number of words per shingle.
+        """
+        self.threshold = threshold
+        self.ngram = ngram
+        self.fingerprints: list[int] = []
+
+    def add(self, text: str) -> bool:
+        """Record a document unless it duplicates one already seen.
+
+        Args:
+            text: Cleaned page content.
+
+        Returns:
+            True if the document is new, False if it is a near-duplicate.
+        """
+        fingerprint = simhash(text, self.ngram)
+        if any(
+            hamming_distance(fingerprint, seen) <= self.threshold
+            for seen in self.fingerprints
+        ):
+            return False
+        self.fingerprints.append(fingerprint)
+        return True
@@ -0,0 +1,108 @@
+"""Fast character encoding detection for raw page bodies."""
+
+import codecs
+import re
+
+from charset_normalizer import from_bytes
+
+
+# Checked longest first: the UTF-32 LE BOM starts with the UTF-16 LE BOM
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_CONTENT_TYPE_CHARSET = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.I)
+_META_CHARSET = re.compile(rb"""<meta[^>]*?charset\s*=\s*["']?\s*([\w.:-]+)""", re.I)
+# The HTML standard decodes these labels as windows-1252
+_WINDOWS_1252 = {"ascii", "latin-1", "iso8859-1"}
+
+
+def _normalize(label: str | bytes | None) -> str | None:
+    """Return the Python codec name for an encoding label, or None if unknown."""
+    if not label:
+        return None
+    if isinstance(label, bytes):
+        label = label.decode("ascii", "ignore")
+    try:
+        name = codecs.lookup(label.strip()).name
+    except LookupError:
+        return None
+    return "cp1252" if name in _WINDOWS_1252 else name
+
+
+def _charset_from_content_type(content_type: str | None) -> str | None:
+    """Extract the charset parameter of a Content-Type header."""
+    match = _CONTENT_TYPE_CHARSET.search(content_type or "")
+    return _normalize(match.group(1)) if match else None
+
+
+def sniff_encoding(
+    body: bytes, content_type: str | None = None, prefix: int = 64 * 1024
+) -> str:
+    """Determine the character encoding of an HTML body.
+
+    Cheap signals are checked first: a byte order mark, the Content-Type
+    charset, then `<meta charset>` in the first kilobytes. Without any of
+    those, a prefix that decodes as UTF-8 is taken as UTF-8, and only then
+    does charset_normalizer run, on at most `prefix` bytes.
+
+    Args:
+        body: Raw response body.
+        content_type: Optional Content-Type header value.
+        prefix: Max bytes inspected by the UTF-8 check and statistical detection.
+
+    Returns:
+        A Python codec name.
+    """
+    return _declared_encoding(body, content_type) or _detect_encoding(body, prefix)
+
+
+def _declared_encoding(body: bytes, content_type: str | None) -> str | None:
+    """Return the encoding given by a BOM, the Content-Type or `<meta charset>`."""
+    for bom, name in _BOMS:
+        if body.startswith(bom):
+            return name
+
+    declared = _charset_from_content_type(content_type)
+    if declared:
+        return declared
+
+    match = _META_CHARSET.search(body, 0, 4096)
+    declared = _normalize(match.group(1)) if match else None
+    # A body readable as ASCII cannot really be UTF-16; the HTML standard
+    # treats such declarations as UTF-8
+    if declared and declared.startswith("utf-16"):
+        return "utf-8"
+    return declared
+
+
+def _detect_encoding(body: bytes, prefix: int) -> str:
+    """Guess an undeclared encoding from at most `prefix` bytes of the body."""
+    head = body[:prefix]
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=len(body) <= prefix)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    best = from_bytes(head).best()
+    return (best and _normalize(best.encoding)) or "utf-8"
+
+
+def decode_html(body: str | bytes, encoding: str | None = None) -> str:
+    """Decode a page body once, sniffing the encoding if none is given.
+
+    Args:
+        body: Raw body; text is returned unchanged.
+        encoding: Known or declared encoding.
+
+    Returns:
+        The decoded text; undecodable bytes are replaced.
+    """
+    if isinstance(body, str):
+        return body
+    encoding = _normalize(encoding) or sniff_encoding(body)
+    return body.decode(encoding, errors="replace")
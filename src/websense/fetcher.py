@@ -1,16 +1,45 @@
 """HTTP fetching capabilities for WebSense."""
 
+import asyncio
+import time
+from typing import TYPE_CHECKING, Iterable, Protocol
+from urllib.parse import urlsplit
+
 import requests
 
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .aio import async_client, require_httpx, to_response
+from .encoding import sniff_encoding
+from .metrics import SIZE_BUCKETS, MetricsRegistry
+
+if TYPE_CHECKING:
+    import httpx
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class Recorder(Protocol):
+    """Receives every successful response, e.g. to archive it."""
+
+    def record(self, response: requests.Response) -> None:
+        """Store a fetched response."""
+        ...
+
 
 class Fetcher:
     """Handles HTTP requests with retry logic and custom headers."""
 
     def __init__(
-        self, user_agent: str = "WebSense/1.0", timeout: int = 10, retries: int = 3
+        self,
+        user_agent: str = "WebSense/1.0",
+        timeout: int = 10,
+        retries: int = 3,
+        metrics: MetricsRegistry | None = None,
+        recorders: Iterable[Recorder] = (),
+        backoff_factor: float = 1,
     ):
         """Initialize the Fetcher with HTTP session configuration.
 
@@ -18,15 +47,24 @@ class Fetcher:
             user_agent: User-Agent header for requests.
             timeout: Request timeout in seconds.
             retries: Number of retry attempts for failed requests.
+            metrics: Optional registry for per-domain request metrics.
+            recorders: Objects whose `record(response)` is called for every
+                successful response, such as a WarcWriter.
+            backoff_factor: Base delay in seconds between retries, doubled
+                after each attempt.
         """
         self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.metrics = metrics
+        self.recorders = list(recorders)
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": user_agent})
 
         retry_strategy = Retry(
             total=retries,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            backoff_factor=backoff_factor,
+            status_forcelist=list(RETRY_STATUSES),
         )
         adapter = HTTPAdapter(max_retries=retry_strategy)
         self.session.mount("http://", adapter)
@@ -39,15 +77,130 @@ class Fetcher:
             url: The URL to fetch.
 
         Returns:
-            The requests.Response object.
+            The requests.Response object, with `encoding` set from the
+            Content-Type charset or sniffed from the body.
 
         Raises:
             RuntimeError: If the request fails or returns an error status.
         """
+        start = time.perf_counter()
         try:
             response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
-            return response
         except requests.RequestException as e:
+            status = getattr(e.response, "status_code", None) or "error"
+            self._record(url, status, start)
             # We might want to log this or re-raise with a custom exception
             raise RuntimeError(f"Failed to fetch {url}: {str(e)}") from e
+        return self._accept(url, response, start)
+
+    async def afetch(
+        self, url: str, client: "httpx.AsyncClient | None" = None
+    ) -> requests.Response:
+        """Fetches the content of a URL without blocking the event loop.
+
+        Retries 429 and 5xx responses and connection errors like `fetch`,
+        honouring a numeric Retry-After header, and follows redirects.
+
+        Args:
+            url: The URL to fetch.
+            client: Optional shared httpx AsyncClient; a temporary one is
+                created otherwise.
+
+        Returns:
+            A requests.Response, with `encoding` set as in `fetch`.
+
+        Raises:
+            RuntimeError: If the request fails, returns an error status, or
+                httpx is not installed.
+        """
+        httpx = require_httpx()
+        if client is None:
+            async with async_client() as own_client:
+                return await self.afetch(url, own_client)
+
+        start = time.perf_counter()
+        try:
+            response = await self._aget(client, url)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            self._record(url, status or "error", start)
+            raise RuntimeError(f"Failed to fetch {url}: {str(e)}") from e
+        return self._accept(url, to_response(response), start)
+
+    async def _aget(self, client: "httpx.AsyncClient", url: str) -> "httpx.Response":
+        """GET a URL, retrying retryable statuses and connection errors."""
+        httpx = require_httpx()
+        headers = {"User-Agent": self.session.headers["User-Agent"]}
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = await client.get(
+                    url, headers=headers, timeout=self.timeout, follow_redirects=True
+                )
+            except httpx.TransportError:
+                if last:
+                    raise
+                response = None
+            else:
+                if last or response.status_code not in RETRY_STATUSES:
+                    return response
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+    def _retry_delay(self, attempt: int, response: "httpx.Response | None") -> float:
+        """Seconds to wait before the next attempt."""
+        retry_after = (
+            response.headers.get("Retry-After", "") if response is not None else ""
+        )
+        if retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * 2**attempt
+
+    def _accept(
+        self, url: str, response: requests.Response, start: float
+    ) -> requests.Response:
+        """Set the encoding of a successful response, record and archive it."""
+        response.encoding = sniff_encoding(
+            response.content, response.headers.get("Content-Type")
+        )
+        self._record(url, response.status_code, start, response)
+        for recorder in self.recorders:
+            recorder.record(response)
+        return response
+
+    def _record(
+        self,
+        url: str,
+        status: int | str,
+        start: float,
+        response: requests.Response | None = None,
+    ) -> None:
+        """Record request count, latency and response size for the URL's domain.
+
+        Args:
+            url: The fetched URL.
+            status: HTTP status code, or "error" when no response was received.
+            start: perf_counter() value taken before the request.
+            response: The response, if one was received.
+        """
+        if not self.metrics:
+            return
+        domain = urlsplit(url).hostname or ""
+        self.metrics.counter(
+            "websense_fetch_requests_total",
+            "HTTP fetches by domain and status.",
+            ("domain", "status"),
+        ).inc(domain=domain, status=status)
+        self.metrics.histogram(
+            "websense_fetch_duration_seconds",
+            "HTTP fetch latency by domain.",
+            ("domain",),
+        ).observe(time.perf_counter() - start, domain=domain)
+        if response is not None:
+            self.metrics.histogram(
+                "websense_fetch_response_bytes",
+                "HTTP response body size by domain.",
+                ("domain",),
+                SIZE_BUCKETS,
+            ).observe(len(response.content), domain=domain)
@@ -0,0 +1,229 @@
+"""Offline full-text search over stored pages using a BM25 inverted index."""
+
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+from .cleaner import Cleaner
+from .warc import iter_pages
+
+if TYPE_CHECKING:
+    from .store import PageStore
+
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+class LocalIndex:
+    """Inverted index over locally stored pages, usable as a search backend."""
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        snippet_length: int = 200,
+    ) -> None:
+        """Initialize the index, loading it from disk if the file exists.
+
+        Args:
+            path: Optional JSON file the index is persisted to.
+            k1: BM25 term frequency saturation.
+            b: BM25 document length normalization.
+            snippet_length: Characters of page text kept as the description.
+        """
+        self.path = Path(path) if path else None
+        self.k1 = k1
+        self.b = b
+        self.snippet_length = snippet_length
+        self.docs: list[dict | None] = []
+        self.postings: dict[str, dict[int, int]] = {}
+        self._ids: dict[str, int] = {}
+        self._total_length = 0
+        if self.path and self.path.is_file():
+            self._load()
+
+    def __len__(self) -> int:
+        """Return the number of live documents."""
+        return len(self._ids)
+
+    @classmethod
+    def from_store(
+        cls, store: "PageStore", path: str | Path | None = None, **kwargs
+    ) -> "LocalIndex":
+        """Build an index over every page kept in a PageStore.
+
+        Args:
+            store: Store the fetcher recorded pages into.
+            path: Optional JSON file the index is persisted to.
+            **kwargs: Further `LocalIndex` arguments.
+
+        Returns:
+            The built index.
+        """
+        return cls(path, **kwargs).build(store.iter_pages())
+
+    @classmethod
+    def from_warc(
+        cls, archive: str | Path, path: str | Path | None = None, **kwargs
+    ) -> "LocalIndex":
+        """Build an index over the successful responses of a WARC archive.
+
+        Args:
+            archive: A `.warc` or `.warc.gz` file.
+            path: Optional JSON file the index is persisted to.
+            **kwargs: Further `LocalIndex` arguments.
+
+        Returns:
+            The built index.
+        """
+        return cls(path, **kwargs).build(iter_pages(archive))
+
+    def add(self, url: str, text: str, title: str = "") -> None:
+        """Index a page's text, replacing any earlier version of the URL.
+
+        Args:
+            url: Page URL, returned as the result url.
+            text: Cleaned page text.
+            title: Optional page title.
+        """
+        if url in self._ids:
+            old = self._ids.pop(url)
+            self._total_length -= self.docs[old]["length"]
+            self.docs[old] = None
+
+        terms = Counter(tokenize(f"{title}\n{text}"))
+        doc_id = len(self.docs)
+        length = sum(terms.values())
+        self.docs.append(
+            {
+                "url": url,
+                "title": title,
+                "snippet": " ".join(text.split())[: self.snippet_length],
+                "length": length,
+            }
+        )
+        self._ids[url] = doc_id
+        self._total_length += length
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def add_html(
+        self, url: str, html: str | bytes, cleaner: Cleaner | None = None
+    ) -> None:
+        """Clean and index a raw HTML page.
+
+        Args:
+            url: Page URL.
+            html: Raw HTML content, e.g. as stored by the fetcher.
+            cleaner: Optional Cleaner; defaults to Cleaner().
+        """
+        soup = (cleaner or Cleaner()).preprocess(html)
+        title = soup.title.get_text(strip=True) if soup.title else ""
+        lines = (line.strip() for line in soup.get_text(separator="\n").splitlines())
+        self.add(url, "\n".join(line for line in lines if line), title)
+
+    def build(self, pages: Iterable[tuple[str, str | bytes]]) -> "LocalIndex":
+        """Index many (url, html) pages and persist the result.
+
+        Args:
+            pages: Iterable of (url, html) pairs; html may be undecoded bytes.
+
+        Returns:
+            The index itself.
+        """
+        cleaner = Cleaner()
+        for url, html in pages:
+            self.add_html(url, html, cleaner)
+        if self.path:
+            self.save()
+        return self
+
+    def search(self, query: str, max_results: int = 5, region: str = "") -> list[dict]:
+        """Rank indexed pages against a query with BM25.
+
+        Args:
+            query: The search query string.
+            max_results: Maximum number of results to return.
+            region: Ignored; accepted for SearchBackend compatibility.
+
+        Returns:
+            A list of dictionaries with title, url and description keys.
+        """
+        n = len(self._ids)
+        if not n:
+            return []
+        avg_length = self._total_length / n or 1
+
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            self._score(term, n, avg_length, scores)
+
+        ranked = sorted(scores.items(), key=lambda s: (-s[1], s[0]))[:max_results]
+        return [
+            {
+                "title": self.docs[d]["title"],
+                "url": self.docs[d]["url"],
+                "description": self.docs[d]["snippet"],
+            }
+            for d, _ in ranked
+        ]
+
+    def _score(
+        self, term: str, n: int, avg_length: float, scores: dict[int, float]
+    ) -> None:
+        """Add a query term's BM25 contribution to each live document's score."""
+        live = [
+            (d, tf) for d, tf in self.postings.get(term, {}).items() if self.docs[d]
+        ]
+        idf = math.log(1 + (n - len(live) + 0.5) / (len(live) + 0.5))
+        for doc_id, tf in live:
+            norm = self.k1 * (
+                1 - self.b + self.b * self.docs[doc_id]["length"] / avg_length
+            )
+            scores[doc_id] = scores.get(doc_id, 0) + idf * tf * (self.k1 + 1) / (
+                tf + norm
+            )
+
+    def save(self, path: str | Path | None = None) -> None:
+        """Write the index to disk, dropping replaced documents.
+
+        Args:
+            path: Target file; defaults to the path given at construction.
+
+        Raises:
+            ValueError: If no path is available.
+        """
+        path = Path(path) if path else self.path
+        if not path:
+            raise ValueError("No path given to save the index to.")
+
+        remap = {old: new for new, old in enumerate(self._ids.values())}
+        data = {
+            "docs": [self.docs[old] for old in remap],
+            "postings": {
+                term: {remap[d]: tf for d, tf in docs.items() if d in remap}
+                for term, docs in self.postings.items()
+            },
+        }
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+    def _load(self) -> None:
+        """Read the index from its JSON file."""
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        self.docs = data["docs"]
+        self.postings = {
+            term: {int(d): tf for d, tf in docs.items()}
+            for term, docs in data["postings"].items()
+            if docs
+        }
+        self._ids = {doc["url"]: i for i, doc in enumerate(self.docs)}
+        self._total_length = sum(doc["length"] for doc in self.docs)
@@ -0,0 +1,292 @@
+"""Stage-level instrumentation for the scrape pipeline."""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+
+STAGES = ("search", "fetch", "clean", "extract", "judge")
+
+
+@dataclass
+class Span:
+    """A timed pipeline stage.
+
+    Attributes:
+        stage: Stage name, one of STAGES.
+        start: Wall-clock start time (seconds since the epoch).
+        duration: Elapsed time in seconds.
+        thread: Identifier of the thread that ran the stage.
+        thread_name: Name of the thread that ran the stage.
+        outcome: "ok" or "error".
+        error: Error message if the stage raised.
+        attrs: Stage details such as url, bytes and chars.
+    """
+
+    stage: str
+    start: float = 0.0
+    duration: float = 0.0
+    thread: int = 0
+    thread_name: str = ""
+    outcome: str = "ok"
+    error: str | None = None
+    attrs: dict = field(default_factory=dict)
+
+    def set(self, **attrs) -> None:
+        """Attach details to the span."""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        """Return the span as a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+class Sink(Protocol):
+    """Receives finished spans. Sinks may also define `start(span)`."""
+
+    def emit(self, span: Span) -> None:
+        """Handle a finished span."""
+        ...
+
+
+class _NoopSpan:
+    """Stand-in used when no sinks are attached; falsy and does nothing."""
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def set(self, **attrs) -> None:
+        """Ignore span details."""
+
+
+_NOOP = _NoopSpan()
+
+
+class _ActiveSpan:
+    """Context manager that times a span and hands it to the sinks."""
+
+    def __init__(self, instrumentation: "Instrumentation", span: Span) -> None:
+        self.instrumentation = instrumentation
+        self.span = span
+
+    def __enter__(self) -> Span:
+        thread = threading.current_thread()
+        self.span.thread, self.span.thread_name = thread.ident, thread.name
+        for sink in self.instrumentation.sinks:
+            if hasattr(sink, "start"):
+                sink.start(self.span)
+        self.span.start = time.time()
+        self._t0 = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.span.duration = time.perf_counter() - self._t0
+        if exc is not None:
+            self.span.outcome, self.span.error = "error", str(exc)
+        for sink in self.instrumentation.sinks:
+            sink.emit(self.span)
+
+
+class Instrumentation:
+    """Emits spans for pipeline stages to a set of sinks.
+
+    With no sinks, `span()` returns a shared no-op object so instrumented code
+    pays only for a method call.
+    """
+
+    def __init__(self, *sinks: Sink) -> None:
+        """Initialize with zero or more sinks.
+
+        Args:
+            sinks: Objects with an `emit(span)` method.
+        """
+        self.sinks = list(sinks)
+
+    def add_sink(self, sink: Sink) -> None:
+        """Attach another sink."""
+        self.sinks.append(sink)
+
+    def span(self, stage: str, **attrs):
+        """Time a stage.
+
+        Args:
+            stage: Stage name.
+            attrs: Initial span details.
+
+        Returns:
+            A context manager yielding the Span (falsy no-op without sinks).
+        """
+        if not self.sinks:
+            return _NOOP
+        return _ActiveSpan(self, Span(stage, attrs=attrs))
+
+
+class LoggingSink:
+    """Logs one line per span."""
+
+    def __init__(
+        self, logger: logging.Logger | None = None, level: int = logging.INFO
+    ) -> None:
+        """Initialize the sink.
+
+        Args:
+            logger: Logger to use. Defaults to the "websense" logger.
+            level: Log level for span records.
+        """
+        self.logger = logger or logging.getLogger("websense")
+        self.level = level
+
+    def emit(self, span: Span) -> None:
+        """Log the span."""
+        details = " ".join(f"{k}={v}" for k, v in span.attrs.items())
+        self.logger.log(
+            self.level,
+            "%s %s %.1fms %s",
+            span.stage,
+            span.outcome,
+            span.duration * 1000,
+            details,
+        )
+
+
+class JsonlSink:
+    """Appends spans to a JSON Lines file."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialize the sink.
+
+        Args:
+            path: File to append spans to.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def emit(self, span: Span) -> None:
+        """Append the span as one JSON line."""
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the q-th percentile (0-100) using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class MemorySink:
+    """Keeps spans in memory and aggregates them per stage."""
+
+    def __init__(self) -> None:
+        """Initialize an empty sink."""
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def emit(self, span: Span) -> None:
+        """Store the span."""
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> dict[str, dict]:
+        """Aggregate durations per stage.
+
+        Returns:
+            Mapping of stage to count, errors, total, mean, p50, p95 and p99
+            (durations in seconds).
+        """
+        with self._lock:
+            spans = list(self.spans)
+        by_stage: dict[str, list[Span]] = {}
+        for span in spans:
+            by_stage.setdefault(span.stage, []).append(span)
+
+        summary = {}
+        for stage, items in by_stage.items():
+            durations = [s.duration for s in items]
+            summary[stage] = {
+                "count": len(items),
+                "errors": sum(1 for s in items if s.outcome == "error"),
+                "total": sum(durations),
+                "mean": sum(durations) / len(durations),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "p99": percentile(durations, 99),
+            }
+        return summary
+
+
+class ChromeTraceSink:
+    """Records spans as Chrome Trace Event JSON (viewable in Perfetto).
+
+    Each span becomes a complete ("X") event on the thread that ran it, so
+    concurrent fetches and extractions show up as parallel tracks.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty trace."""
+        self.events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def emit(self, span: Span) -> None:
+        """Add the span as a complete event."""
+        event = {
+            "name": span.stage,
+            "cat": "websense",
+            "ph": "X",
+            "ts": span.start * 1e6,
+            "dur": span.duration * 1e6,
+            "pid": self._pid,
+            "tid": span.thread,
+            "args": {**span.attrs, "outcome": span.outcome},
+        }
+        if span.error:
+            event["args"]["error"] = span.error
+        with self._lock:
+            self.events.append(event)
+            self._threads.setdefault(span.thread, span.thread_name)
+
+    def to_dict(self) -> dict:
+        """Return the trace in Chrome Trace Event format."""
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e["ts"])
+            threads = dict(self._threads)
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in threads.items()
+        ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str | Path) -> None:
+        """Write the trace to a JSON file.
+
+        Args:
+            path: Output file, e.g. "trace.json".
+        """
+        Path(path).write_text(
+            json.dumps(self.to_dict(), ensure_ascii=False, default=str),
+            encoding="utf-8",
+        )
@@ -1,18 +1,109 @@
 """LLM-based structured data extraction for WebSense."""
 
-from ask2api import Config, generate_api_response, convert_example_to_schema
+import asyncio
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Generator
+
+from ask2api import Config, generate_api_response
+
+from .aio import agenerate_api_response, async_client
+from .metrics import MetricsRegistry
+from .pruning import prune as prune_content
+from .schema import CompiledSchema, compile_schema, invalid_fields
+
+if TYPE_CHECKING:
+    import httpx
+
+    from .cascade import ModelCascade, Plan
+    from .scheduler import LLMScheduler
+
+
+DEFAULT_PROMPT = "Extract structured data from the following webpage content."
+
+# A repair plan yields (prompt, schema) re-asks and is sent back each answer,
+# or the exception the call raised; it returns the merged result.
+RepairPlan = Generator[tuple[str, dict], "dict | Exception", dict]
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of text (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def combine_schemas(schemas: dict[str, dict]) -> dict:
+    """Nest named schemas as required properties of one object schema.
+
+    Args:
+        schemas: Schema per section name.
+
+    Returns:
+        A schema whose top-level fields are the named sections.
+    """
+    return {
+        "type": "object",
+        "properties": dict(schemas),
+        "required": list(schemas),
+        "additionalProperties": False,
+    }
+
+
+def _sections(
+    schemas: dict[str, dict] | None,
+    examples: dict[str, dict] | None,
+    group_size: int | None,
+) -> list[tuple[list[str], CompiledSchema]]:
+    """Compile the combined schema of each group of named schemas.
+
+    Raises:
+        ValueError: If no schema or example is provided.
+    """
+    named = {
+        name: compile_schema(example=example).schema
+        for name, example in (examples or {}).items()
+        if name not in (schemas or {})
+    }
+    named.update(schemas or {})
+    if not named:
+        raise ValueError("You must provide at least one schema or JSON example.")
+
+    names = list(named)
+    size = group_size or len(names)
+    groups = [names[i : i + size] for i in range(0, len(names), size)]
+    return [
+        (group, compile_schema(combine_schemas({name: named[name] for name in group})))
+        for group in groups
+    ]
 
 
 class Parser:
     """Interfaces with ask2api to extract structured data."""
 
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        metrics: MetricsRegistry | None = None,
+        generate: Callable[[str, dict, Config], dict] | None = None,
+        scheduler: "LLMScheduler | None" = None,
+        cascade: "ModelCascade | None" = None,
+    ):
         """Initialize the Parser with ask2api configuration.
 
         Args:
             config: ask2api Config object for LLM settings.
+            metrics: Optional registry for LLM latency and token metrics.
+            generate: Optional replacement for `generate_api_response`, called
+                as `generate(prompt, schema, config)`; used by offline benchmarks.
+            scheduler: Optional LLMScheduler, shared across parsers, that paces
+                calls to the provider's rate limits and retries 429 responses.
+            cascade: Optional ModelCascade; extractions start with its
+                cheapest model and escalate when the output fails schema
+                validation.
         """
         self.config = config
+        self.metrics = metrics
+        self.generate = generate
+        self.scheduler = scheduler
+        self.cascade = cascade
 
     def extract(
         self,
@@ -22,16 +113,29 @@ class Parser:
         truncate: bool = True,
         truncate_length: int = 12000,
         prompt: str | None = None,
+        prune: int | None = None,
+        priority: int = 0,
+        repair: int = 0,
+        repair_budget: int = 2000,
     ) -> dict:
         """Extracts structured data from partial content using LLM.
 
         Args:
             content: The text content to extract data from.
-            schema: Optional JSON schema for the output.
+            schema: Optional JSON schema for the output, or a compiled one
+                (see `websense.schema.compile_schema`).
             example: Optional JSON example to infer schema from.
             truncate: Whether to truncate the content to a fixed length.
             truncate_length: Max length of content to process.
             prompt: Optional custom extraction prompt.
+            prune: Optional character budget; content is first reduced to the
+                lines most relevant to the schema's fields (see
+                `websense.pruning.prune`).
+            priority: Scheduling priority when the parser has a scheduler;
+                higher runs first.
+            repair: Max rounds re-asking fields that are missing or fail
+                schema validation (see `repair`); 0 disables repair.
+            repair_budget: Characters of content sent per repair round.
 
         Returns:
             Extracted data as a dictionary.
@@ -39,18 +143,410 @@ class Parser:
         Raises:
             ValueError: If neither schema nor example is provided.
         """
-        if not schema and example:
-            schema = convert_example_to_schema(example)
-        elif not schema:
-            raise ValueError("You must provide either a schema or a JSON example.")
+        full_prompt, compiled = self._prepare(
+            content, schema, example, truncate, truncate_length, prompt, prune
+        )
+        if self.cascade:
+            plan = self.cascade.plan(compiled, self.config)
+            result = self._run_plan(
+                plan,
+                lambda config, schema: self._generate(
+                    config, full_prompt, schema, priority
+                ),
+            )
+        else:
+            result = self._generate(self.config, full_prompt, compiled.schema, priority)
+        if not repair:
+            return result
+        plan = self._repair_plan(
+            content, result, compiled, prompt, repair, repair_budget
+        )
+        return self._run_plan(plan, self._repair_call(priority))
+
+    async def extract_async(
+        self,
+        content: str,
+        schema: dict = None,
+        example: dict = None,
+        truncate: bool = True,
+        truncate_length: int = 12000,
+        prompt: str | None = None,
+        prune: int | None = None,
+        priority: int = 0,
+        repair: int = 0,
+        repair_budget: int = 2000,
+        client: "httpx.AsyncClient | None" = None,
+    ) -> dict:
+        """Async `extract`: the LLM call does not block the event loop.
+
+        Takes the same arguments as `extract`. The request is sent through
+        an httpx AsyncClient; a custom `generate` callable runs in a worker
+        thread instead.
+
+        Args:
+            content: The text content to extract data from.
+            schema: Optional JSON schema for the output, or a compiled one
+                (see `websense.schema.compile_schema`).
+            example: Optional JSON example to infer schema from.
+            truncate: Whether to truncate the content to a fixed length.
+            truncate_length: Max length of content to process.
+            prompt: Optional custom extraction prompt.
+            prune: Optional character budget for schema-driven pruning.
+            priority: Scheduling priority; higher runs first.
+            repair: Max rounds re-asking missing or invalid fields.
+            repair_budget: Characters of content sent per repair round.
+            client: Optional shared AsyncClient; a temporary one is created
+                otherwise.
+
+        Returns:
+            Extracted data as a dictionary.
+
+        Raises:
+            ValueError: If neither schema nor example is provided.
+        """
+        full_prompt, compiled = self._prepare(
+            content, schema, example, truncate, truncate_length, prompt, prune
+        )
+        if self.cascade:
+            plan = self.cascade.plan(compiled, self.config)
+            result = await self._arun_plan(
+                plan,
+                lambda config, schema: self._agenerate(
+                    config, full_prompt, schema, priority, client
+                ),
+            )
+        else:
+            result = await self._agenerate(
+                self.config, full_prompt, compiled.schema, priority, client
+            )
+        if not repair:
+            return result
+        plan = self._repair_plan(
+            content, result, compiled, prompt, repair, repair_budget
+        )
+        return await self._arun_plan(
+            plan,
+            lambda prompt, schema: self._agenerate(
+                self.config, prompt, schema, priority, client
+            ),
+        )
+
+    def repair(
+        self,
+        content: str,
+        data: dict,
+        schema: dict = None,
+        example: dict = None,
+        prompt: str | None = None,
+        rounds: int = 1,
+        budget: int = 2000,
+        priority: int = 0,
+    ) -> dict:
+        """Re-ask only the fields of a result that are missing or invalid.
+
+        The result is validated against the schema (see
+        `websense.schema.compile_validator`). The failing top-level fields
+        form a reduced schema, the content is pruned to the passages most
+        relevant to those fields (see `websense.pruning.prune`), and the
+        answer is merged into the result. Only answers that validate replace
+        earlier values. Each round costs a fraction of a full extraction;
+        rounds stop early once the result validates.
+
+        Args:
+            content: The content the data was extracted from, before any
+                truncation or pruning.
+            data: The extracted data to repair.
+            schema: Optional JSON schema of the data, or a compiled one.
+            example: Optional JSON example to infer schema from.
+            prompt: Optional custom extraction prompt.
+            rounds: Max re-ask rounds.
+            budget: Characters of content sent per round.
+            priority: Scheduling priority; higher runs first.
+
+        Returns:
+            The data with repaired fields merged in.
+
+        Raises:
+            ValueError: If neither schema nor example is provided.
+        """
+        compiled = compile_schema(schema, example)
+        plan = self._repair_plan(content, data, compiled, prompt, rounds, budget)
+        return self._run_plan(plan, self._repair_call(priority))
+
+    def _repair_call(self, priority: int) -> Callable[[str, dict], dict]:
+        """Function making a repair re-ask with the parser's config."""
+        return lambda prompt, schema: self._generate(
+            self.config, prompt, schema, priority
+        )
+
+    def _repair_plan(
+        self,
+        content: str,
+        result: dict,
+        compiled: CompiledSchema,
+        prompt: str | None,
+        rounds: int,
+        budget: int,
+    ) -> RepairPlan:
+        """Re-ask failing fields with pruned content; return the merged result."""
+        for _ in range(rounds):
+            if not isinstance(result, dict):
+                break
+            fields = invalid_fields(compiled.validate(result), compiled.schema)
+            if not fields:
+                break
+            reduced = compiled.subschema(fields)
+            passages = prune_content(content, reduced, budget=budget)
+            request = (
+                f"{prompt or DEFAULT_PROMPT}\n"
+                f"Extract only these fields: {', '.join(fields)}.\n\n{passages}"
+            )
+            answer = yield request, reduced
+            result = self._merge(result, answer, fields, reduced)
+        return result
+
+    def _merge(self, result: dict, answer, fields: list[str], reduced: dict) -> dict:
+        """Merge the fields of a repair answer that now validate."""
+        fixed = []
+        if isinstance(answer, dict):
+            fixed = compile_schema(reduced).valid_fields(answer, fields)
+        if self.metrics:
+            repairs = self.metrics.counter(
+                "websense_llm_repaired_fields_total",
+                "Fields re-asked by repair, by outcome.",
+                ("outcome",),
+            )
+            repairs.inc(len(fixed), outcome="fixed")
+            repairs.inc(len(fields) - len(fixed), outcome="failed")
+        return {**result, **{f: answer[f] for f in fixed}}
+
+    def _generate(
+        self, config: Config, prompt: str, schema: dict, priority: int
+    ) -> dict:
+        """Send one LLM request, through the scheduler if there is one."""
+        generate = self.generate or generate_api_response
+        if self.scheduler:
+            return self.scheduler.run(
+                self._call,
+                generate,
+                config,
+                prompt,
+                schema,
+                tokens=estimate_tokens(prompt),
+                priority=priority,
+            )
+        return self._call(generate, config, prompt, schema)
+
+    async def _agenerate(
+        self,
+        config: Config,
+        prompt: str,
+        schema: dict,
+        priority: int,
+        client: "httpx.AsyncClient | None",
+    ) -> dict:
+        """Async `_generate`."""
+        if self.scheduler:
+            return await self.scheduler.arun(
+                self._acall,
+                config,
+                prompt,
+                schema,
+                client,
+                tokens=estimate_tokens(prompt),
+                priority=priority,
+            )
+        return await self._acall(config, prompt, schema, client)
+
+    def _run_plan(self, plan: "Plan | RepairPlan", call: Callable) -> dict:
+        """Make the LLM calls a plan asks for and return its result.
+
+        Args:
+            plan: Cascade or repair plan.
+            call: Function making the LLM call for one of the plan's requests.
+        """
+        answer = None
+        while True:
+            try:
+                request = plan.send(answer)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                answer = call(*request)
+            except (ValueError, KeyError) as e:
+                # Unparsable answers count as failed output, not as errors
+                answer = e
+
+    async def _arun_plan(
+        self, plan: "Plan | RepairPlan", call: Callable[..., Awaitable[dict]]
+    ) -> dict:
+        """Async `_run_plan`."""
+        answer = None
+        while True:
+            try:
+                request = plan.send(answer)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                answer = await call(*request)
+            except (ValueError, KeyError) as e:
+                answer = e
+
+    def _call(
+        self, generate: Callable, config: Config, prompt: str, schema: dict
+    ) -> dict:
+        """Send one LLM request, recording its metrics."""
+        if not self.metrics:
+            return generate(prompt, schema, config)
+
+        start, outcome = time.perf_counter(), "error"
+        try:
+            result = generate(prompt, schema, config)
+            outcome = "ok"
+            return result
+        finally:
+            self._record(prompt, outcome, start, config.model)
+
+    async def _acall(
+        self,
+        config: Config,
+        prompt: str,
+        schema: dict,
+        client: "httpx.AsyncClient | None",
+    ) -> dict:
+        """Async `_call` through an AsyncClient (or `generate` in a thread)."""
+        start, outcome = time.perf_counter(), "error"
+        try:
+            if self.generate:
+                result = await asyncio.to_thread(self.generate, prompt, schema, config)
+            elif client is None:
+                async with async_client() as own_client:
+                    result = await agenerate_api_response(
+                        prompt, schema, config, own_client
+                    )
+            else:
+                result = await agenerate_api_response(prompt, schema, config, client)
+            outcome = "ok"
+            return result
+        finally:
+            if self.metrics:
+                self._record(prompt, outcome, start, config.model)
+
+    def _prepare(
+        self,
+        content: str,
+        schema: "dict | CompiledSchema | None",
+        example: dict | None,
+        truncate: bool,
+        truncate_length: int,
+        prompt: str | None,
+        prune: int | None,
+    ) -> tuple[str, CompiledSchema]:
+        """Resolve the schema and build the full prompt for an extraction.
+
+        Returns:
+            (prompt, compiled schema).
+
+        Raises:
+            ValueError: If neither schema nor example is provided.
+        """
+        compiled = compile_schema(schema, example)
+
+        if prune:
+            pruned = prune_content(content, compiled.schema, budget=prune)
+            if self.metrics:
+                self._record_prune(content, pruned)
+            content = pruned
 
         # Truncate content to avoid token limits (optimistic 12k chars ~ 3-4k tokens)
         if truncate:
             content = content[:truncate_length]
 
         if not prompt:
-            prompt = "Extract structured data from the following webpage content."
+            prompt = DEFAULT_PROMPT
+
+        return f"{prompt}\n\n{content}", compiled
+
+    def extract_multi(
+        self,
+        content: str,
+        schemas: dict[str, dict] | None = None,
+        examples: dict[str, dict] | None = None,
+        group_size: int | None = None,
+        prompt: str | None = None,
+        **kwargs,
+    ) -> dict[str, dict]:
+        """Extracts several named schemas from the same content.
 
-        prompt += f"\n\n{content}"
+        The schemas are combined into one object schema with a field per
+        name, so the content is sent once for all of them instead of once
+        per schema. Large sets can be split into groups of `group_size`
+        schemas per call.
+
+        Args:
+            content: The text content to extract data from.
+            schemas: JSON schema per name.
+            examples: JSON example per name, converted to a schema; a name
+                present in `schemas` uses that schema instead.
+            group_size: Max schemas per LLM call. Defaults to all in one call.
+            prompt: Optional custom extraction prompt.
+            **kwargs: Further `extract` arguments (truncation, pruning).
+
+        Returns:
+            Extracted data per name; None for a section the model omitted.
+
+        Raises:
+            ValueError: If no schema or example is provided.
+        """
+        results = {}
+        for group, combined in _sections(schemas, examples, group_size):
+            section_prompt = (
+                f"{prompt or DEFAULT_PROMPT}\n"
+                f"Fill each top-level field ({combined.field_list}) from the content."
+            )
+            data = self.extract(
+                content,
+                schema=combined,
+                prompt=section_prompt,
+                **kwargs,
+            )
+            results.update((name, data.get(name)) for name in group)
+        return results
+
+    def _record(
+        self, prompt: str, outcome: str, start: float, model: str | None = None
+    ) -> None:
+        """Record LLM call count, latency and estimated prompt tokens.
+
+        Args:
+            prompt: The full prompt sent to the model.
+            outcome: "ok" or "error".
+            start: perf_counter() value taken before the call.
+            model: Model that was called; defaults to the config's model.
+        """
+        model = model or self.config.model
+        self.metrics.counter(
+            "websense_llm_requests_total",
+            "LLM extraction calls by model and outcome.",
+            ("model", "outcome"),
+        ).inc(model=model, outcome=outcome)
+        self.metrics.histogram(
+            "websense_llm_duration_seconds",
+            "LLM extraction latency by model.",
+            ("model",),
+        ).observe(time.perf_counter() - start, model=model)
+        self.metrics.counter(
+            "websense_llm_prompt_tokens_total",
+            "Estimated prompt tokens sent by model.",
+            ("model",),
+        ).inc(estimate_tokens(prompt), model=model)
 
-        return generate_api_response(prompt, schema, self.config)
+    def _record_prune(self, content: str, pruned: str) -> None:
+        """Record characters before and after schema-driven pruning."""
+        chars = self.metrics.counter(
+            "websense_prune_chars_total",
+            "Characters into and out of schema-driven pruning.",
+            ("direction",),
+        )
+        chars.inc(len(content), direction="in")
+        chars.inc(len(pruned), direction="out")
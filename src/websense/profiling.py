@@ -0,0 +1,179 @@
+"""Per-stage CPU and allocation profiling for the scrape pipeline."""
+
+import cProfile
+import io
+import pstats
+import threading
+import tracemalloc
+from pathlib import Path
+
+from .instrumentation import Span
+
+
+# Keep the profiler's own snapshot bookkeeping out of allocation reports
+_IGNORE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Take a tracemalloc snapshot without the profiler's own allocations."""
+    return tracemalloc.take_snapshot().filter_traces(_IGNORE)
+
+
+class StageProfiler:
+    """Sink that profiles CPU time and memory allocations per pipeline stage.
+
+    Each span runs under its own `cProfile.Profile`, and the results are
+    merged per stage. When tracemalloc is tracing, allocation sites are
+    compared between snapshots taken at the start and end of each span.
+    Snapshots are process-wide, so allocations made by concurrent stages
+    can be attributed to an overlapping span.
+
+    Use as a context manager (or call `start_tracing`/`stop_tracing`) to
+    enable allocation tracking.
+    """
+
+    def __init__(self, memory: bool = True, frames: int = 1) -> None:
+        """Initialize the profiler.
+
+        Args:
+            memory: Whether to track allocations with tracemalloc.
+            frames: Traceback depth stored per allocation.
+        """
+        self.memory = memory
+        self.frames = frames
+        self.stats: dict[str, pstats.Stats] = {}
+        self.calls: dict[str, int] = {}
+        self.allocations: dict[str, dict[str, list[int]]] = {}
+        self.skipped = 0
+        self._active: dict[int, tuple] = {}
+        self._started_tracing = False
+        self._lock = threading.Lock()
+
+    def start_tracing(self) -> None:
+        """Start tracemalloc unless it is already running."""
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+
+    def stop_tracing(self) -> None:
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> "StageProfiler":
+        self.start_tracing()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop_tracing()
+
+    def start(self, span: Span) -> None:
+        """Begin profiling a span on the current thread."""
+        snapshot = None
+        if self.memory and tracemalloc.is_tracing():
+            snapshot = _snapshot()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active; newer Pythons allow only one at a time
+            profile = None
+        with self._lock:
+            self._active[id(span)] = (profile, snapshot)
+
+    def emit(self, span: Span) -> None:
+        """Finish profiling a span and merge it into its stage."""
+        with self._lock:
+            profile, snapshot = self._active.pop(id(span), (None, None))
+        if profile is None:
+            with self._lock:
+                self.skipped += 1
+            return
+        profile.disable()
+        diffs = []
+        if snapshot is not None and tracemalloc.is_tracing():
+            diffs = _snapshot().compare_to(snapshot, "lineno")
+
+        with self._lock:
+            self.calls[span.stage] = self.calls.get(span.stage, 0) + 1
+            if span.stage in self.stats:
+                self.stats[span.stage].add(profile)
+            else:
+                self.stats[span.stage] = pstats.Stats(profile, stream=io.StringIO())
+            sites = self.allocations.setdefault(span.stage, {})
+            for diff in diffs:
+                if diff.size_diff <= 0:
+                    continue
+                frame = diff.traceback[0]
+                site = sites.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                site[0] += diff.size_diff
+                site[1] += max(diff.count_diff, 0)
+
+    def top_allocations(self, stage: str, top: int = 10) -> list[tuple[str, int, int]]:
+        """Return the largest allocation sites of a stage.
+
+        Args:
+            stage: Stage name.
+            top: Number of sites.
+
+        Returns:
+            (site, bytes, blocks) tuples, largest first.
+        """
+        sites = self.allocations.get(stage, {})
+        ranked = sorted(sites.items(), key=lambda item: -item[1][0])[:top]
+        return [(site, size, count) for site, (size, count) in ranked]
+
+    def summary(self, top: int = 10, sort: str = "cumulative") -> str:
+        """Render the top functions and allocation sites per stage.
+
+        Args:
+            top: Number of functions and allocation sites per stage.
+            sort: pstats sort key, e.g. "cumulative" or "tottime".
+
+        Returns:
+            A human-readable report.
+        """
+        lines = []
+        for stage, stats in self.stats.items():
+            lines.append(
+                f"== {stage}: {self.calls[stage]} spans, "
+                f"{stats.total_tt:.3f}s CPU (profiled) =="
+            )
+            stats.stream = io.StringIO()
+            stats.sort_stats(sort).print_stats(top)
+            lines.append(stats.stream.getvalue().strip("\n"))
+            allocations = self.top_allocations(stage, top)
+            if allocations:
+                lines.append(f"Top allocations ({stage}):")
+                lines.extend(
+                    f"  {size / 1024:10.1f} KiB {count:8d} blocks  {site}"
+                    for site, size, count in allocations
+                )
+            lines.append("")
+        if self.skipped:
+            lines.append(
+                f"{self.skipped} spans not profiled (another profiler was active)"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: str | Path, stage: str | None = None) -> None:
+        """Write merged profile data for snakeviz, pstats or similar tools.
+
+        Args:
+            path: Output file, e.g. "scrape.prof".
+            stage: Optional stage to dump; all stages are merged by default.
+
+        Raises:
+            ValueError: If nothing was profiled for the requested stages.
+        """
+        stages = [stage] if stage else list(self.stats)
+        recorded = [self.stats[name] for name in stages if name in self.stats]
+        if not recorded:
+            raise ValueError("No profile data recorded.")
+        merged = pstats.Stats(stream=io.StringIO())
+        merged.add(*recorded)
+        merged.dump_stats(str(path))
@@ -0,0 +1,179 @@
+"""Schema-driven pruning of page content before LLM extraction."""
+
+import bisect
+import re
+
+
+_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_HEADING = re.compile(r"^\s*#{1,6}\s")
+
+NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+CURRENCY = re.compile(
+    r"[$€£¥₹]\s?\d|\d\s?[$€£¥₹]|\b(?:USD|EUR|GBP|JPY|TRY|INR|CAD|AUD)\b", re.I
+)
+DATE = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}[/.]\d{1,2}[/.]\d{2,4}\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}\b"
+    r"|\b\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b",
+    re.I,
+)
+RATING = re.compile(r"\d(?:[.,]\d)?\s*(?:/|out of)\s*\d+|[★☆]", re.I)
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+URL = re.compile(r"https?://")
+
+# Field name words that imply a value pattern
+_NAME_PATTERNS = {
+    "price": CURRENCY,
+    "cost": CURRENCY,
+    "amount": CURRENCY,
+    "currency": CURRENCY,
+    "fee": CURRENCY,
+    "salary": CURRENCY,
+    "date": DATE,
+    "time": DATE,
+    "published": DATE,
+    "updated": DATE,
+    "created": DATE,
+    "rating": RATING,
+    "score": RATING,
+    "stars": RATING,
+    "email": EMAIL,
+    "url": URL,
+    "link": URL,
+    "website": URL,
+}
+_FORMAT_PATTERNS = {
+    "date": DATE,
+    "date-time": DATE,
+    "email": EMAIL,
+    "uri": URL,
+}
+
+
+def _split_name(name: str) -> list[str]:
+    """Split a snake_case, kebab-case or camelCase field name into words."""
+    return [w.lower() for w in _WORD.findall(name)]
+
+
+def _walk(schema: dict, name: str = ""):
+    """Yield (field name, sub-schema) for every property of a JSON schema."""
+    if not isinstance(schema, dict):
+        return
+    if name:
+        yield name, schema
+    for child, sub in (schema.get("properties") or {}).items():
+        yield from _walk(sub, child)
+    if isinstance(schema.get("items"), dict):
+        yield from _walk(schema["items"], name)
+
+
+def schema_terms(schema: dict) -> tuple[set[str], list[re.Pattern]]:
+    """Derive search keywords and value patterns from a JSON schema.
+
+    Keywords are the words of field names and enum values; patterns come
+    from field types (numbers), formats (dates, emails, URLs) and telling
+    field names such as `price` or `rating`.
+
+    Args:
+        schema: JSON schema of the extraction.
+
+    Returns:
+        (keywords, patterns).
+    """
+    keywords, patterns = set(), {}
+    for name, sub in _walk(schema):
+        words = _split_name(name)
+        keywords.update(w for w in words if len(w) > 2)
+        keywords.update(str(value).lower() for value in sub.get("enum") or [])
+        patterns.update(dict.fromkeys(_field_patterns(words, sub)))
+    return keywords, list(patterns)
+
+
+def _field_patterns(words: list[str], sub: dict) -> list[re.Pattern]:
+    """Return the value patterns implied by one field's type, format and name."""
+    patterns = [NUMBER] if sub.get("type") in ("number", "integer") else []
+    if sub.get("format") in _FORMAT_PATTERNS:
+        patterns.append(_FORMAT_PATTERNS[sub["format"]])
+    return patterns + [_NAME_PATTERNS[w] for w in words if w in _NAME_PATTERNS]
+
+
+def _score(line: str, keywords: re.Pattern | None, patterns: list[re.Pattern]) -> int:
+    """Score a line: two points per keyword hit, one per matching pattern."""
+    score = 2 * len(keywords.findall(line.lower())) if keywords else 0
+    return score + sum(1 for p in patterns if p.search(line))
+
+
+def prune(content: str, schema: dict, budget: int = 4000, window: int = 1) -> str:
+    """Keep only the parts of content likely to hold the schema's fields.
+
+    Lines are scored by field-name keywords and values of a wanted shape
+    (prices, dates, numbers, ...). The best lines are kept, each with
+    `window` lines of context on either side and the nearest heading above,
+    until the budget is used; the result is in document order. Content
+    within budget is returned unchanged, and content with no matching line
+    is truncated to the budget.
+
+    Args:
+        content: Cleaned page text or markdown.
+        schema: JSON schema of the extraction.
+        budget: Max characters to keep.
+        window: Context lines kept around each matching line.
+
+    Returns:
+        Pruned content.
+    """
+    if len(content) <= budget:
+        return content
+
+    words, patterns = schema_terms(schema)
+    keywords = (
+        re.compile(r"\b(?:" + "|".join(map(re.escape, sorted(words))) + r")")
+        if words
+        else None
+    )
+    lines = content.splitlines()
+    scores = [_score(line, keywords, patterns) if line.strip() else 0 for line in lines]
+    ranked = sorted((i for i, s in enumerate(scores) if s), key=lambda i: -scores[i])
+    if not ranked:
+        return content[:budget]
+
+    kept = _select(lines, ranked, budget, window)
+    return _join(lines, kept)[:budget]
+
+
+def _select(lines: list[str], ranked: list[int], budget: int, window: int) -> set:
+    """Pick line indices, best first, with their context while within budget."""
+    headings = [i for i, line in enumerate(lines) if _HEADING.match(line)]
+    kept, used = set(), 0
+    for i in ranked:
+        indices = _context(i, len(lines), window, headings)
+        cost = sum(len(lines[j]) + 1 for j in indices - kept)
+        if used + cost <= budget:
+            kept |= indices
+            used += cost
+        elif i not in kept and used + len(lines[i]) + 1 <= budget:
+            # No room for context, but the line itself fits
+            kept.add(i)
+            used += len(lines[i]) + 1
+    return kept
+
+
+def _context(i: int, count: int, window: int, headings: list[int]) -> set[int]:
+    """Return a line's index, its `window` neighbours and the heading above."""
+    indices = set(range(max(0, i - window), min(count, i + window + 1)))
+    above = bisect.bisect_left(headings, i - window)
+    if above:
+        indices.add(headings[above - 1])
+    return indices
+
+
+def _join(lines: list[str], kept: set[int]) -> str:
+    """Join kept lines in order, marking each gap with a blank line."""
+    parts, previous = [], None
+    for i in sorted(kept):
+        if previous is not None and i != previous + 1:
+            parts.append("")
+        if lines[i].strip():
+            parts.append(lines[i])
+        previous = i
+    return "\n".join(parts)
@@ -0,0 +1,290 @@
+"""Rate-limit-aware scheduling of LLM calls."""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable
+
+from .metrics import MetricsRegistry
+
+
+_POLL = 0.05
+_MIN_FACTOR = 0.1
+_DECREASE = 0.75
+_INCREASE = 0.02
+
+
+def retry_after(error: BaseException) -> float | None:
+    """Return the delay a rate-limited call asks for.
+
+    Works with `requests.HTTPError` and `httpx.HTTPStatusError`, which both
+    carry the failed response.
+
+    Args:
+        error: Exception raised by an LLM call.
+
+    Returns:
+        Seconds from the Retry-After header (0.0 if absent or unparsable)
+        for a 429 response, or None if the error is not a rate limit.
+    """
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) != 429:
+        return None
+    value = (response.headers.get("Retry-After") or "").strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class _Bucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float, burst: float) -> None:
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst)
+        self.level = self.capacity
+
+    def refill(self, elapsed: float, factor: float) -> None:
+        self.level = min(self.capacity, self.level + elapsed * self.rate * factor)
+
+    def delay(self, cost: float, factor: float) -> float:
+        """Seconds until `cost` (capped at capacity) is available."""
+        missing = min(cost, self.capacity) - self.level
+        return max(0.0, missing / (self.rate * factor))
+
+    def take(self, cost: float) -> None:
+        self.level -= min(cost, self.capacity)
+
+
+class LLMScheduler:
+    """Paces LLM calls to requests-per-minute and tokens-per-minute budgets.
+
+    Each call reserves one request and its estimated tokens (prompt plus
+    `output_tokens`) from two token buckets refilled continuously at
+    `headroom` times the budgets, so bursts are capped at `burst` seconds'
+    worth of budget and sustained throughput stays just under the limit.
+    Waiting calls are granted in priority order, then arrival order.
+
+    A 429 response pauses all calls for its Retry-After delay (or
+    `backoff` seconds), empties the buckets and lowers the pacing rate;
+    every successful call raises it again by a small step, so the rate
+    settles just below the point where the provider starts throttling.
+    Rate-limited calls are retried up to `max_retries` times.
+
+    One scheduler can be shared by threads and event loops.
+    """
+
+    def __init__(
+        self,
+        rpm: float | None = None,
+        tpm: float | None = None,
+        output_tokens: int = 256,
+        headroom: float = 0.95,
+        burst: float = 10.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            rpm: Provider requests-per-minute limit; None for no limit.
+            tpm: Provider tokens-per-minute limit; None for no limit.
+            output_tokens: Tokens reserved per call for the answer.
+            headroom: Fraction of the limits to schedule against.
+            burst: Seconds of budget that may be spent at once.
+            max_retries: Retries of a call after a 429 response.
+            backoff: Pause in seconds after a 429 without Retry-After.
+            metrics: Optional registry for queue wait and throttle metrics.
+
+        Raises:
+            ValueError: If a limit is not positive or headroom is not in
+                (0, 1].
+        """
+        if any(limit is not None and limit <= 0 for limit in (rpm, tpm)):
+            raise ValueError("rpm and tpm must be positive.")
+        if not 0 < headroom <= 1:
+            raise ValueError(f"headroom must be in (0, 1], got {headroom}")
+        self.output_tokens = output_tokens
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.metrics = metrics
+        self.throttles = 0
+        self._requests = _Bucket(rpm * headroom, burst) if rpm else None
+        self._tokens = _Bucket(tpm * headroom, burst) if tpm else None
+        self._factor = 1.0
+        self._paused_until = 0.0
+        self._updated = time.monotonic()
+        self._queue: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition(threading.RLock())
+
+    @property
+    def rate_factor(self) -> float:
+        """Current fraction of the budgets being scheduled (1.0 = full rate)."""
+        return self._factor
+
+    def acquire(self, tokens: int, priority: int = 0) -> None:
+        """Block until a call of `tokens` prompt tokens may start.
+
+        Args:
+            tokens: Estimated prompt tokens.
+            priority: Higher values are granted first.
+        """
+        start = time.perf_counter()
+        with self._cond:
+            ticket = self._enqueue(priority)
+            try:
+                while (wait := self._grant(ticket, tokens)) > 0:
+                    self._cond.wait(wait)
+            except BaseException:
+                self._dequeue(ticket)
+                raise
+        self._record_wait(start)
+
+    async def aacquire(self, tokens: int, priority: int = 0) -> None:
+        """Async `acquire`: waits without blocking the event loop."""
+        start = time.perf_counter()
+        ticket = self._enqueue(priority)
+        try:
+            while (wait := self._grant(ticket, tokens)) > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        self._record_wait(start)
+
+    def run(self, fn: Callable[..., Any], *args, tokens: int, priority: int = 0) -> Any:
+        """Call `fn(*args)` within the budgets, retrying rate-limited calls.
+
+        Args:
+            fn: The LLM call.
+            args: Arguments for `fn`.
+            tokens: Estimated prompt tokens.
+            priority: Higher values are granted first.
+
+        Returns:
+            The result of `fn`.
+        """
+        for attempt in itertools.count():
+            self.acquire(tokens, priority)
+            try:
+                result = fn(*args)
+            except Exception as e:
+                self._on_error(e, attempt)
+                continue
+            self._on_success()
+            return result
+
+    async def arun(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        *args,
+        tokens: int,
+        priority: int = 0,
+    ) -> Any:
+        """Async `run` for a coroutine function."""
+        for attempt in itertools.count():
+            await self.aacquire(tokens, priority)
+            try:
+                result = await fn(*args)
+            except Exception as e:
+                self._on_error(e, attempt)
+                continue
+            self._on_success()
+            return result
+
+    def throttled(self, delay: float | None = None) -> None:
+        """Report a 429: pause all calls and lower the pacing rate.
+
+        Args:
+            delay: Retry-After seconds; `backoff` is used if falsy.
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + (delay or self.backoff))
+            self._factor = max(_MIN_FACTOR, self._factor * _DECREASE)
+            for bucket in self._buckets():
+                bucket.level = 0.0
+            self.throttles += 1
+            self._cond.notify_all()
+        if self.metrics:
+            self.metrics.counter(
+                "websense_llm_throttled_total", "LLM calls rejected with 429."
+            ).inc()
+
+    def _on_error(self, error: Exception, attempt: int) -> None:
+        """Pause after a rate limit, or re-raise errors that are not one."""
+        delay = retry_after(error)
+        if delay is None:
+            raise error
+        self.throttled(delay)
+        if attempt >= self.max_retries:
+            raise error
+
+    def _on_success(self) -> None:
+        """Raise the pacing rate back toward the full budget."""
+        with self._cond:
+            self._factor = min(1.0, self._factor + _INCREASE)
+
+    def _buckets(self) -> list[_Bucket]:
+        return [b for b in (self._requests, self._tokens) if b]
+
+    def _enqueue(self, priority: int) -> tuple[int, int]:
+        with self._cond:
+            ticket = (-priority, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            self._cond.notify_all()
+            return ticket
+
+    def _dequeue(self, ticket: tuple[int, int]) -> None:
+        with self._cond:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+            self._cond.notify_all()
+
+    def _grant(self, ticket: tuple[int, int], tokens: int) -> float:
+        """Start the call if it is first in line and affordable.
+
+        Returns:
+            0 if granted, else the seconds to wait before checking again.
+        """
+        with self._cond:
+            if self._queue[0] != ticket:
+                return _POLL
+            now = time.monotonic()
+            for bucket in self._buckets():
+                bucket.refill(now - self._updated, self._factor)
+            self._updated = now
+            cost = tokens + self.output_tokens
+            waits = [self._paused_until - now]
+            if self._requests:
+                waits.append(self._requests.delay(1, self._factor))
+            if self._tokens:
+                waits.append(self._tokens.delay(cost, self._factor))
+            if max(waits) > 0:
+                return max(waits)
+            heapq.heappop(self._queue)
+            if self._requests:
+                self._requests.take(1)
+            if self._tokens:
+                self._tokens.take(cost)
+            self._cond.notify_all()
+            return 0.0
+
+    def _record_wait(self, start: float) -> None:
+        if self.metrics:
+            self.metrics.histogram(
+                "websense_llm_queue_seconds", "Time LLM calls waited for budget."
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,320 @@
+"""Validation of extracted data against JSON schemas, and compiled schemas."""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Callable
+
+from ask2api import convert_example_to_schema
+
+
+Issue = tuple[str, str]
+# Message of issues raised for required fields that are missing or empty
+EMPTY = "missing or empty"
+Check = Callable[[Any, str, list], None]
+
+_TYPES = {
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+    "null": type(None),
+}
+
+
+def _is_type(value: Any, name: str) -> bool:
+    """Return True if value has a JSON schema type (booleans are not numbers)."""
+    if isinstance(value, bool) and name in ("number", "integer"):
+        return False
+    return isinstance(value, _TYPES.get(name, object))
+
+
+def _is_empty(value: Any) -> bool:
+    """Return True for None, blank strings and empty arrays or objects."""
+    if isinstance(value, str):
+        return not value.strip()
+    return value is None or value == [] or value == {}
+
+
+def _join(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
+
+
+def _accept(value: Any, path: str, issues: list) -> None:
+    """Check for schemas without constraints."""
+
+
+def _check_object(
+    required: list[str],
+    properties: dict[str, Check],
+    value: dict,
+    path: str,
+    issues: list,
+) -> None:
+    """Check required fields and the properties of an object."""
+    for name in required:
+        if _is_empty(value.get(name)):
+            issues.append((_join(path, name), EMPTY))
+    for name, check in properties.items():
+        if not _is_empty(value.get(name)):
+            check(value[name], _join(path, name), issues)
+
+
+def _check_array(items: Check, value: list, path: str, issues: list) -> None:
+    """Check every item of an array."""
+    for i, item in enumerate(value):
+        items(item, f"{path}[{i}]", issues)
+
+
+def _compile_object(schema: dict) -> Check:
+    """Build the check of an object's required fields and properties."""
+    required = list(schema.get("required") or [])
+    properties = {
+        name: _compile(sub) for name, sub in (schema.get("properties") or {}).items()
+    }
+    return partial(_check_object, required, properties)
+
+
+def _compile_array(schema: dict) -> Check:
+    """Build the check of an array's items."""
+    return partial(_check_array, _compile(schema.get("items")))
+
+
+# Container type -> compiler of the check applied to its contents
+_CONTAINERS = {dict: _compile_object, list: _compile_array}
+
+
+def _check(
+    types: list[str],
+    enum: list | None,
+    contents: dict[type, Check],
+    value: Any,
+    path: str,
+    issues: list,
+) -> None:
+    """Check a value's type and enum, then its contents."""
+    if types and not any(_is_type(value, t) for t in types):
+        got = type(value).__name__
+        issues.append((path, f"expected {'/'.join(types)}, got {got}"))
+    elif enum is not None and value not in enum:
+        issues.append((path, f"{value!r} is not one of {enum}"))
+    else:
+        contents.get(type(value), _accept)(value, path, issues)
+
+
+def _compile(schema: dict) -> Check:
+    """Build a check function for a schema and its sub-schemas."""
+    if not isinstance(schema, dict) or not schema:
+        return _accept
+    types = schema.get("type") or []
+    types = [types] if isinstance(types, str) else list(types)
+    contents = {kind: build(schema) for kind, build in _CONTAINERS.items()}
+    return partial(_check, types, schema.get("enum"), contents)
+
+
+def compile_validator(schema: dict) -> Callable[[Any], list[Issue]]:
+    """Build a reusable validator for a JSON schema.
+
+    The validator checks types (`type`, including unions), `enum` values,
+    and that `required` fields are present and non-empty (not None, a blank
+    string or an empty array/object), recursing into properties and array
+    items. Other JSON schema keywords are ignored.
+
+    Args:
+        schema: JSON schema of the extraction.
+
+    Returns:
+        A function mapping data to a list of (path, message) issues, where
+        path looks like `items[0].price`; an empty list means valid.
+    """
+    check = _compile(schema)
+
+    def validate(data: Any) -> list[Issue]:
+        issues: list[Issue] = []
+        check(data, "", issues)
+        return issues
+
+    return validate
+
+
+def validate(data: Any, schema: dict) -> list[Issue]:
+    """Validate data against a schema once; see `compile_validator`."""
+    return compile_validator(schema)(data)
+
+
+def invalid_fields(issues: list[Issue], schema: dict) -> list[str]:
+    """Return the top-level fields affected by validation issues.
+
+    Args:
+        issues: Issues returned by a validator.
+        schema: The object schema that was validated.
+
+    Returns:
+        Field names in schema order; every field if the root itself failed.
+    """
+    names = list((schema.get("properties") or {}))
+    bad = {path.split(".")[0].split("[")[0] for path, _ in issues}
+    if "" in bad:
+        return names
+    return [name for name in names if name in bad]
+
+
+def subschema(schema: dict, fields: list[str]) -> dict:
+    """Reduce an object schema to some of its top-level fields.
+
+    Args:
+        schema: Object schema.
+        fields: Names of the properties to keep.
+
+    Returns:
+        A copy of the schema with only those properties and required fields.
+    """
+    properties = schema.get("properties") or {}
+    reduced = {
+        **schema,
+        "properties": {name: properties[name] for name in fields if name in properties},
+    }
+    if "required" in schema:
+        reduced["required"] = [name for name in schema["required"] if name in fields]
+    return reduced
+
+
+def schema_key(value: Any) -> str:
+    """Return a stable hash of a JSON value, independent of key order."""
+    data = json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CompiledSchema:
+    """A JSON schema prepared once and reused by every extraction using it.
+
+    Holds the schema, its validator and prompt fragments, plus a memo of
+    schemas derived from it (batch wrappers, per-field subsets). Instances
+    are shared through `compile_schema`'s cache, so treat them, and the
+    schema dict, as read-only.
+
+    Attributes:
+        schema: The JSON schema.
+        key: Stable hash of the schema.
+        fields: Top-level property names.
+        field_list: The field names as a comma-separated prompt fragment.
+        validate: Validator built by `compile_validator`.
+    """
+
+    def __init__(self, schema: dict) -> None:
+        """Compile a schema.
+
+        Args:
+            schema: JSON schema of the extraction.
+        """
+        self.schema = schema
+        self.key = schema_key(schema)
+        self.fields = tuple(schema.get("properties") or ())
+        self.field_list = ", ".join(self.fields)
+        self.validate = compile_validator(schema)
+        self._derived: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def derive(self, name: str, build: Callable[[dict], dict]) -> dict:
+        """Return a schema derived from this one, building it on first use.
+
+        Args:
+            name: Memo key, unique per kind of derived schema.
+            build: Function of the schema returning the derived schema.
+
+        Returns:
+            The memoized derived schema.
+        """
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build(self.schema)
+            return self._derived[name]
+
+    def subschema(self, fields: list[str]) -> dict:
+        """Memoized `subschema` of some top-level fields."""
+        return self.derive(
+            "fields:" + ",".join(fields), lambda schema: subschema(schema, fields)
+        )
+
+    def valid_fields(self, data: dict, fields: list[str]) -> list[str]:
+        """Return the fields that data holds a present, valid value for.
+
+        Args:
+            data: An answer for some top-level fields.
+            fields: Names of the fields to check.
+
+        Returns:
+            Field names in the given order.
+        """
+        reduced = self.subschema(fields)
+        failing = invalid_fields(compile_schema(reduced).validate(data), reduced)
+        return [f for f in fields if not _is_empty(data.get(f)) and f not in failing]
+
+
+_CACHE_SIZE = 256
+_cache: OrderedDict[str, CompiledSchema] = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def compile_schema(
+    schema: "dict | CompiledSchema | None" = None, example: dict | None = None
+) -> CompiledSchema:
+    """Return the compiled form of a schema or JSON example, from cache.
+
+    Schemas and examples are cached by a stable hash of their content, so
+    converting an example and building its validator happen once no matter
+    how many pages use it. A CompiledSchema is returned as is.
+
+    Args:
+        schema: JSON schema, or an already compiled one.
+        example: JSON example to infer the schema from, if no schema.
+
+    Returns:
+        The compiled schema.
+
+    Raises:
+        ValueError: If neither schema nor example is provided.
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema
+    if schema:
+        key = "schema:" + schema_key(schema)
+    elif example:
+        key = "example:" + schema_key(example)
+    else:
+        raise ValueError("You must provide either a schema or a JSON example.")
+
+    with _cache_lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return compiled
+        _cache_stats["misses"] += 1
+
+    compiled = CompiledSchema(schema or convert_example_to_schema(example))
+    with _cache_lock:
+        _cache[key] = compiled
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def cache_info() -> dict:
+    """Return hits, misses and size of the compiled schema cache."""
+    with _cache_lock:
+        return {**_cache_stats, "size": len(_cache)}
+
+
+def clear_cache() -> None:
+    """Empty the compiled schema cache."""
+    with _cache_lock:
+        _cache.clear()
+        _cache_stats.update(hits=0, misses=0)
@@ -1,32 +1,148 @@
 """Web scraper with search and multi-source consolidation."""
 
+import asyncio
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from itertools import chain
+from typing import TYPE_CHECKING, Iterator, Sequence
+from .aio import async_client
 from .fetcher import Fetcher
+from .batching import ExtractionBatcher
+from .boilerplate import BoilerplateModel
+from .cascade import ModelCascade
 from .cleaner import Cleaner
+from .dedup import NearDuplicateFilter
+from .instrumentation import Instrumentation
+from .metrics import MetricsRegistry
 from .parser import Parser
+from .scheduler import LLMScheduler
+from .schema import CompiledSchema, compile_schema
 from .searcher import Searcher
 from ask2api import Config
 
+if TYPE_CHECKING:
+    import httpx
+
+
+logger = logging.getLogger("websense")
+
+
+def _candidates(max_results: int, dedup: bool) -> int:
+    """Results to ask the search for.
+
+    With dedup, up to `max_results` extra results may replace dropped
+    near-duplicates; they are only fetched when a page is dropped.
+    """
+    return max_results * 2 if dedup and max_results > 1 else max_results
+
+
+def _query_kwargs(query: str, extract_kwargs: dict | None) -> dict:
+    """Extraction arguments for a search, with a prompt giving the query."""
+    return {
+        "prompt": (
+            f"The user searched for: '{query}'. "
+            "Extract the relevant data from this webpage."
+        ),
+        **(extract_kwargs or {}),
+    }
+
+
+def _compile(
+    schema: "dict | CompiledSchema | None", example: dict | None
+) -> CompiledSchema | None:
+    """Compile a schema or example, or return None if neither is given."""
+    return compile_schema(schema, example) if schema or example else None
+
+
+def _judge_request(
+    query: str, data: list[dict], schema: CompiledSchema | None
+) -> tuple[str, dict]:
+    """Build the content and `extract` arguments of a judge call."""
+    prompt = f"""Analyze and judge extracted data sources based on the query.
+
+        INSTRUCTIONS:
+        1. For each field, select the most accurate and complete value.
+        2. Prefer specific values over vague ones, and consensus values.
+        3. Use available values when some sources are missing fields.
+        4. Return ONLY the consolidated data in JSON, no explanations.
+
+        Query:
+        {query}
+        """
+    json_kwargs = {"indent": 2, "ensure_ascii": False}
+    data_str = "Data:" + "\n\n".join(json.dumps(r, **json_kwargs) for r in data)
+    # Judging finishes a query whose sources are already paid for
+    kwargs = {
+        "schema": schema,
+        "example": None if schema else data[0],
+        "prompt": prompt,
+        "priority": 1,
+    }
+    return data_str, kwargs
+
 
 class Scraper:
     """Default scraper using Fetcher → Cleaner → markdownify pipeline."""
 
-    def __init__(self, model: str = None, config: Config | None = None):
+    def __init__(
+        self,
+        model: str = None,
+        config: Config | None = None,
+        instrumentation: Instrumentation | None = None,
+        metrics: MetricsRegistry | None = None,
+        clean_processes: int | None = None,
+        compact: bool = False,
+        boilerplate: BoilerplateModel | None = None,
+        scheduler: LLMScheduler | None = None,
+        cascade: Sequence[str] | ModelCascade | None = None,
+        searcher: Searcher | None = None,
+        fetcher: Fetcher | None = None,
+    ):
         """Initialize the Scraper with optional model and configuration.
 
         Args:
             model: Optional LLM model name to use for parsing. If provided, overrides the model in config.
             config: Optional ask2api Config. If not provided, loads from env.
+            instrumentation: Optional Instrumentation receiving stage spans.
+            metrics: Optional registry shared by the fetcher, cleaner, parser and
+                searcher.
+            clean_processes: Optional number of worker processes for HTML
+                cleaning, so concurrent scrapes are not serialized on the GIL.
+            compact: If True, markdown content is converted to the compact
+                LLM dialect (see `Cleaner.to_compact_markdown`).
+            boilerplate: Optional per-domain boilerplate model; blocks that
+                repeat across the fetched pages of a site are dropped.
+            scheduler: Optional LLMScheduler pacing LLM calls to the
+                provider's requests- and tokens-per-minute limits.
+            cascade: Optional models from cheapest to strongest (or a
+                ModelCascade); pages start on the first model and escalate
+                when the output fails schema validation.
+            searcher: Optional Searcher, e.g. one over a `LocalIndex`
+                backend for offline search. Defaults to a DuckDuckGo searcher.
+            fetcher: Optional Fetcher, e.g. a `WarcReplayFetcher` or
+                `StoreFetcher` serving stored pages instead of the network.
         """
         if not config:
             config = Config.from_env()
         if model:
             config.model = model
-        self.fetcher = Fetcher()
-        self.cleaner = Cleaner()
-        self.parser = Parser(config)
-        self.searcher = Searcher()
+        self.fetcher = fetcher or Fetcher(metrics=metrics)
+        self.cleaner = Cleaner(
+            metrics=metrics, processes=clean_processes, boilerplate=boilerplate
+        )
+        if cascade is not None and not isinstance(cascade, ModelCascade):
+            cascade = ModelCascade(cascade, metrics=metrics)
+        self.parser = Parser(
+            config, metrics=metrics, scheduler=scheduler, cascade=cascade
+        )
+        self.searcher = searcher or Searcher(metrics=metrics)
+        self.instrumentation = instrumentation or Instrumentation()
+        self.compact = compact
+
+    def close(self) -> None:
+        """Release the cleaner's worker processes, if any."""
+        self.cleaner.close()
 
     def get_content(self, url: str, convert_markdown: bool = True) -> str:
         """Fetch URL and process content.
@@ -38,10 +154,49 @@ class Scraper:
         Returns:
             Processed content as plain text or Markdown.
         """
-        response = self.fetcher.fetch(url)
-        if convert_markdown:
-            return self.cleaner.to_markdown(response.text)
-        return self.cleaner.to_text(response.text)
+        with self.instrumentation.span("fetch", url=url) as span:
+            response = self.fetcher.fetch(url)
+            if span:
+                span.set(status=response.status_code, bytes=len(response.content))
+        return self._clean(url, response, convert_markdown)
+
+    def _clean(self, url: str, response, convert_markdown: bool) -> str:
+        """Clean a fetched response inside a "clean" span."""
+        with self.instrumentation.span("clean", url=url) as span:
+            # Hand the raw body and its encoding to the cleaner so it is
+            # decoded exactly once
+            html, encoding = response.content, response.encoding
+            if convert_markdown and self.compact:
+                content = self.cleaner.to_compact_markdown(html, encoding, url)
+            elif convert_markdown:
+                content = self.cleaner.to_markdown(html, encoding, url)
+            else:
+                content = self.cleaner.to_text(html, encoding, url)
+            if span:
+                span.set(encoding=encoding, chars=len(content))
+        return content
+
+    async def aget_content(
+        self,
+        url: str,
+        convert_markdown: bool = True,
+        client: "httpx.AsyncClient | None" = None,
+    ) -> str:
+        """Async `get_content`: fetch without blocking, clean in a thread.
+
+        Args:
+            url: The URL to fetch.
+            convert_markdown: If True, convert HTML to Markdown.
+            client: Optional shared httpx AsyncClient.
+
+        Returns:
+            Processed content as plain text or Markdown.
+        """
+        with self.instrumentation.span("fetch", url=url) as span:
+            response = await self.fetcher.afetch(url, client)
+            if span:
+                span.set(status=response.status_code, bytes=len(response.content))
+        return await asyncio.to_thread(self._clean, url, response, convert_markdown)
 
     def scrape(
         self,
@@ -63,38 +218,316 @@ class Scraper:
             Extracted data as a dictionary.
         """
         content = self.get_content(url, convert_markdown)
-        return self.parser.extract(
-            content, schema=schema, example=example, **(extract_kwargs or {})
+        return self._extract(
+            content, url=url, schema=schema, example=example, **(extract_kwargs or {})
+        )
+
+    def scrape_multi(
+        self,
+        url: str,
+        schemas: dict[str, dict] | None = None,
+        examples: dict[str, dict] | None = None,
+        convert_markdown: bool = True,
+        group_size: int | None = None,
+        extract_kwargs: dict | None = None,
+    ) -> dict[str, dict]:
+        """Scrape URL once and extract several named schemas from it.
+
+        The page is fetched and cleaned once and all schemas are extracted in
+        a single combined LLM call (or one call per `group_size` schemas).
+
+        Args:
+            url: The URL to scrape.
+            schemas: JSON schema per name.
+            examples: JSON example per name, to infer schemas from.
+            convert_markdown: If True, convert HTML to Markdown before parsing.
+            group_size: Max schemas per LLM call. Defaults to all in one call.
+            extract_kwargs: Further `Parser.extract` arguments.
+
+        Returns:
+            Extracted data per name.
+        """
+        content = self.get_content(url, convert_markdown)
+        with self.instrumentation.span("extract", url=url, chars=len(content)):
+            return self.parser.extract_multi(
+                content,
+                schemas=schemas,
+                examples=examples,
+                group_size=group_size,
+                **(extract_kwargs or {}),
+            )
+
+    def scrape_many(
+        self,
+        urls: list[str],
+        schema: dict = None,
+        example: dict = None,
+        convert_markdown: bool = True,
+        max_workers: int = 4,
+        batch_size: int = 8,
+        max_batch_chars: int = 12000,
+        prompt: str | None = None,
+    ) -> list[dict | None]:
+        """Scrape many pages with one schema, batching small pages per LLM call.
+
+        Pages are fetched and cleaned concurrently and handed to an
+        `ExtractionBatcher`, which packs up to `batch_size` pages (and at
+        most `max_batch_chars` characters) into each extraction request.
+
+        Args:
+            urls: The URLs to scrape.
+            schema: Optional JSON schema dict.
+            example: Optional JSON example dict to infer schema from.
+            convert_markdown: If True, convert HTML to Markdown before parsing.
+            max_workers: Max concurrent fetches.
+            batch_size: Max pages per LLM call.
+            max_batch_chars: Max content characters per LLM call; longer
+                pages are extracted on their own.
+            prompt: Optional custom extraction prompt.
+
+        Returns:
+            Extracted data per URL, in input order; None for pages that
+            could not be fetched.
+        """
+        batcher = ExtractionBatcher(
+            self.parser, max_batch=batch_size, max_chars=max_batch_chars, prompt=prompt
         )
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, batcher:
+            fetches = [
+                executor.submit(self._try_get_content, url, convert_markdown)
+                for url in urls
+            ]
+            extractions = []
+            for fetch in fetches:
+                _, content = fetch.result()
+                extractions.append(
+                    None
+                    if content is None
+                    else batcher.submit(content, schema, example)
+                )
+        return [None if f is None else f.result() for f in extractions]
+
+    async def ascrape(
+        self,
+        url: str,
+        schema: dict = None,
+        example: dict = None,
+        convert_markdown: bool = True,
+        extract_kwargs: dict | None = None,
+        client: "httpx.AsyncClient | None" = None,
+    ) -> dict:
+        """Async `scrape`: the page fetch and the LLM call do not block.
+
+        Many calls can run on one event loop with `asyncio.gather`; pass a
+        shared `client` (see `websense.aio.async_client`) to pool connections
+        and cap concurrency through its connection limit.
+
+        Args:
+            url: The URL to scrape.
+            schema: Optional JSON schema dict.
+            example: Optional JSON example dict to infer schema from.
+            convert_markdown: If True, convert HTML to Markdown before parsing.
+            extract_kwargs: Further `Parser.extract` arguments.
+            client: Optional shared httpx AsyncClient.
+
+        Returns:
+            Extracted data as a dictionary.
+        """
+        if client is None:
+            async with async_client() as own_client:
+                return await self.ascrape(
+                    url, schema, example, convert_markdown, extract_kwargs, own_client
+                )
+        content = await self.aget_content(url, convert_markdown, client)
+        return await self._aextract(
+            content,
+            url=url,
+            schema=schema,
+            example=example,
+            client=client,
+            **(extract_kwargs or {}),
+        )
+
+    def _extract(self, content: str, url: str | None = None, **kwargs) -> dict:
+        """Run the parser on content inside an "extract" span."""
+        with self.instrumentation.span("extract", url=url, chars=len(content)):
+            return self.parser.extract(content, **kwargs)
+
+    async def _aextract(self, content: str, url: str | None = None, **kwargs) -> dict:
+        """Async `_extract`."""
+        with self.instrumentation.span("extract", url=url, chars=len(content)):
+            return await self.parser.extract_async(content, **kwargs)
 
     def _judge(
         self,
         query: str,
         data: list[dict],
+        schema: CompiledSchema | None = None,
     ):
         """Consolidates data from multiple sources using LLM.
 
         Args:
             query: The original search query for context.
             data: List of dictionaries to consolidate.
+            schema: Schema of the sources; inferred from the first source
+                if not given.
 
         Returns:
             Consolidated dictionary of data.
         """
-        prompt = f"""Analyze and judge extracted data sources based on the query.
+        data_str, kwargs = _judge_request(query, data, schema)
+        with self.instrumentation.span("judge", sources=len(data)):
+            return self.parser.extract(data_str, **kwargs)
 
-        INSTRUCTIONS:
-        1. For each field, select the most accurate and complete value.
-        2. Prefer specific values over vague ones, and consensus values.
-        3. Use available values when some sources are missing fields.
-        4. Return ONLY the consolidated data in JSON, no explanations.
+    async def _ajudge(
+        self,
+        query: str,
+        data: list[dict],
+        schema: CompiledSchema | None,
+        client: "httpx.AsyncClient | None",
+    ) -> dict:
+        """Async `_judge`: the LLM call does not block the event loop."""
+        data_str, kwargs = _judge_request(query, data, schema)
+        with self.instrumentation.span("judge", sources=len(data)):
+            return await self.parser.extract_async(data_str, client=client, **kwargs)
 
-        Query:
-        {query}
+    def _try_get_content(
+        self, url: str, convert_markdown: bool
+    ) -> tuple[str, str | None]:
+        """Fetch and clean a page, returning (url, None) if the fetch fails."""
+        try:
+            return url, self.get_content(url, convert_markdown)
+        except RuntimeError as e:
+            logger.warning("Skipping search result: %s", e)
+            return url, None
+
+    async def _atry_get_content(
+        self,
+        url: str,
+        convert_markdown: bool,
+        client: "httpx.AsyncClient",
+        semaphore: asyncio.Semaphore,
+    ) -> str | None:
+        """Async `_try_get_content`, bounded by a semaphore."""
+        async with semaphore:
+            try:
+                return await self.aget_content(url, convert_markdown, client)
+            except RuntimeError as e:
+                logger.warning("Skipping search result: %s", e)
+                return None
+
+    async def _afetch_distinct(
+        self,
+        results: list[dict],
+        convert_markdown: bool,
+        limit: int,
+        client: "httpx.AsyncClient",
+        semaphore: asyncio.Semaphore,
+        seen: NearDuplicateFilter | None = None,
+    ) -> list[tuple[str, str]]:
+        """Fetch results in rank order until `limit` distinct pages are accepted.
+
+        Each round fetches only as many further results as pages are still
+        missing, so results beyond `limit` cost a fetch only when an earlier
+        page failed or was a near-duplicate.
+        """
+        accepted: list[tuple[str, str]] = []
+        queue = list(results)
+        while queue and len(accepted) < limit:
+            needed = limit - len(accepted)
+            wave, queue = queue[:needed], queue[needed:]
+            contents = await asyncio.gather(
+                *(
+                    self._atry_get_content(
+                        r["url"], convert_markdown, client, semaphore
+                    )
+                    for r in wave
+                )
+            )
+            accepted += self._select(wave, contents, needed, seen)
+        return accepted
+
+    @staticmethod
+    def _select(
+        results: list[dict],
+        contents: list[str | None],
+        limit: int,
+        seen: NearDuplicateFilter | None = None,
+    ) -> list[tuple[str, str]]:
+        """Pick the first `limit` fetched, distinct pages in rank order."""
+        accepted = []
+        for result, content in zip(results, contents):
+            if content is None or (seen is not None and not seen.add(content)):
+                continue
+            accepted.append((result["url"], content))
+            if len(accepted) == limit:
+                break
+        return accepted
+
+    @staticmethod
+    def _collect(
+        pending: set,
+        contents: list[tuple[str, str]],
+        seen: NearDuplicateFilter | None,
+    ) -> set:
+        """Wait for a prefetch to finish, keep its content if it is new.
+
+        Returns:
+            The fetches still pending.
+        """
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            url, content = future.result()
+            if content is not None and (seen is None or seen.add(content)):
+                contents.append((url, content))
+        return pending
+
+    def _prefetch(
+        self,
+        results: Iterator[dict],
+        convert_markdown: bool,
+        limit: int,
+        max_workers: int,
+        seen: NearDuplicateFilter | None = None,
+    ) -> list[tuple[str, str]]:
+        """Fetch and clean streamed search results as they arrive.
+
+        A fetch starts as soon as its result is yielded. New results are only
+        pulled while the accepted and in-flight pages cannot yet fill `limit`;
+        failed fetches and near-duplicates free their slot for the next result.
+        Once enough pages are accepted, queued fetches are cancelled.
+
+        Args:
+            results: Search results in rank order, possibly still streaming.
+            convert_markdown: Whether to convert HTML to Markdown.
+            limit: Number of distinct contents wanted.
+            max_workers: Max concurrent fetches.
+            seen: Optional near-duplicate filter.
+
+        Returns:
+            Up to `limit` (url, content) pairs, in completion order.
         """
-        json_kwargs = {"indent": 2, "ensure_ascii": False}
-        data_str = "Data:" + "\n\n".join(json.dumps(r, **json_kwargs) for r in data)
-        return self.parser.extract(data_str, example=data[0], prompt=prompt)
+        contents: list[tuple[str, str]] = []
+        pending: set = set()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            for result in results:
+                pending.add(
+                    executor.submit(
+                        self._try_get_content, result["url"], convert_markdown
+                    )
+                )
+                while pending and (
+                    len(contents) + len(pending) >= limit or len(pending) >= max_workers
+                ):
+                    pending = self._collect(pending, contents, seen)
+                if len(contents) >= limit:
+                    break
+            while pending and len(contents) < limit:
+                pending = self._collect(pending, contents, seen)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return contents[:limit]
 
     def search_and_scrape(
         self,
@@ -106,9 +539,16 @@ class Scraper:
         max_results: int = 1,
         region: str = "wt-wt",
         max_workers: int = 4,
+        dedup: bool = True,
+        dedup_threshold: int = 3,
     ) -> dict:
         """Search the web for a query and scrape the results.
 
+        Pages are fetched as soon as search results stream in. When scraping
+        multiple sources, near-duplicate pages (syndicated copies, mirrors) are
+        collapsed before extraction and extra search results fill the freed
+        slots.
+
         Args:
             query: Search query string.
             schema: Optional JSON schema.
@@ -118,34 +558,148 @@ class Scraper:
             max_results: Max number of results to fetch.
             region: DuckDuckGo region code.
             max_workers: Max threads for parallel scraping.
+            dedup: Whether to skip near-duplicate sources.
+            dedup_threshold: Max SimHash Hamming distance for near-duplicates.
 
         Returns:
             Consolidated data if max_results > 1, else single source data.
         """
-        results = self.searcher.search(query, max_results, region)
-        if not results:
+        # Compiled once for every source and the judge
+        schema = _compile(schema, example)
+        results = iter(
+            self.searcher.iter_search(query, _candidates(max_results, dedup), region)
+        )
+        # The search span covers the wait for the first streamed result
+        with self.instrumentation.span("search", query=query):
+            first = next(results, None)
+        if first is None:
             raise RuntimeError(f"No search results found for query '{query}'")
 
-        extract_kwargs = extract_kwargs or {}
-        # Build extraction prompt with query context
-        if "prompt" not in extract_kwargs:
-            extract_kwargs["prompt"] = (
-                f"The user searched for: '{query}'. Extract the relevant data from this webpage."
+        extract_kwargs = _query_kwargs(query, extract_kwargs)
+        if max_results == 1:
+            return self.scrape(
+                first["url"],
+                schema=schema,
+                convert_markdown=convert_markdown,
+                extract_kwargs=extract_kwargs,
             )
-        scrape_kwargs = {
-            "schema": schema,
-            "example": example,
-            "convert_markdown": convert_markdown,
-            "extract_kwargs": extract_kwargs,
-        }
 
-        if max_results == 1:
-            url = results[0]["url"]
-            return self.scrape(url, **scrape_kwargs)
+        seen = NearDuplicateFilter(threshold=dedup_threshold) if dedup else None
+        contents = self._prefetch(
+            chain([first], results), convert_markdown, max_results, max_workers, seen
+        )
+        if not contents:
+            raise RuntimeError(f"Failed to fetch any result for query '{query}'")
 
-        with ThreadPoolExecutor(max_workers=min(max_workers, len(results))) as executor:
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(contents))
+        ) as executor:
             futures = [
-                executor.submit(self.scrape, r["url"], **scrape_kwargs) for r in results
+                executor.submit(
+                    self._extract,
+                    content,
+                    url=url,
+                    schema=schema,
+                    **extract_kwargs,
+                )
+                for url, content in contents
             ]
             sources = [f.result() for f in as_completed(futures)]
-            return self._judge(query, sources)
+        if len(sources) == 1:
+            return sources[0]
+        return self._judge(query, sources, schema)
+
+    async def asearch_and_scrape(
+        self,
+        query: str,
+        schema: dict = None,
+        example: dict = None,
+        convert_markdown: bool = True,
+        extract_kwargs: dict = None,
+        max_results: int = 1,
+        region: str = "wt-wt",
+        max_concurrency: int = 8,
+        dedup: bool = True,
+        dedup_threshold: int = 3,
+        client: "httpx.AsyncClient | None" = None,
+    ) -> dict:
+        """Async `search_and_scrape`.
+
+        The search runs in a worker thread; page fetches, extractions and
+        the judge call run on the event loop, with at most `max_concurrency`
+        fetches and extractions at a time. The top `max_results` results are
+        fetched at once; further results are fetched only to replace pages
+        that failed or were dropped as near-duplicates.
+
+        Args:
+            query: Search query string.
+            schema: Optional JSON schema.
+            example: Optional JSON example.
+            convert_markdown: Whether to convert HTML to Markdown.
+            extract_kwargs: Additional arguments for extraction.
+            max_results: Max number of results to fetch.
+            region: DuckDuckGo region code.
+            max_concurrency: Max concurrent fetches and LLM calls.
+            dedup: Whether to skip near-duplicate sources.
+            dedup_threshold: Max SimHash Hamming distance for near-duplicates.
+            client: Optional shared httpx AsyncClient.
+
+        Returns:
+            Consolidated data if max_results > 1, else single source data.
+        """
+        schema = _compile(schema, example)
+        if client is None:
+            async with async_client(max_connections=max_concurrency) as own_client:
+                return await self.asearch_and_scrape(
+                    query,
+                    schema,
+                    None,
+                    convert_markdown,
+                    extract_kwargs,
+                    max_results,
+                    region,
+                    max_concurrency,
+                    dedup,
+                    dedup_threshold,
+                    own_client,
+                )
+
+        with self.instrumentation.span("search", query=query):
+            results = await asyncio.to_thread(
+                self.searcher.search, query, _candidates(max_results, dedup), region
+            )
+        if not results:
+            raise RuntimeError(f"No search results found for query '{query}'")
+
+        extract_kwargs = _query_kwargs(query, extract_kwargs)
+        if max_results == 1:
+            return await self.ascrape(
+                results[0]["url"],
+                schema=schema,
+                convert_markdown=convert_markdown,
+                extract_kwargs=extract_kwargs,
+                client=client,
+            )
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        seen = NearDuplicateFilter(threshold=dedup_threshold) if dedup else None
+        accepted = await self._afetch_distinct(
+            results, convert_markdown, max_results, client, semaphore, seen
+        )
+        if not accepted:
+            raise RuntimeError(f"Failed to fetch any result for query '{query}'")
+
+        async def extract(url: str, content: str) -> dict:
+            async with semaphore:
+                return await self._aextract(
+                    content,
+                    url=url,
+                    schema=schema,
+                    client=client,
+                    **extract_kwargs,
+                )
+
+        sources = await asyncio.gather(*(extract(u, c) for u, c in accepted))
+        if len(sources) == 1:
+            return sources[0]
+        return await self._ajudge(query, sources, schema, client)
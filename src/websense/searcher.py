@@ -1,20 +1,339 @@
-"""Web search functionality using DuckDuckGo."""
+"""Web search functionality with pluggable backends (DuckDuckGo by default)."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Protocol
+from urllib.parse import urlsplit, urlunsplit
 
 from ddgs import DDGS
+from ddgs.exceptions import DDGSException
+
+from .metrics import MetricsRegistry
+
+
+class SearchBackend(Protocol):
+    """Interface for search providers used by Searcher.
+
+    Backends may also define `iter_search(query, max_results, region,
+    throttle=...)` to yield results incrementally as they are produced,
+    calling `throttle()` before each request they make.
+    """
+
+    def search(self, query: str, max_results: int, region: str) -> list[dict]:
+        """Return results as dicts with title, url and description keys."""
+        ...
+
+
+class DuckDuckGoBackend:
+    """Searches the live web through DuckDuckGo."""
+
+    def __init__(self, min_interval: float = 0.5) -> None:
+        """Initialize the backend.
+
+        Args:
+            min_interval: Minimum seconds between queries Searcher should keep
+                to stay under DuckDuckGo's rate limits.
+        """
+        self.min_interval = min_interval
+        self._client = None
+
+    @property
+    def client(self) -> DDGS:
+        """Shared DDGS client, created on first use."""
+        if self._client is None:
+            self._client = DDGS()
+        return self._client
+
+    def search(self, query: str, max_results: int, region: str) -> list[dict]:
+        """Run a DuckDuckGo text search.
+
+        Args:
+            query: The search query string.
+            max_results: Maximum number of results to return.
+            region: DuckDuckGo region code (e.g., 'wt-wt', 'us-en').
+
+        Returns:
+            A list of result dictionaries.
+        """
+        results = self.client.text(query, region=region, max_results=max_results)
+        return [self._format(r) for r in results]
+
+    def iter_search(
+        self,
+        query: str,
+        max_results: int,
+        region: str,
+        page_size: int = 10,
+        throttle: Callable[[], None] | None = None,
+    ) -> Iterator[dict]:
+        """Yield DuckDuckGo results page by page as each page arrives.
+
+        Args:
+            query: The search query string.
+            max_results: Maximum number of results to yield.
+            region: DuckDuckGo region code.
+            page_size: Results requested per page.
+            throttle: Optional rate limiter called before each page request.
+
+        Yields:
+            Result dictionaries in rank order.
+        """
+        seen, page = set(), 1
+        while len(seen) < max_results:
+            if throttle:
+                throttle()
+            results = self._page(query, region, page_size, page)
+            new = [r for r in results if r.get("href") not in seen]
+            if not new:
+                return
+            for r in new[: max_results - len(seen)]:
+                seen.add(r.get("href"))
+                yield self._format(r)
+            page += 1
+
+    def _page(self, query: str, region: str, page_size: int, page: int) -> list:
+        """Request one page of results; a failing later page counts as empty."""
+        try:
+            return self.client.text(
+                query, region=region, max_results=page_size, page=page
+            )
+        except DDGSException:
+            if page == 1:
+                raise
+            return []  # No further pages
+
+    @staticmethod
+    def _format(result: dict) -> dict:
+        """Map a DDGS result to the WebSense result format."""
+        return {
+            "title": result.get("title", ""),
+            "url": result.get("href", ""),
+            "description": result.get("body", ""),
+        }
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for de-duplication (case, fragment, trailing slash)."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), path, parts.query, "")
+    )
+
+
+def merge_results(results_by_query: dict[str, list[dict]]) -> list[dict]:
+    """Merge per-query results into one list of unique URLs.
+
+    Results are interleaved by rank so each query's top hits come first, and
+    each merged result lists the queries that returned it.
+
+    Args:
+        results_by_query: Mapping of query to its search results.
+
+    Returns:
+        List of result dictionaries with an added `queries` key.
+    """
+    merged: dict[str, dict] = {}
+    for query, result in _interleave(results_by_query):
+        entry = merged.setdefault(
+            normalize_url(result["url"]), {**result, "queries": []}
+        )
+        if query not in entry["queries"]:
+            entry["queries"].append(query)
+    return list(merged.values())
+
+
+def _interleave(results_by_query: dict[str, list[dict]]) -> Iterator[tuple[str, dict]]:
+    """Yield (query, result) pairs rank by rank across the queries."""
+    depth = max((len(r) for r in results_by_query.values()), default=0)
+    for rank in range(depth):
+        for query, results in results_by_query.items():
+            if rank < len(results):
+                yield query, results[rank]
+
+
+def _unique(results: Iterable[dict]) -> list[dict]:
+    """Drop results whose normalized URL was already seen, keeping order."""
+    seen: set[str] = set()
+    unique = []
+    for result in results:
+        key = normalize_url(result["url"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(result)
+    return unique
+
+
+class SearchCache:
+    """Caches search results in memory, optionally backed by a disk tier.
+
+    The memory tier holds at most `max_entries` results, evicting the least
+    recently used; expired entries are dropped when looked up or when new
+    results are stored.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        stale_ttl: float = 0,
+        directory: str | Path | None = None,
+        max_entries: int = 1024,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds a cached result is considered fresh.
+            stale_ttl: Extra seconds a stale result may still be served while it
+                is refreshed in the background (stale-while-revalidate).
+            directory: Optional directory for the persistent disk tier.
+            max_entries: Max results kept in memory.
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[tuple, tuple[float, list[dict]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: tuple) -> Path:
+        """Return the disk tier file for a cache key."""
+        digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def _expired(self, entry: tuple[float, list[dict]], now: float) -> bool:
+        return now - entry[0] > self.ttl + self.stale_ttl
+
+    def get(self, key: tuple) -> tuple[list[dict] | None, bool]:
+        """Look up cached results.
+
+        Args:
+            key: Cache key, e.g. (query, region, max_results).
+
+        Returns:
+            A tuple of (results, fresh). Results is None on a miss or when the
+            entry is older than ttl + stale_ttl.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self.directory:
+            entry = self._read(key)
+            if entry:
+                self._store(key, entry)
+
+        if entry is None:
+            return None, False
+        age = time.time() - entry[0]
+        if age > self.ttl + self.stale_ttl:
+            self._drop(key)
+            return None, False
+        return [dict(r) for r in entry[1]], age <= self.ttl
+
+    def set(self, key: tuple, results: list[dict]) -> None:
+        """Store results for a key in memory and on disk.
+
+        Args:
+            key: Cache key, e.g. (query, region, max_results).
+            results: Search results to cache.
+        """
+        entry = (time.time(), [dict(r) for r in results])
+        self._store(key, entry)
+        if self.directory:
+            self._write(key, {"time": entry[0], "results": entry[1]})
+
+    def clear(self) -> None:
+        """Drop all cached entries, including the disk tier."""
+        with self._lock:
+            self._entries.clear()
+        if self.directory:
+            for path in self.directory.glob("*.json"):
+                path.unlink()
+
+    def _store(self, key: tuple, entry: tuple[float, list[dict]]) -> None:
+        """Add an entry to memory, pruning expired and least recently used ones."""
+        with self._lock:
+            now = time.time()
+            for old in [k for k, e in self._entries.items() if self._expired(e, now)]:
+                del self._entries[old]
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _drop(self, key: tuple) -> None:
+        """Remove an expired entry from memory and disk."""
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.directory:
+            self._path(key).unlink(missing_ok=True)
+
+    def _read(self, key: tuple) -> tuple[float, list[dict]] | None:
+        """Read an entry from the disk tier; unreadable files count as misses."""
+        try:
+            data = json.loads(self._path(key).read_text(encoding="utf-8"))
+            return data["time"], data["results"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write(self, key: tuple, data: dict) -> None:
+        """Atomically write an entry to the disk tier."""
+        path = self._path(key)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
 
 
 class Searcher:
-    """Handles web search operations using DuckDuckGo."""
+    """Handles web search operations through a pluggable backend."""
+
+    def __init__(
+        self,
+        backend: SearchBackend | None = None,
+        cache: SearchCache | None = None,
+        min_interval: float | None = None,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        """Initialize the Searcher.
+
+        Args:
+            backend: Search provider. Defaults to DuckDuckGoBackend.
+            cache: Optional SearchCache for repeated queries.
+            min_interval: Minimum seconds between backend queries. Defaults to
+                the backend's own `min_interval`, or no limit.
+            metrics: Optional registry for search latency and cache metrics.
+        """
+        self.backend = backend or DuckDuckGoBackend()
+        self.cache = cache
+        self.metrics = metrics
+        if min_interval is None:
+            min_interval = getattr(self.backend, "min_interval", 0.0)
+        self.min_interval = min_interval
+        self._next_call = 0.0
+        self._rate_lock = threading.Lock()
+        self._refreshing: set[tuple] = set()
+        self._refresh_lock = threading.Lock()
 
     def search(
         self, query: str, max_results: int = 5, region: str = "wt-wt"
     ) -> list[dict]:
         """Perform a web search and return results.
 
+        With a cache, fresh hits are returned without a query; stale hits are
+        returned immediately while a refresh runs in the background.
+
         Args:
             query: The search query string.
             max_results: Maximum number of results to return.
-            region: DuckDuckGo region code (e.g., 'wt-wt', 'us-en').
+            region: Region code (e.g., 'wt-wt', 'us-en'); backends may ignore it.
 
         Returns:
             A list of dictionaries, each containing:
@@ -25,15 +344,217 @@ class Searcher:
         Raises:
             RuntimeError: If the search fails.
         """
+        if not self.cache:
+            return self._search(query, max_results, region)
+
+        key = (query, region, max_results)
+        results, _ = self._cache_get(key)
+        if results is not None:
+            return results
+
+        results = self._search(query, max_results, region)
+        self.cache.set(key, results)
+        return results
+
+    def iter_search(
+        self, query: str, max_results: int = 5, region: str = "wt-wt"
+    ) -> Iterator[dict]:
+        """Yield search results as the backend produces them.
+
+        Results stream from the backend's `iter_search` when available. The
+        DuckDuckGo backend produces a page of results at a time, so a search
+        for at most one page (10 results) arrives all at once. With a cache,
+        the complete result list is fetched through `search` and cached
+        before any result is yielded, so a consumer that stops early still
+        fills the cache; later calls replay it.
+
+        Args:
+            query: The search query string.
+            max_results: Maximum number of results to yield.
+            region: Region code (e.g., 'wt-wt', 'us-en').
+
+        Yields:
+            Result dictionaries in rank order.
+
+        Raises:
+            RuntimeError: If the search fails.
+        """
+        stream = getattr(self.backend, "iter_search", None)
+        if self.cache or stream is None:
+            yield from self.search(query, max_results, region)
+            return
+        yield from self._stream(stream, query, max_results, region)
+
+    def _stream(
+        self, stream: Callable, query: str, max_results: int, region: str
+    ) -> Iterator[dict]:
+        """Drive a backend stream, recording the search once it ends.
+
+        A consumer that stops early still counts as a successful search.
+
+        Args:
+            stream: The backend's `iter_search` method.
+            query: The search query string.
+            max_results: Maximum number of results to yield.
+            region: Region code (e.g., 'wt-wt', 'us-en').
+
+        Yields:
+            Result dictionaries in rank order.
+
+        Raises:
+            RuntimeError: If the search fails.
+        """
+        start, outcome = time.perf_counter(), "error"
         try:
-            results = DDGS().text(query, region=region, max_results=max_results)
-            return [
-                {
-                    "title": r.get("title", ""),
-                    "url": r.get("href", ""),
-                    "description": r.get("body", ""),
-                }
-                for r in results
+            yield from stream(query, max_results, region, throttle=self._throttle)
+            outcome = "ok"
+        except GeneratorExit:
+            outcome = "ok"
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Search failed for query '{query}': {str(e)}") from e
+        finally:
+            self._record(outcome, start)
+
+    def _cache_get(self, key: tuple) -> tuple[list[dict] | None, bool]:
+        """Look up the cache, scheduling a refresh for stale hits.
+
+        Args:
+            key: Cache key (query, region, max_results).
+
+        Returns:
+            A tuple of (results, fresh) as returned by SearchCache.get.
+        """
+        results, fresh = self.cache.get(key)
+        if results is not None and not fresh:
+            self._refresh(key)
+        if self.metrics:
+            result = "miss" if results is None else "hit" if fresh else "stale"
+            self.metrics.counter(
+                "websense_search_cache_total",
+                "Search cache lookups by result (hit, stale, miss).",
+                ("result",),
+            ).inc(result=result)
+        return results, fresh
+
+    def search_many(
+        self,
+        queries: Iterable[str],
+        max_results: int = 5,
+        regions: str | Iterable[str] = "wt-wt",
+        max_workers: int = 4,
+    ) -> dict[str, list[dict]]:
+        """Run several queries concurrently through the shared backend.
+
+        Each (query, region) pair is searched once, subject to the cache and
+        the backend rate limit. Results for a query are merged across regions
+        with duplicate URLs removed; use `merge_results` to combine queries.
+
+        Args:
+            queries: Search query strings.
+            max_results: Maximum number of results per query and region.
+            regions: One region code or several to fan out over.
+            max_workers: Max concurrent searches.
+
+        Returns:
+            Mapping of each query to its de-duplicated results.
+
+        Raises:
+            RuntimeError: If any search fails.
+        """
+        queries = list(dict.fromkeys(queries))
+        regions = [regions] if isinstance(regions, str) else list(regions)
+        tasks = [(q, r) for q in queries for r in regions]
+        if not tasks:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            futures = [
+                executor.submit(self.search, q, max_results, r) for q, r in tasks
             ]
+            by_task = [f.result() for f in futures]
+
+        found: dict[str, list[dict]] = {q: [] for q in queries}
+        for (query, _), results in zip(tasks, by_task):
+            found[query].extend(results)
+        return {query: _unique(results) for query, results in found.items()}
+
+    def _throttle(self) -> None:
+        """Wait until the next backend query is allowed by min_interval."""
+        if not self.min_interval:
+            return
+        with self._rate_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_call)
+            self._next_call = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _refresh(self, key: tuple) -> None:
+        """Refresh a stale cache entry in a background thread.
+
+        Args:
+            key: Cache key of the stale entry.
+        """
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run() -> None:
+            query, region, max_results = key
+            try:
+                self.cache.set(key, self._search(query, max_results, region))
+            except RuntimeError:
+                pass  # Keep serving the stale entry until it expires
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _search(self, query: str, max_results: int, region: str) -> list[dict]:
+        """Run a live query against the backend.
+
+        Args:
+            query: The search query string.
+            max_results: Maximum number of results to return.
+            region: Region code.
+
+        Returns:
+            A list of result dictionaries.
+
+        Raises:
+            RuntimeError: If the search fails.
+        """
+        self._throttle()
+        start, outcome = time.perf_counter(), "error"
+        try:
+            results = self.backend.search(query, max_results, region)
+            outcome = "ok"
+            return results
         except Exception as e:
             raise RuntimeError(f"Search failed for query '{query}': {str(e)}") from e
+        finally:
+            self._record(outcome, start)
+
+    def _record(self, outcome: str, start: float) -> None:
+        """Record a backend query's outcome and latency.
+
+        Args:
+            outcome: "ok" or "error".
+            start: perf_counter() value taken before the query.
+        """
+        if not self.metrics:
+            return
+        backend = type(self.backend).__name__
+        self.metrics.counter(
+            "websense_search_requests_total",
+            "Backend search queries by backend and outcome.",
+            ("backend", "outcome"),
+        ).inc(backend=backend, outcome=outcome)
+        self.metrics.histogram(
+            "websense_search_duration_seconds",
+            "Backend search latency by backend.",
+            ("backend",),
+        ).observe(time.perf_counter() - start, backend=backend)
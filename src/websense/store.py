@@ -0,0 +1,431 @@
+"""Compressed, content-addressable storage for raw page bodies."""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import requests
+
+from .fetcher import Fetcher
+from .metrics import MetricsRegistry
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+ZLIB, ZSTD = 0, 1
+CODECS = {"zlib": ZLIB, "zstd": ZSTD}
+
+# Segment record: magic, codec, url length, raw length, stored length, sha256
+_RECORD = struct.Struct("<4sBIII32s")
+_RECORD_MAGIC = b"WSPG"
+# Index file: magic, capacity, used slots; then fixed-size slots
+_HEADER = struct.Struct("<8sQQ8x")
+_HEADER_MAGIC = b"WSIDX001"
+# Index slot: key digest, segment, record length, record offset
+_SLOT = struct.Struct("<16sIIQ")
+_EMPTY = bytes(16)
+_MAX_LOAD = 0.7
+
+
+@dataclass(frozen=True)
+class PageRef:
+    """Location of a stored record.
+
+    Attributes:
+        segment: Segment file number.
+        offset: Byte offset of the record in the segment.
+        length: Record length in bytes, header included.
+    """
+
+    segment: int
+    offset: int
+    length: int
+
+
+def _key(kind: str, value: str) -> bytes:
+    """Digest a namespaced index key ("u" for URLs, "c" for content hashes)."""
+    return hashlib.blake2b(f"{kind}:{value}".encode("utf-8"), digest_size=16).digest()
+
+
+class _HashIndex:
+    """Open-addressing hash table of key digest to PageRef in a mmap'd file."""
+
+    def __init__(self, path: Path, capacity: int = 1 << 14) -> None:
+        self.path = path
+        if not path.is_file():
+            self._create(path, capacity)
+        self._open()
+
+    @staticmethod
+    def _create(path: Path, capacity: int) -> None:
+        with path.open("wb") as f:
+            f.write(_HEADER.pack(_HEADER_MAGIC, capacity, 0))
+            f.truncate(_HEADER.size + capacity * _SLOT.size)
+
+    def _open(self) -> None:
+        self._file = self.path.open("r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.capacity, self.used = _HEADER.unpack_from(self._map, 0)
+        if magic != _HEADER_MAGIC:
+            raise ValueError(f"Not a page store index: {self.path}")
+
+    def close(self) -> None:
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+    def _probe(self, key: bytes) -> tuple[int, bool]:
+        """Return (slot position, found) for a key using linear probing."""
+        slot = int.from_bytes(key[:8], "little") % self.capacity
+        while True:
+            pos = _HEADER.size + slot * _SLOT.size
+            stored = self._map[pos : pos + 16]
+            if stored == key:
+                return pos, True
+            if stored == _EMPTY:
+                return pos, False
+            slot = (slot + 1) % self.capacity
+
+    def get(self, key: bytes) -> PageRef | None:
+        pos, found = self._probe(key)
+        if not found:
+            return None
+        _, segment, length, offset = _SLOT.unpack_from(self._map, pos)
+        return PageRef(segment, offset, length)
+
+    def put(self, key: bytes, ref: PageRef) -> None:
+        if (self.used + 1) / self.capacity > _MAX_LOAD:
+            self._grow()
+        pos, found = self._probe(key)
+        _SLOT.pack_into(self._map, pos, key, ref.segment, ref.length, ref.offset)
+        if not found:
+            self.used += 1
+            _HEADER.pack_into(self._map, 0, _HEADER_MAGIC, self.capacity, self.used)
+
+    def items(self) -> Iterator[tuple[bytes, PageRef]]:
+        for slot in range(self.capacity):
+            key, segment, length, offset = _SLOT.unpack_from(
+                self._map, _HEADER.size + slot * _SLOT.size
+            )
+            if key != _EMPTY:
+                yield key, PageRef(segment, offset, length)
+
+    def _grow(self) -> None:
+        """Rehash into a table twice the size and swap it in atomically."""
+        entries = list(self.items())
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        self._create(tmp, self.capacity * 2)
+        bigger = _HashIndex(tmp)
+        for key, ref in entries:
+            bigger.put(key, ref)
+        bigger.close()
+        self.close()
+        os.replace(tmp, self.path)
+        self._open()
+
+
+class PageStore:
+    """Append-only store of raw page bodies with a memory-mapped index.
+
+    Bodies are compressed (zstd when `zstandard` is installed, zlib
+    otherwise) into numbered segment files. An on-disk hash index maps both
+    URLs and SHA-256 content hashes to (segment, offset, length), so
+    identical bodies are stored once and random reads cost one lookup and
+    one decompression of a slice of the memory-mapped segment.
+
+    Pass it to `Fetcher(recorders=[store])` to keep every fetched body.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        compression: str | None = None,
+        level: int = 3,
+        segment_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        """Open (or create) a store.
+
+        Args:
+            directory: Store directory, created if missing.
+            compression: "zstd" or "zlib"; defaults to zstd when available.
+            level: Compression level.
+            segment_size: Size in bytes after which a new segment is started.
+
+        Raises:
+            ValueError: If the compression is unknown or zstd is unavailable.
+        """
+        compression = compression or ("zstd" if zstandard else "zlib")
+        if compression not in CODECS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package.")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codec = CODECS[compression]
+        self.level = level
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._maps: dict[int, mmap.mmap] = {}
+
+        segments = self.segments()
+        self._segment = segments[-1] if segments else 0
+        index_path = self.directory / "index.bin"
+        rebuild = segments and not index_path.is_file()
+        self._index = _HashIndex(index_path)
+        if rebuild:
+            self.rebuild_index()
+
+    def __enter__(self) -> "PageStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Flush the index and release memory maps."""
+        with self._lock:
+            for segment_map in self._maps.values():
+                segment_map.close()
+            self._maps.clear()
+            self._index.close()
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"segment-{segment:05d}.dat"
+
+    def segments(self) -> list[int]:
+        """Return the numbers of existing segment files, ascending."""
+        return sorted(
+            int(p.stem.split("-")[1]) for p in self.directory.glob("segment-*.dat")
+        )
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.codec == ZSTD:
+            return zstandard.ZstdCompressor(level=self.level).compress(body)
+        return zlib.compress(body, self.level)
+
+    @staticmethod
+    def _decompress(codec: int, data) -> bytes:
+        if codec == ZSTD:
+            if zstandard is None:  # pragma: no cover - optional dependency
+                raise ValueError("Reading zstd records requires 'zstandard'.")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def put(self, url: str, body: bytes) -> PageRef:
+        """Store a page body for a URL.
+
+        A body already in the store is not written again; the URL is pointed
+        at the existing record.
+
+        Args:
+            url: Page URL.
+            body: Raw response body.
+
+        Returns:
+            Location of the record holding the body.
+        """
+        digest = hashlib.sha256(body).digest()
+        content_key = _key("c", digest.hex())
+        with self._lock:
+            ref = self._index.get(content_key)
+            if ref is None:
+                ref = self._append(url, body, digest)
+                self._index.put(content_key, ref)
+            self._index.put(_key("u", url), ref)
+        return ref
+
+    def _append(self, url: str, body: bytes, digest: bytes) -> PageRef:
+        """Write a record to the current segment, rotating it when full."""
+        url_bytes = url.encode("utf-8")
+        data = self._compress(body)
+        record = (
+            _RECORD.pack(
+                _RECORD_MAGIC, self.codec, len(url_bytes), len(body), len(data), digest
+            )
+            + url_bytes
+            + data
+        )
+        path = self._segment_path(self._segment)
+        size = path.stat().st_size if path.exists() else 0
+        if size and size + len(record) > self.segment_size:
+            self._segment += 1
+            path, size = self._segment_path(self._segment), 0
+        with path.open("ab") as f:
+            f.write(record)
+        return PageRef(self._segment, size, len(record))
+
+    def record(self, response: requests.Response) -> PageRef:
+        """Store a fetched response body (the Fetcher recorder hook)."""
+        return self.put(response.url, response.content)
+
+    def _view(self, ref: PageRef) -> memoryview:
+        """Return the record bytes as a view into the mapped segment."""
+        segment_map = self._maps.get(ref.segment)
+        if segment_map is None or len(segment_map) < ref.offset + ref.length:
+            # The segment grew since it was mapped; the old map is released
+            # once readers holding views into it are done
+            with self._segment_path(ref.segment).open("rb") as f:
+                segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[ref.segment] = segment_map
+        return memoryview(segment_map)[ref.offset : ref.offset + ref.length]
+
+    def read(self, ref: PageRef) -> tuple[str, bytes]:
+        """Read the record at a location.
+
+        Args:
+            ref: Record location.
+
+        Returns:
+            (url, body) of the record.
+        """
+        with self._lock:
+            view = self._view(ref)
+        try:
+            return self._parse(view)
+        finally:
+            view.release()
+
+    def _parse(self, view: memoryview) -> tuple[str, bytes]:
+        """Decode a record from a view positioned at its header."""
+        magic, codec, url_len, _, data_len, _ = _RECORD.unpack_from(view, 0)
+        if magic != _RECORD_MAGIC:
+            raise ValueError("Corrupt page store record.")
+        start = _RECORD.size
+        url = bytes(view[start : start + url_len]).decode("utf-8")
+        data = view[start + url_len : start + url_len + data_len]
+        return url, self._decompress(codec, data)
+
+    def get(self, url: str) -> bytes | None:
+        """Return the stored body for a URL, or None.
+
+        The body can be passed straight to `Cleaner`, which accepts bytes.
+        """
+        with self._lock:
+            ref = self._index.get(_key("u", url))
+        return self.read(ref)[1] if ref else None
+
+    def get_by_hash(self, sha256: str) -> bytes | None:
+        """Return the stored body with a SHA-256 hex digest, or None."""
+        with self._lock:
+            ref = self._index.get(_key("c", sha256))
+        return self.read(ref)[1] if ref else None
+
+    def __contains__(self, url: str) -> bool:
+        """Return True if a body is stored for the URL."""
+        with self._lock:
+            return self._index.get(_key("u", url)) is not None
+
+    def iter_records(self) -> Iterator[tuple[PageRef, str, str]]:
+        """Scan record headers of all segments in write order.
+
+        Yields:
+            (ref, url, sha256 hex) per record, without decompressing bodies.
+        """
+        for segment in self.segments():
+            with self._segment_path(segment).open("rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    offset = 0
+                    while offset < len(data):
+                        magic, _, url_len, _, data_len, digest = _RECORD.unpack_from(
+                            data, offset
+                        )
+                        if magic != _RECORD_MAGIC:
+                            raise ValueError(f"Corrupt record in segment {segment}.")
+                        length = _RECORD.size + url_len + data_len
+                        start = offset + _RECORD.size
+                        url = data[start : start + url_len].decode("utf-8")
+                        yield PageRef(segment, offset, length), url, digest.hex()
+                        offset += length
+
+    def iter_pages(self) -> Iterator[tuple[str, bytes]]:
+        """Sequentially read every stored body.
+
+        Each distinct body is yielded once, with the URL it was first
+        stored under.
+
+        Yields:
+            (url, body) pairs in write order.
+        """
+        for ref, _, _ in self.iter_records():
+            yield self.read(ref)
+
+    def rebuild_index(self) -> None:
+        """Recreate the index by scanning all segments.
+
+        URLs that were only aliased to an existing body are lost, since
+        segments store each body with its first URL.
+        """
+        with self._lock:
+            self._index.close()
+            (self.directory / "index.bin").unlink(missing_ok=True)
+            self._index = _HashIndex(self.directory / "index.bin")
+        for ref, url, digest in self.iter_records():
+            with self._lock:
+                self._index.put(_key("c", digest), ref)
+                self._index.put(_key("u", url), ref)
+
+
+class StoreFetcher(Fetcher):
+    """Fetcher that serves page bodies from a PageStore instead of the network.
+
+    Stored pages are returned as 200 responses with their encoding sniffed
+    from the body, like live fetches.
+    """
+
+    def __init__(self, store: PageStore, metrics: MetricsRegistry | None = None):
+        """Serve pages from a store.
+
+        Args:
+            store: Store the pages were recorded into.
+            metrics: Optional registry for fetch metrics.
+        """
+        super().__init__(metrics=metrics)
+        self.store = store
+
+    def fetch(self, url: str) -> requests.Response:
+        """Return the stored page for a URL.
+
+        Args:
+            url: The URL to look up.
+
+        Returns:
+            A response holding the stored body.
+
+        Raises:
+            RuntimeError: If the URL is not stored.
+        """
+        start = time.perf_counter()
+        body = self.store.get(url)
+        if body is None:
+            self._record(url, "error", start)
+            raise RuntimeError(
+                f"Failed to fetch {url}: not in store {self.store.directory}"
+            )
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response._content = body
+        response.url = url
+        return self._accept(url, response, start)
+
+    async def afetch(self, url: str, client=None) -> requests.Response:
+        """Async `fetch`; store reads are local, so this does not need httpx.
+
+        Args:
+            url: The URL to look up.
+            client: Ignored; accepted for compatibility with `Fetcher.afetch`.
+
+        Returns:
+            A response holding the stored body.
+        """
+        return self.fetch(url)
@@ -0,0 +1,400 @@
+"""WARC archiving of fetched pages and offline replay through the Fetcher API."""
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator
+from urllib.parse import urljoin
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .encoding import sniff_encoding
+from .fetcher import Fetcher
+from .metrics import MetricsRegistry
+
+
+_CHUNK = 1 << 16
+_MAX_REDIRECTS = 10
+# Headers describing the wire encoding; stored bodies are already decoded
+_HOP_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+
+def _index_path(path: Path) -> Path:
+    """Return the sidecar index file of a WARC file."""
+    return path.with_name(path.name + ".idx")
+
+
+def _read_record(stream: BinaryIO) -> tuple[dict, bytes] | None:
+    """Read one WARC record from a stream positioned at its start.
+
+    Returns:
+        (headers, block), or None at the end of the stream.
+
+    Raises:
+        ValueError: If the stream does not contain a WARC record.
+    """
+    line = stream.readline()
+    while line in (b"\r\n", b"\n"):
+        line = stream.readline()
+    if not line:
+        return None
+    if not line.startswith(b"WARC/"):
+        raise ValueError(f"Not a WARC record: {line[:40]!r}")
+
+    headers = {}
+    for line in iter(stream.readline, b""):
+        line = line.rstrip(b"\r\n")
+        if not line:
+            break
+        name, _, value = line.decode("utf-8").partition(":")
+        headers[name.strip()] = value.strip()
+    block = stream.read(int(headers.get("Content-Length", 0)))
+    stream.read(4)  # trailing \r\n\r\n
+    return headers, block
+
+
+def _iter_gzip_members(f: BinaryIO) -> Iterator[tuple[int, bytes]]:
+    """Yield (offset, data) for each gzip member of a file."""
+    offset, pending = 0, f.read(_CHUNK)
+    while pending:
+        start, inflater, parts = offset, zlib.decompressobj(31), []
+        while True:
+            parts.append(inflater.decompress(pending))
+            if inflater.eof:
+                offset += len(pending) - len(inflater.unused_data)
+                pending = inflater.unused_data or f.read(_CHUNK)
+                break
+            offset += len(pending)
+            pending = f.read(_CHUNK)
+            if not pending:
+                raise ValueError("Truncated gzip member in WARC file")
+        yield start, b"".join(parts)
+
+
+def iter_records(path: str | Path) -> Iterator[tuple[int, dict, bytes]]:
+    """Iterate over the records of a WARC file.
+
+    Args:
+        path: A `.warc` file, or a `.warc.gz` file with one gzip member per
+            record.
+
+    Yields:
+        (offset, headers, block) for each record.
+    """
+    path = Path(path)
+    with path.open("rb") as f:
+        if path.suffix == ".gz":
+            for offset, data in _iter_gzip_members(f):
+                stream = io.BytesIO(data)
+                while (record := _read_record(stream)) is not None:
+                    yield offset, *record
+            return
+        while True:
+            offset = f.tell()
+            record = _read_record(f)
+            if record is None:
+                return
+            yield offset, *record
+
+
+def _read_index(sidecar: Path) -> dict[str, int]:
+    """Read a sidecar index mapping URLs to record offsets."""
+    with sidecar.open(encoding="utf-8") as f:
+        entries = (json.loads(line) for line in f if line.strip())
+        return {e["url"]: e["offset"] for e in entries}
+
+
+def _scan_index(path: Path) -> dict[str, int]:
+    """Map each response record's target URL to its offset in a WARC file."""
+    index = {}
+    for offset, headers, _ in iter_records(path):
+        if headers.get("WARC-Type") == "response" and "WARC-Target-URI" in headers:
+            index[headers["WARC-Target-URI"]] = offset
+    return index
+
+
+def _write_index(sidecar: Path, index: dict[str, int]) -> None:
+    """Write a sidecar index as JSON lines."""
+    sidecar.write_text(
+        "".join(json.dumps({"url": u, "offset": o}) + "\n" for u, o in index.items()),
+        encoding="utf-8",
+    )
+
+
+def iter_pages(path: str | Path) -> Iterator[tuple[str, bytes]]:
+    """Iterate over the pages archived in a WARC file.
+
+    Args:
+        path: A `.warc` or `.warc.gz` file.
+
+    Yields:
+        (url, body) for each successful (2xx) response record, in archive
+        order; redirects and error responses are skipped.
+    """
+    for _, headers, block in iter_records(path):
+        url = headers.get("WARC-Target-URI")
+        if headers.get("WARC-Type") != "response" or not url:
+            continue
+        response = parse_http_response(block, url)
+        if 200 <= response.status_code < 300:
+            yield url, response.content
+
+
+def parse_http_response(block: bytes, url: str = "") -> requests.Response:
+    """Rebuild a requests.Response from an archived HTTP response block.
+
+    Args:
+        block: Status line, headers and body as stored in a WARC record.
+        url: URL to set on the response.
+
+    Returns:
+        A Response whose `content` is the archived body.
+    """
+    head, _, body = block.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("iso-8859-1").split("\r\n")
+    _, status, *reason = status_line.split(" ", 2)
+
+    response = requests.Response()
+    response.status_code = int(status)
+    response.reason = reason[0] if reason else ""
+    response.headers = CaseInsensitiveDict()
+    for line in header_lines:
+        name, sep, value = line.partition(":")
+        if sep:
+            response.headers[name.strip()] = value.strip()
+    response._content = body
+    response.url = url
+    response.encoding = sniff_encoding(body, response.headers.get("Content-Type"))
+    return response
+
+
+class WarcWriter:
+    """Appends fetched responses to a WARC file.
+
+    Pass it to `Fetcher(recorders=[writer])` to archive pages as they are
+    fetched. Bodies are stored after content decoding (gzip/br removed), so
+    Content-Encoding and Transfer-Encoding headers are dropped and
+    Content-Length is rewritten. A `.gz` suffix writes one gzip member per
+    record, which keeps records individually seekable.
+
+    A sidecar `<file>.idx` (JSON lines of url and offset) is appended
+    alongside so replay does not have to rescan the archive.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Open (or create) the archive for appending.
+
+        Args:
+            path: Target `.warc` or `.warc.gz` file.
+        """
+        self.path = Path(path)
+        self.compress = self.path.suffix == ".gz"
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = self.path.open("ab")
+        self._index = _index_path(self.path).open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+        if is_new:
+            self._write(
+                "warcinfo",
+                b"software: websense\r\nformat: WARC File Format 1.1\r\n",
+                {"Content-Type": "application/warc-fields"},
+            )
+
+    def __enter__(self) -> "WarcWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the archive and its index."""
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+    def record(self, response: requests.Response) -> int:
+        """Archive a fetched response (the Fetcher recorder hook).
+
+        Redirects that led to the response are archived first, so replay can
+        follow them from the originally requested URL.
+
+        Args:
+            response: The fetched response.
+
+        Returns:
+            Offset of the final response's record in the archive.
+        """
+        for hop in response.history:
+            self.write_response(
+                hop.url, hop.status_code, hop.reason or "", hop.headers, hop.content
+            )
+        return self.write_response(
+            response.url,
+            response.status_code,
+            response.reason or "",
+            response.headers,
+            response.content,
+        )
+
+    def write_response(
+        self,
+        url: str,
+        status: int,
+        reason: str,
+        headers: dict,
+        body: bytes,
+    ) -> int:
+        """Append an HTTP response record.
+
+        Args:
+            url: Target URL.
+            status: HTTP status code.
+            reason: HTTP reason phrase.
+            headers: Response headers.
+            body: Decoded response body.
+
+        Returns:
+            Offset of the record in the archive.
+        """
+        lines = [f"HTTP/1.1 {status} {reason}".rstrip()]
+        lines += [
+            f"{name}: {value}"
+            for name, value in headers.items()
+            if name.lower() not in _HOP_HEADERS
+        ]
+        lines.append(f"Content-Length: {len(body)}")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("iso-8859-1", "replace")
+        digest = base64.b32encode(hashlib.sha1(body).digest()).decode("ascii")
+        return self._write(
+            "response",
+            head + body,
+            {
+                "WARC-Target-URI": url,
+                "Content-Type": "application/http; msgtype=response",
+                "WARC-Payload-Digest": f"sha1:{digest}",
+            },
+        )
+
+    def _write(self, kind: str, block: bytes, headers: dict) -> int:
+        """Append a record and index it if it has a target URI."""
+        date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        fields = {
+            "WARC-Type": kind,
+            "WARC-Record-ID": f"<urn:uuid:{uuid.uuid4()}>",
+            "WARC-Date": date,
+            **headers,
+            "Content-Length": str(len(block)),
+        }
+        head = "WARC/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in fields.items())
+        data = head.encode("utf-8") + b"\r\n" + block + b"\r\n\r\n"
+        if self.compress:
+            data = gzip.compress(data)
+
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(data)
+            self._file.flush()
+            if "WARC-Target-URI" in headers:
+                entry = {"url": headers["WARC-Target-URI"], "offset": offset}
+                self._index.write(json.dumps(entry) + "\n")
+                self._index.flush()
+        return offset
+
+
+class WarcReplayFetcher(Fetcher):
+    """Fetcher that serves responses from a WARC archive instead of the network.
+
+    URLs are looked up in an index of URL to record offset, loaded from the
+    `<file>.idx` sidecar when it is up to date and rebuilt by scanning the
+    archive otherwise. When a URL was archived several times, the latest
+    record wins.
+    """
+
+    def __init__(
+        self, path: str | Path, metrics: MetricsRegistry | None = None
+    ) -> None:
+        """Open an archive for replay.
+
+        Args:
+            path: A `.warc` or `.warc.gz` file.
+            metrics: Optional registry for fetch metrics.
+        """
+        super().__init__(metrics=metrics)
+        self.path = Path(path)
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict[str, int]:
+        """Read the sidecar index, or rebuild it from the archive."""
+        sidecar = _index_path(self.path)
+        if sidecar.is_file() and sidecar.stat().st_mtime >= self.path.stat().st_mtime:
+            return _read_index(sidecar)
+        index = _scan_index(self.path)
+        _write_index(sidecar, index)
+        return index
+
+    def __contains__(self, url: str) -> bool:
+        """Return True if the archive holds a response for the URL."""
+        return url in self.index
+
+    def fetch(self, url: str) -> requests.Response:
+        """Return the archived response for a URL, following archived redirects.
+
+        Args:
+            url: The URL to look up.
+
+        Returns:
+            The archived response.
+
+        Raises:
+            RuntimeError: If the URL is not archived or has an error status.
+        """
+        start = time.perf_counter()
+        history, target = [], url
+        while (response := self._load(target)) is not None:
+            if not response.is_redirect or len(history) >= _MAX_REDIRECTS:
+                break
+            history.append(response)
+            target = urljoin(target, response.headers["Location"])
+        if response is None:
+            self._record(url, "error", start)
+            raise RuntimeError(f"Failed to fetch {target}: not in archive {self.path}")
+
+        response.history = history
+        self._record(url, response.status_code, start, response)
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"Failed to fetch {url}: {response.status_code} {response.reason}"
+            )
+        return response
+
+    async def afetch(self, url: str, client=None) -> requests.Response:
+        """Async `fetch`; archive reads are local, so this does not need httpx.
+
+        Args:
+            url: The URL to look up.
+            client: Ignored; accepted for compatibility with `Fetcher.afetch`.
+
+        Returns:
+            The archived response.
+        """
+        return self.fetch(url)
+
+    def _load(self, url: str) -> requests.Response | None:
+        """Read the archived response for a URL, or None if there is none."""
+        offset = self.index.get(url)
+        if offset is None:
+            return None
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            stream = gzip.GzipFile(fileobj=f) if self.path.suffix == ".gz" else f
+            _, block = _read_record(stream)
+        return parse_http_response(block, url)
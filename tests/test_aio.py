@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from ask2api import Config
+from unittest.mock import patch
+from websense.aio import (
+    agenerate_api_response,
+    async_client,
+    require_httpx,
+    to_response,
+)
+
+
+SCHEMA = {"type": "object", "properties": {"title": {"type": "string"}}}
+
+
+def run_with(handler, coro_fn):
+    """Run coro_fn(client) against a mock transport."""
+
+    async def main():
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await coro_fn(client)
+
+    return asyncio.run(main())
+
+
+class TestToResponse:
+    def test_converts_fields_and_history(self):
+        request = httpx.Request("GET", "http://example.com/final")
+        hop = httpx.Response(
+            301,
+            headers={"Location": "/final"},
+            request=httpx.Request("GET", "http://example.com/"),
+        )
+        response = httpx.Response(
+            200,
+            headers={"Content-Type": "text/html"},
+            content=b"<p>hi</p>",
+            request=request,
+            history=[hop],
+        )
+
+        converted = to_response(response)
+
+        assert converted.status_code == 200
+        assert converted.reason == "OK"
+        assert converted.headers["content-type"] == "text/html"
+        assert converted.content == b"<p>hi</p>"
+        assert converted.url == "http://example.com/final"
+        assert converted.history[0].status_code == 301
+        assert converted.history[0].url == "http://example.com/"
+
+
+class TestAsyncClient:
+    def test_limits(self):
+        client = async_client(max_connections=5, timeout=3)
+        assert client.timeout.read == 3
+        asyncio.run(client.aclose())
+
+    def test_require_httpx_missing(self):
+        with patch("websense.aio.httpx", None):
+            with pytest.raises(RuntimeError, match="websense\\[async\\]"):
+                require_httpx()
+
+
+class TestAgenerateApiResponse:
+    def test_openai(self):
+        config = Config(api_key="key", model="gpt-test")
+        seen = {}
+
+        def handler(request):
+            seen["url"] = str(request.url)
+            seen["payload"] = json.loads(request.content)
+            seen["auth"] = request.headers["Authorization"]
+            message = {"content": json.dumps({"title": "Hello"})}
+            return httpx.Response(200, json={"choices": [{"message": message}]})
+
+        result = run_with(
+            handler,
+            lambda client: agenerate_api_response("prompt", SCHEMA, config, client),
+        )
+
+        assert result == {"title": "Hello"}
+        assert seen["url"] == config.url
+        assert seen["auth"] == "Bearer key"
+        assert seen["payload"]["model"] == "gpt-test"
+
+    def test_anthropic(self):
+        config = Config(api_key="key", provider="anthropic")
+
+        def handler(request):
+            block = {"type": "tool_use", "name": "format_response", "input": {"a": 1}}
+            return httpx.Response(200, json={"content": [block]})
+
+        result = run_with(
+            handler,
+            lambda client: agenerate_api_response("prompt", SCHEMA, config, client),
+        )
+
+        assert result == {"a": 1}
+
+    def test_anthropic_error_body(self):
+        config = Config(api_key="key", provider="anthropic")
+
+        def handler(request):
+            return httpx.Response(200, json={"error": "overloaded"})
+
+        with pytest.raises(ValueError, match="overloaded"):
+            run_with(
+                handler,
+                lambda client: agenerate_api_response("p", SCHEMA, config, client),
+            )
+
+    def test_http_error(self):
+        config = Config(api_key="key")
+
+        def handler(request):
+            return httpx.Response(500)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            run_with(
+                handler,
+                lambda client: agenerate_api_response("p", SCHEMA, config, client),
+            )
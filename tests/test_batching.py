@@ -0,0 +1,212 @@
+"""Unit tests for cross-page extraction batching."""
+
+import re
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from websense.batching import ExtractionBatcher, batch_schema
+from websense.schema import compile_schema
+
+
+SCHEMA = {"type": "object", "properties": {"title": {"type": "string"}}}
+
+
+def _answer(content, schema, prompt=None, truncate=True):
+    """Fake LLM: echo each page (or the single content) as its title."""
+    schema = compile_schema(schema).schema
+    if "results" not in schema.get("properties", {}):
+        return {"title": content}
+    pages = re.findall(r"### Page (\d+)\n(.*)", content)
+    return {"results": [{"index": int(i), "data": {"title": t}} for i, t in pages]}
+
+
+@pytest.fixture
+def parser():
+    return MagicMock(extract=MagicMock(side_effect=_answer))
+
+
+class TestBatchSchema:
+    def test_wraps_schema(self):
+        wrapped = batch_schema(SCHEMA)
+        item = wrapped["properties"]["results"]["items"]
+        assert item["properties"]["data"] is SCHEMA
+        assert item["required"] == ["index", "data"]
+
+
+class TestExtractionBatcher:
+    def test_flushes_full_batch(self, parser):
+        batcher = ExtractionBatcher(parser, max_batch=3, max_wait=10)
+        futures = [batcher.submit(f"page {i}", SCHEMA) for i in range(3)]
+
+        assert [f.result(timeout=1) for f in futures] == [
+            {"title": f"page {i}"} for i in range(3)
+        ]
+        parser.extract.assert_called_once()
+        _, kwargs = parser.extract.call_args
+        assert kwargs["truncate"] is False
+        assert "3 separate pages" in kwargs["prompt"]
+        assert batcher.batches == 1
+
+    def test_flushes_after_max_wait(self, parser):
+        batcher = ExtractionBatcher(parser, max_batch=10, max_wait=0.01)
+        futures = [batcher.submit(f"page {i}", SCHEMA) for i in range(2)]
+
+        assert futures[1].result(timeout=2) == {"title": "page 1"}
+        assert parser.extract.call_count == 1
+
+    def test_flushes_on_char_budget(self, parser):
+        batcher = ExtractionBatcher(parser, max_batch=10, max_chars=12, max_wait=10)
+        first = batcher.submit("aaaaaa", SCHEMA)
+        second = batcher.submit("bbbbbbb", SCHEMA)
+
+        assert first.result(timeout=1) == {"title": "aaaaaa"}
+        assert not second.done()
+        batcher.flush()
+        assert second.result() == {"title": "bbbbbbb"}
+
+    def test_large_page_extracted_alone(self, parser):
+        batcher = ExtractionBatcher(parser, max_chars=5)
+        assert batcher.extract("long page", example={"title": "x"}) == {
+            "title": "long page"
+        }
+
+    def test_groups_by_schema(self, parser):
+        other = {"type": "object", "properties": {"name": {"type": "string"}}}
+        with ExtractionBatcher(parser, max_wait=10) as batcher:
+            a = batcher.submit("a", SCHEMA)
+            b = batcher.submit("b", other)
+
+        assert a.result() == {"title": "a"}
+        assert b.result() == {"title": "b"}
+        assert parser.extract.call_count == 2
+        assert batcher.batches == 0
+
+    def test_groups_equal_schemas_regardless_of_key_order(self, parser):
+        reordered = {"properties": {"title": {"type": "string"}}, "type": "object"}
+        with ExtractionBatcher(parser, max_wait=10) as batcher:
+            batcher.submit("a", SCHEMA)
+            batcher.submit("b", reordered)
+            batcher.submit("c", SCHEMA)
+        with ExtractionBatcher(parser, max_wait=10) as batcher:
+            batcher.submit("d", SCHEMA)
+            batcher.submit("e", SCHEMA)
+
+        assert batcher.batches == 1
+        first, second = (c.kwargs["schema"] for c in parser.extract.call_args_list)
+        assert first is second
+
+    def test_falls_back_for_missing_results(self, parser):
+        parser.extract.side_effect = [
+            {"results": [{"index": 1, "data": {"title": "batched"}}, "junk"]},
+            {"title": "single"},
+        ]
+        with ExtractionBatcher(parser, max_wait=10) as batcher:
+            first, second = batcher.submit("a", SCHEMA), batcher.submit("b", SCHEMA)
+
+        assert first.result() == {"title": "single"}
+        assert second.result() == {"title": "batched"}
+        assert batcher.fallbacks == 1
+
+    def test_falls_back_for_invalid_results(self, parser):
+        parser.extract.side_effect = [
+            {"results": [{"index": 0, "data": {"title": 5}}]},
+            {"title": "single"},
+            {"title": "other"},
+        ]
+        with ExtractionBatcher(parser, max_wait=10) as batcher:
+            first, second = batcher.submit("a", SCHEMA), batcher.submit("b", SCHEMA)
+
+        assert first.result() == {"title": "single"}
+        assert second.result() == {"title": "other"}
+        assert batcher.fallbacks == 2
+
+    def test_accepts_empty_required_fields(self, parser):
+        schema = compile_schema(example={"title": "x", "tags": ["x"]}).schema
+        assert schema["required"] == ["title", "tags"]
+        parser.extract.side_effect = [
+            {
+                "results": [
+                    {"index": i, "data": {"title": f"t{i}", "tags": []}}
+                    for i in range(3)
+                ]
+            }
+        ]
+        with ExtractionBatcher(parser, max_wait=10) as batcher:
+            futures = [batcher.submit(p, schema) for p in "abc"]
+
+        assert [f.result()["title"] for f in futures] == ["t0", "t1", "t2"]
+        parser.extract.assert_called_once()
+        assert batcher.fallbacks == 0
+
+    def test_falls_back_for_duplicate_indices(self, parser):
+        parser.extract.side_effect = [
+            {
+                "results": [
+                    {"index": 0, "data": {"title": "one"}},
+                    {"index": 0, "data": {"title": "two"}},
+                    {"index": 1, "data": {"title": "batched"}},
+                ]
+            },
+            {"title": "single"},
+        ]
+        with ExtractionBatcher(parser, max_wait=10) as batcher:
+            first, second = batcher.submit("a", SCHEMA), batcher.submit("b", SCHEMA)
+
+        assert first.result() == {"title": "single"}
+        assert second.result() == {"title": "batched"}
+        assert batcher.fallbacks == 1
+
+    def test_falls_back_when_answer_is_unparseable(self, parser):
+        parser.extract.side_effect = [
+            ValueError("bad JSON"),
+            {"title": "a"},
+            RuntimeError("bad page"),
+        ]
+        with ExtractionBatcher(parser, max_wait=10) as batcher:
+            first, second = batcher.submit("a", SCHEMA), batcher.submit("b", SCHEMA)
+
+        assert first.result() == {"title": "a"}
+        with pytest.raises(RuntimeError, match="bad page"):
+            second.result()
+        assert batcher.fallbacks == 2
+
+    def test_call_errors_reach_every_future(self, parser):
+        error = requests.HTTPError("429 Too Many Requests")
+        parser.extract.side_effect = error
+        with ExtractionBatcher(parser, max_wait=10) as batcher:
+            futures = [batcher.submit(p, SCHEMA) for p in "abc"]
+
+        assert all(f.exception() is error for f in futures)
+        parser.extract.assert_called_once()
+        assert batcher.fallbacks == 0
+
+    def test_calls_run_off_the_submitting_thread(self, parser):
+        threads = []
+        parser.extract.side_effect = lambda *a, **kw: (
+            threads.append(threading.current_thread()) or _answer(*a, **kw)
+        )
+        with ExtractionBatcher(parser, max_batch=2, max_chars=5) as batcher:
+            batcher.submit("a", SCHEMA)
+            batcher.submit("b", SCHEMA)
+            batcher.submit("long page", SCHEMA)
+
+        assert len(threads) == 2
+        assert threading.current_thread() not in threads
+
+    def test_requires_schema(self, parser):
+        with pytest.raises(ValueError, match="schema or a JSON example"):
+            ExtractionBatcher(parser).submit("a")
+
+    def test_timer_after_flush_is_noop(self, parser):
+        batcher = ExtractionBatcher(parser, max_wait=0.01)
+        future = batcher.submit("a", SCHEMA)
+        batcher.flush()
+        time.sleep(0.05)
+        batcher._flush_key("missing")
+
+        assert future.result() == {"title": "a"}
+        parser.extract.assert_called_once()
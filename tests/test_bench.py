@@ -0,0 +1,219 @@
+"""Unit tests for the offline benchmark harness."""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from websense.bench import (
+    BENCH_EXAMPLE,
+    BenchResult,
+    CorpusServer,
+    StubLLM,
+    compare,
+    load_corpus,
+    load_report,
+    peak_rss_mb,
+    record_corpus,
+    reset_peak_rss,
+    run_bench,
+    run_workload,
+    save_report,
+    synthetic_corpus,
+    synthetic_page,
+)
+from ask2api import convert_example_to_schema
+
+
+class TestCorpus:
+    def test_synthetic_page_is_deterministic(self):
+        assert synthetic_page(3) == synthetic_page(3)
+        assert synthetic_page(3) != synthetic_page(4)
+        assert synthetic_page(3, seed=1) != synthetic_page(3)
+        assert "<title>" in synthetic_page(0)
+
+    def test_synthetic_corpus(self):
+        corpus = synthetic_corpus(pages=3)
+        assert list(corpus) == ["page-0000.html", "page-0001.html", "page-0002.html"]
+        assert all(isinstance(html, bytes) for html in corpus.values())
+
+    def test_load_corpus(self, tmp_path):
+        (tmp_path / "b.html").write_bytes(b"<p>b</p>")
+        (tmp_path / "a.html").write_bytes(b"<p>a</p>")
+        (tmp_path / "notes.txt").write_text("skip")
+
+        corpus = load_corpus(tmp_path)
+
+        assert corpus == {"a.html": b"<p>a</p>", "b.html": b"<p>b</p>"}
+
+    def test_load_corpus_empty(self, tmp_path):
+        with pytest.raises(ValueError, match="No .html files"):
+            load_corpus(tmp_path)
+
+    def test_record_corpus(self, tmp_path):
+        fetcher = MagicMock()
+        fetcher.fetch.return_value.content = b"<p>recorded</p>"
+
+        paths = record_corpus(
+            ["https://a.com", "https://b.com"], tmp_path / "c", fetcher
+        )
+
+        assert len(paths) == 2
+        assert paths[0] != paths[1]
+        assert paths[0].read_bytes() == b"<p>recorded</p>"
+        assert load_corpus(tmp_path / "c").keys() == {p.name for p in paths}
+
+
+class TestCorpusServer:
+    def test_serves_pages(self):
+        with CorpusServer({"a.html": b"<p>a</p>"}) as server:
+            session = requests.Session()
+            session.trust_env = False
+            response = session.get(server.url("a.html"), timeout=5)
+            missing = session.get(server.url("missing.html"), timeout=5)
+
+        assert response.content == b"<p>a</p>"
+        assert response.headers["Content-Type"].startswith("text/html")
+        assert missing.status_code == 404
+        assert server.urls == [server.url("a.html")]
+
+
+class TestStubLLM:
+    def test_returns_schema_shaped_data(self):
+        llm = StubLLM()
+        schema = convert_example_to_schema(BENCH_EXAMPLE)
+
+        result = llm("prompt", schema, None)
+
+        assert set(result) == set(BENCH_EXAMPLE)
+        assert isinstance(result["title"], str)
+        assert isinstance(result["price"], float)
+        assert isinstance(result["in_stock"], bool)
+        assert isinstance(result["tags"], list)
+        assert llm("prompt", schema, None) == result
+        assert llm("other", schema, None) != result
+        assert llm.calls == 3
+
+    def test_integer_and_nested(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer"},
+                "meta": {"type": "object", "properties": {"a": {"type": "string"}}},
+            },
+        }
+        result = StubLLM()("p", schema, None)
+        assert isinstance(result["count"], int)
+        assert set(result["meta"]) == {"a"}
+
+    def test_latency(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr("websense.bench.time.sleep", sleeps.append)
+        StubLLM(latency=0.25)("p", {"type": "string"}, None)
+        assert sleeps == [0.25]
+
+
+class TestRunWorkload:
+    @pytest.fixture
+    def server(self):
+        with CorpusServer(synthetic_corpus(pages=4)) as server:
+            yield server
+
+    @pytest.mark.parametrize(
+        "workload, stages",
+        [
+            ("content", {"fetch", "clean"}),
+            ("scrape", {"fetch", "clean", "extract"}),
+            ("search-scrape", {"search", "fetch", "clean", "extract", "judge"}),
+        ],
+    )
+    def test_workloads(self, server, workload, stages):
+        result = run_workload(workload, server)
+
+        assert result.workload == workload
+        assert result.items == 4
+        assert result.errors == 0
+        assert result.throughput > 0
+        assert result.peak_rss_mb > 0
+        assert set(result.stages) == stages
+        assert {"p50", "p95", "p99"} <= set(result.stages["fetch"])
+
+    def test_repeat_and_errors(self):
+        corpus = {"a.html": b"<p>a</p>"}
+        with CorpusServer(corpus) as server:
+            # The handler still serves the original pages, so this URL 404s
+            server.pages = {"missing.html": b""}
+            result = run_workload("content", server, repeat=2)
+
+        assert result.items == 2
+        assert result.errors == 2
+
+    def test_unexpected_errors_are_counted(self, server, monkeypatch):
+        monkeypatch.setattr(
+            "websense.bench.Scraper.get_content", MagicMock(side_effect=KeyError("x"))
+        )
+        result = run_workload("content", server)
+
+        assert result.items == result.errors == 4
+
+    def test_unknown_workload(self, server):
+        with pytest.raises(ValueError, match="Unknown workload"):
+            run_workload("crawl", server)
+
+
+class TestReports:
+    def test_run_bench(self):
+        report = run_bench(("content",), synthetic_corpus(pages=2))
+
+        assert report["pages"] == 2
+        assert list(report["workloads"]) == ["content"]
+        assert report["workloads"]["content"]["items"] == 2
+
+    def test_save_and_load(self, tmp_path):
+        report = {"workloads": {"content": BenchResult("content").to_dict()}}
+        save_report(report, tmp_path / "r.json")
+        assert load_report(tmp_path / "r.json") == report
+
+    def test_compare(self):
+        def report(throughput, p95):
+            return {
+                "workloads": {
+                    "scrape": {
+                        "throughput": throughput,
+                        "stages": {"clean": {"p95": p95}},
+                    }
+                }
+            }
+
+        baseline = report(10.0, 0.010)
+        assert compare(report(9.0, 0.011), baseline) == []
+        assert compare(report(10.0, 0.010), {"workloads": {}}) == []
+
+        regressions = compare(report(7.0, 0.020), baseline)
+        assert len(regressions) == 2
+        assert regressions[0].startswith("scrape: throughput 7.00/s")
+        assert "clean p95 20.0ms" in regressions[1]
+
+
+class TestPeakRss:
+    def test_reset_per_block(self):
+        if not reset_peak_rss():
+            pytest.skip("peak RSS cannot be reset on this platform")
+        data = b"x" * 64 * 1024**2
+        first = peak_rss_mb()
+        del data
+        reset_peak_rss()
+
+        assert peak_rss_mb() < first - 32
+
+    def test_falls_back_to_getrusage(self, monkeypatch):
+        def unavailable(*args, **kwargs):
+            raise OSError("no procfs")
+
+        monkeypatch.setattr("websense.bench.Path.read_text", unavailable)
+        monkeypatch.setattr("websense.bench.Path.write_text", unavailable)
+
+        assert reset_peak_rss() is False
+        assert peak_rss_mb() > 0
+        monkeypatch.setattr("websense.bench.sys.platform", "darwin")
+        assert peak_rss_mb() < 1
@@ -0,0 +1,113 @@
+"""Unit tests for per-domain boilerplate learning."""
+
+import pytest
+from bs4 import BeautifulSoup
+
+from websense.boilerplate import BoilerplateModel, domain_of
+
+
+MENU = (
+    "<div class='menu'><a href='/'>Home</a> <a href='/shop'>Shop all products</a></div>"
+)
+FOOTER = "<div class='foot'>Copyright 2024 Example Shop Ltd. All rights reserved.</div>"
+
+
+def _page(body):
+    return BeautifulSoup(f"<body>{MENU}<div>{body}</div>{FOOTER}</body>", "html.parser")
+
+
+def _text(soup):
+    return soup.get_text(" ", strip=True)
+
+
+class TestDomainOf:
+    def test_strips_www_and_case(self):
+        assert domain_of("https://WWW.Example.com/a") == "example.com"
+        assert domain_of("not a url") == ""
+
+
+class TestBoilerplateModel:
+    def test_removes_blocks_repeated_across_pages(self):
+        model = BoilerplateModel(min_pages=3)
+        for i in range(2):
+            soup = _page(f"<p>Unique product description number {i}.</p>")
+            assert model.strip(f"https://shop.com/p/{i}", soup) == 0
+            assert "Copyright" in _text(soup)
+
+        soup = _page("<p>Unique product description number 2.</p><p>Price</p>")
+        removed = model.strip("https://www.shop.com/p/2", soup)
+
+        assert removed == 2
+        assert _text(soup) == "Unique product description number 2. Price"
+
+    def test_domains_are_separate(self):
+        model = BoilerplateModel(min_pages=2)
+        model.learn("https://a.com/1", _page("<p>First page of site a here.</p>"))
+        model.learn("https://a.com/2", _page("<p>Second page of site a here.</p>"))
+
+        soup = _page("<p>Only page of site b here.</p>")
+        assert model.strip("https://b.com/1", soup) == 0
+        assert model.domains["a.com"]["pages"] == 2
+
+    def test_counts_each_url_once(self):
+        model = BoilerplateModel(min_pages=2)
+
+        assert model.learn("https://a.com/1", _page("<p>First page body text.</p>"))
+        assert not model.learn("https://a.com/1", _page("<p>First page body.</p>"))
+        for _ in range(3):
+            soup = _page("<p>First page body text.</p>")
+            assert model.strip("https://a.com/1", soup) == 0
+            assert "Copyright" in _text(soup)
+        assert model.domains["a.com"]["pages"] == 1
+
+    def test_evicts_oldest_urls(self):
+        model = BoilerplateModel(max_blocks=2)
+        for i in range(3):
+            model.learn(f"https://a.com/{i}", _page(f"<p>Body of page {i} here.</p>"))
+
+        assert len(model.domains["a.com"]["seen"]) == 2
+        assert model.learn("https://a.com/0", _page("<p>Body of page 0 here.</p>"))
+
+    def test_threshold(self):
+        model = BoilerplateModel(threshold=1.0, min_pages=2)
+        model.learn("https://a.com/1", _page("<p>Page one body content text.</p>"))
+        model.learn("https://a.com/2", BeautifulSoup("<p>Bare page</p>", "html.parser"))
+
+        soup = _page("<p>Page three body content text.</p>")
+        model.strip("https://a.com/3", soup)
+        assert "Copyright" in _text(soup)
+
+    def test_nested_blocks_removed_once(self):
+        model = BoilerplateModel(min_pages=1)
+        html = "<div><ul><li>Long repeated navigation entry</li></ul></div>"
+        soup = BeautifulSoup(html, "html.parser")
+
+        assert model.strip("https://a.com/", soup) == 1
+        assert _text(soup) == ""
+
+    def test_evicts_rare_blocks(self):
+        model = BoilerplateModel(max_blocks=2, min_pages=1)
+        model.learn("https://a.com/1", _page("<p>Page one has its own text.</p>"))
+        model.learn("https://a.com/2", _page("<p>Page two has its own text.</p>"))
+
+        assert len(model.domains["a.com"]["blocks"]) == 2
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "boilerplate.json"
+        with BoilerplateModel(path, min_pages=1) as model:
+            model.learn("https://a.com/1", _page("<p>Some page body text here.</p>"))
+
+        reloaded = BoilerplateModel(path, min_pages=1)
+        soup = _page("<p>Another page body text here.</p>")
+        reloaded.strip("https://a.com/2", soup)
+
+        assert _text(soup) == "Another page body text here."
+        assert reloaded.domains["a.com"]["pages"] == 2
+
+    def test_save_without_path(self):
+        with pytest.raises(ValueError, match="No path"):
+            BoilerplateModel().save()
+
+    def test_invalid_threshold(self):
+        with pytest.raises(ValueError, match="threshold"):
+            BoilerplateModel(threshold=0)
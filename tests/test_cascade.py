@@ -0,0 +1,123 @@
+import pytest
+from ask2api import Config
+from websense.cascade import ModelCascade
+from websense.metrics import MetricsRegistry
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"title": {"type": "string"}, "price": {"type": "number"}},
+    "required": ["title", "price"],
+}
+
+
+def drive(cascade, answers, base=None):
+    """Run a plan, answering each request in turn; return (result, requests)."""
+    base = base or Config(api_key="key", model="base")
+    plan = cascade.plan(SCHEMA, base)
+    requests, answers = [], iter(answers)
+    request = next(plan)
+    while True:
+        requests.append(request)
+        try:
+            request = plan.send(next(answers))
+        except StopIteration as stop:
+            return stop.value, requests
+
+
+class TestModelCascade:
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="two models"):
+            ModelCascade(["cheap"])
+        with pytest.raises(ValueError, match="escalation mode"):
+            ModelCascade(["cheap", "strong"], escalate="sometimes")
+
+    def test_configs(self):
+        strong = Config(api_key="other", provider="anthropic")
+        configs = ModelCascade(["cheap", strong]).configs(
+            Config(api_key="key", model="base")
+        )
+        assert configs[0].model == "cheap"
+        assert configs[0].api_key == "key"
+        assert configs[1] is strong
+
+    def test_valid_first_answer_stops(self):
+        cascade = ModelCascade(["cheap", "strong"])
+        result, requests = drive(cascade, [{"title": "T", "price": 1}])
+
+        assert result == {"title": "T", "price": 1}
+        assert [c.model for c, _ in requests] == ["cheap"]
+        assert cascade.stats == {"pages": 1, "escalations": 0, "escalated_pages": 0}
+        assert cascade.escalation_rate == 0
+
+    def test_escalates_failing_fields_only(self):
+        metrics = MetricsRegistry()
+        cascade = ModelCascade(["cheap", "strong"], metrics=metrics)
+        result, requests = drive(
+            cascade, [{"title": "T", "price": None}, {"price": 9.5, "title": "X"}]
+        )
+
+        assert result == {"title": "T", "price": 9.5}
+        config, schema = requests[1]
+        assert config.model == "strong"
+        assert list(schema["properties"]) == ["price"]
+        assert cascade.escalation_rate == 1
+        escalations = metrics.get("websense_llm_escalations_total")
+        assert escalations.value(model="strong", mode="fields") == 1
+
+    def test_escalates_whole_page(self):
+        cascade = ModelCascade(["cheap", "mid", "strong"], escalate="page")
+        result, requests = drive(
+            cascade, [{"title": ""}, {"title": "T"}, {"title": "T", "price": 2}]
+        )
+
+        assert result == {"title": "T", "price": 2}
+        assert [s for _, s in requests] == [SCHEMA] * 3
+        assert cascade.stats["escalations"] == 2
+
+    def test_unparsable_answer_escalates_page(self):
+        cascade = ModelCascade(["cheap", "strong"])
+        result, requests = drive(
+            cascade, [ValueError("bad json"), {"title": "T", "price": 1}]
+        )
+
+        assert result == {"title": "T", "price": 1}
+        assert requests[1][1] is SCHEMA
+
+    def test_failed_field_answer_keeps_result(self):
+        cascade = ModelCascade(["cheap", "strong"])
+        result, _ = drive(cascade, [{"title": "T", "price": None}, KeyError("x")])
+
+        assert result == {"title": "T", "price": None}
+
+    def test_field_answer_merges_only_present_valid_values(self):
+        cascade = ModelCascade(["cheap", "mid", "strong"])
+        result, requests = drive(
+            cascade,
+            [
+                {"title": "", "price": "cheap"},
+                {"title": None, "price": "nine"},
+                {"title": "T", "price": 9.5},
+            ],
+        )
+
+        assert result == {"title": "T", "price": 9.5}
+        assert list(requests[2][1]["properties"]) == ["title", "price"]
+
+    def test_invalid_field_answer_keeps_earlier_value(self):
+        cascade = ModelCascade(["cheap", "strong"])
+        result, _ = drive(cascade, [{"title": "T", "price": "x"}, {"price": None}])
+
+        assert result == {"title": "T", "price": "x"}
+
+    def test_last_model_error_is_raised(self):
+        cascade = ModelCascade(["cheap", "strong"])
+        with pytest.raises(ValueError, match="still bad"):
+            drive(cascade, [ValueError("bad"), ValueError("still bad")])
+
+    def test_returns_last_answer_when_still_invalid(self):
+        cascade = ModelCascade(["cheap", "strong"], escalate="page")
+        result, _ = drive(cascade, [{"title": "T"}, {"title": "U"}])
+
+        assert result == {"title": "U"}
+        assert cascade.stats["escalated_pages"] == 1
@@ -1,4 +1,10 @@
+from unittest.mock import patch
+
+import pytest
+
+from websense.boilerplate import BoilerplateModel
 from websense.cleaner import Cleaner
+from websense.metrics import MetricsRegistry
 
 
 class TestCleaner:
@@ -122,3 +128,178 @@ class TestCleaner:
         cleaner = Cleaner()
         result = cleaner.to_markdown("")
         assert result.strip() == ""
+
+    def test_to_markdown_bytes_with_encoding(self):
+        cleaner = Cleaner()
+        html = "<h1>Straße</h1>".encode("cp1252")
+        assert cleaner.to_markdown(html, "cp1252").strip() == "# Straße"
+
+    def test_to_text_bytes_sniffs_encoding(self):
+        cleaner = Cleaner()
+        html = '<meta charset="windows-1252"><p>Café</p>'.encode("cp1252")
+        assert cleaner.to_text(html) == "Café"
+
+    def test_to_compact_markdown(self):
+        html = '<p><b>Hi</b> <a href="/a?utm_source=x">there</a><img src="i.png"></p>'
+        assert Cleaner().to_compact_markdown(html) == "Hi [there][1]\n\n[1]: /a"
+
+    def test_unknown_compact_link_mode(self):
+        with pytest.raises(ValueError, match="Unknown link mode"):
+            Cleaner(compact_links="inline")
+
+    def test_boilerplate_removed_with_url(self):
+        menu = "<div>Home | Products | About us | Contact</div>"
+        cleaner = Cleaner(boilerplate=BoilerplateModel(min_pages=2))
+        cleaner.to_text(f"{menu}<p>First</p>", url="https://a.com/1")
+
+        assert (
+            cleaner.to_text(f"{menu}<p>Second</p>")
+            == "Home | Products | About us | Contact\nSecond"
+        )
+        assert (
+            cleaner.to_text(f"{menu}<p>Second</p>", url="https://a.com/2") == "Second"
+        )
+
+    def test_boilerplate_stable_across_repeated_cleans(self):
+        html = "<div>Home | Products | About us | Contact</div><p>Body</p>"
+        cleaner = Cleaner(boilerplate=BoilerplateModel(min_pages=2))
+
+        results = [cleaner.to_text(html, url="https://a.com/1") for _ in range(4)]
+        markdown = cleaner.to_markdown(html, url="https://a.com/1")
+
+        assert set(results) == {"Home | Products | About us | Contact\nBody"}
+        assert "Home | Products" in markdown
+        assert cleaner.boilerplate.domains["a.com"]["pages"] == 1
+
+    def test_boilerplate_requires_in_process_cleaning(self):
+        with pytest.raises(ValueError, match="in-process"):
+            Cleaner(processes=2, boilerplate=BoilerplateModel())
+
+    def test_records_metrics(self):
+        metrics = MetricsRegistry()
+        cleaner = Cleaner(metrics=metrics)
+        html = "<p>Hello <b>World</b></p>"
+
+        text = cleaner.to_text(html)
+        markdown = cleaner.to_markdown(html)
+
+        duration = metrics.get("websense_clean_duration_seconds")
+        assert duration.count(format="text") == 1
+        assert duration.count(format="markdown") == 1
+        chars = metrics.get("websense_clean_chars_total")
+        assert chars.value(format="text", direction="in") == len(html)
+        assert chars.value(format="markdown", direction="out") == len(markdown)
+        assert chars.value(format="text", direction="out") == len(text)
+
+
+class TestCleanerPool:
+    PAGES = [
+        "<h1>One</h1><script>x()</script><p>first</p>",
+        "<h1>Café</h1>".encode("cp1252"),
+        "<nav>Menu</nav><p>third <a href='/a'>link</a></p>",
+    ]
+
+    def test_map_matches_serial(self):
+        serial = Cleaner()
+        encodings = [None, "cp1252", None]
+        with Cleaner(processes=2) as pooled:
+            for fmt in ("text", "markdown", "compact"):
+                expected = serial.map(self.PAGES, fmt, encodings)
+                assert pooled.map(self.PAGES, fmt, encodings, chunksize=2) == expected
+            assert pooled.to_markdown(self.PAGES[0]) == serial.to_markdown(
+                self.PAGES[0]
+            )
+        assert pooled._pool is None
+
+    def test_pool_records_metrics(self):
+        metrics = MetricsRegistry()
+        with Cleaner(metrics=metrics, processes=1) as cleaner:
+            assert cleaner.to_text("<p>Hi</p>") == "Hi"
+        assert metrics.get("websense_clean_duration_seconds").count(format="text") == 1
+
+    def test_map_unknown_format(self):
+        with pytest.raises(ValueError, match="Unknown format"):
+            Cleaner().map(["<p>a</p>"], fmt="html")
+
+    def test_pool_is_lazy(self):
+        cleaner = Cleaner(processes=2)
+        cleaner.close()
+        assert cleaner._pool is None
+
+
+class TestCleanedPage:
+    HTML = """
+    <html lang="en">
+        <head>
+            <title> Product page </title>
+            <meta name="Description" content=" A product ">
+            <meta property="og:type" content="product">
+            <meta name="description" content="ignored duplicate">
+            <meta charset="utf-8">
+        </head>
+        <body>
+            <nav><a href="/menu">Menu</a></nav>
+            <h1>Widget</h1>
+            <p>See <a href="/specs">specs</a> and <a href="/specs">again</a>.</p>
+            <p><a href="#top">Top</a> <a href="mailto:a@b.c">Mail</a>
+               <a href="https://other.com/x">Other</a></p>
+        </body>
+    </html>
+    """
+
+    def test_views_match_single_calls(self):
+        cleaner = Cleaner()
+        page = cleaner.process(self.HTML)
+
+        assert page.text == cleaner.to_text(self.HTML)
+        assert page.markdown == cleaner.to_markdown(self.HTML)
+
+    def test_links_title_metadata(self):
+        page = Cleaner().process(self.HTML, base_url="https://shop.com/p/1")
+
+        assert page.links == ["https://shop.com/specs", "https://other.com/x"]
+        assert page.title == "Product page"
+        assert page.metadata == {"description": "A product", "og:type": "product"}
+
+    def test_relative_links_without_base_url(self):
+        page = Cleaner().process("<a href='/a'>a</a><a href=''>b</a>")
+        assert page.links == ["/a"]
+        assert page.title is None
+
+    def test_parses_once_and_memoizes(self):
+        cleaner = Cleaner()
+        with patch.object(cleaner, "preprocess", wraps=cleaner.preprocess) as pre:
+            page = cleaner.process(self.HTML, outputs={"text", "links"})
+            assert page.text is page.text
+            page.links
+
+        pre.assert_called_once()
+        assert page._soup is None
+
+    def test_unrequested_view(self):
+        page = Cleaner().process("<p>a</p>", outputs=["text"])
+        with pytest.raises(ValueError, match="'markdown' was not requested"):
+            page.markdown
+
+    def test_unknown_output(self):
+        with pytest.raises(ValueError, match="Unknown outputs: html"):
+            Cleaner().process("<p>a</p>", outputs={"text", "html"})
+
+    def test_compact_view(self):
+        cleaner = Cleaner(compact_links="drop")
+        page = cleaner.process(self.HTML, outputs={"compact"})
+        assert page.compact == cleaner.to_compact_markdown(self.HTML)
+        assert "specs" in page.compact and "](" not in page.compact
+
+    def test_records_metrics_per_view(self):
+        metrics = MetricsRegistry()
+        page = Cleaner(metrics=metrics).process(b"<p>Hi</p>")
+        page.text
+        page.markdown
+        page.title
+
+        duration = metrics.get("websense_clean_duration_seconds")
+        assert duration.count(format="text") == 1
+        assert duration.count(format="markdown") == 1
+        chars = metrics.get("websense_clean_chars_total")
+        assert chars.value(format="text", direction="in") == len(b"<p>Hi</p>")
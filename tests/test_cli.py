@@ -5,8 +5,12 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+from ask2api import Config
 from click.testing import CliRunner
 
+from websense import bench as benchmarks
+from websense.instrumentation import ChromeTraceSink
+from websense.profiling import StageProfiler
 from websense.cli import (
     main,
     print_header,
@@ -213,6 +217,81 @@ class TestScrapeCommand:
             assert result.exit_code == 0
             assert "Test Product" in result.output
 
+    def test_scrape_with_trace(self, runner, tmp_path):
+        """Test scrape writes a Chrome trace of pipeline stages."""
+        trace_path = tmp_path / "trace.json"
+
+        with (
+            patch("websense.cli.Fetcher") as MockFetcher,
+            patch("websense.scraper.Cleaner") as MockCleaner,
+            patch("websense.scraper.Parser") as MockParser,
+            patch("websense.cli.Config"),
+        ):
+            MockFetcher.return_value.fetch.return_value = MagicMock(
+                text="<p>Test</p>", content=b"<p>Test</p>", status_code=200
+            )
+            MockCleaner.return_value.to_markdown.return_value = "Test content"
+            MockParser.return_value.extract.return_value = {"title": "T"}
+
+            result = runner.invoke(
+                main,
+                [
+                    "scrape",
+                    "https://example.com",
+                    "-e",
+                    '{"title": "string"}',
+                    "--trace",
+                    str(trace_path),
+                    "--verbose",
+                ],
+            )
+
+        assert result.exit_code == 0
+        assert "Trace saved to" in result.output
+        events = json.loads(trace_path.read_text())["traceEvents"]
+        assert [e["name"] for e in events if e["ph"] == "X"] == [
+            "fetch",
+            "clean",
+            "extract",
+        ]
+
+    def test_scrape_with_profile(self, runner, tmp_path):
+        """Test scrape prints a per-stage profile and dumps a .prof file."""
+        prof_path = tmp_path / "scrape.prof"
+
+        with (
+            patch("websense.cli.Fetcher") as MockFetcher,
+            patch("websense.scraper.Cleaner") as MockCleaner,
+            patch("websense.scraper.Parser") as MockParser,
+            patch("websense.cli.Config"),
+        ):
+            MockFetcher.return_value.fetch.return_value = MagicMock(
+                text="<p>Test</p>", content=b"<p>Test</p>", status_code=200
+            )
+            MockCleaner.return_value.to_markdown.return_value = "Test content"
+            MockParser.return_value.extract.return_value = {"title": "T"}
+
+            result = runner.invoke(
+                main,
+                [
+                    "scrape",
+                    "https://example.com",
+                    "-e",
+                    '{"title": "string"}',
+                    "--profile-output",
+                    str(prof_path),
+                    "--profile-top",
+                    "3",
+                    "--verbose",
+                ],
+            )
+
+        assert result.exit_code == 0
+        for stage in ("fetch", "clean", "extract"):
+            assert f"== {stage}: 1 spans" in result.output
+        assert "Profile saved to" in result.output
+        assert prof_path.stat().st_size > 0
+
     def test_scrape_with_schema(self, runner, temp_json_file):
         """Test scrape with schema file."""
         schema = {"type": "object", "properties": {"name": {"type": "string"}}}
@@ -580,6 +659,10 @@ class TestScrapeCommand:
                     '{"x": 1}',
                     "--prompt",
                     "Custom prompt",
+                    "--prune",
+                    "3000",
+                    "--repair",
+                    "2",
                 ],
             )
 
@@ -587,6 +670,8 @@ class TestScrapeCommand:
             # Verify prompt was passed in extract_kwargs
             call_kwargs = mock_scrape.call_args[1]
             assert call_kwargs["extract_kwargs"]["prompt"] == "Custom prompt"
+            assert call_kwargs["extract_kwargs"]["prune"] == 3000
+            assert call_kwargs["extract_kwargs"]["repair"] == 2
 
     def test_scrape_unexpected_error(self, runner):
         """Test scrape handles unexpected exceptions."""
@@ -604,6 +689,55 @@ class TestScrapeCommand:
             assert result.exit_code == 1
             assert "Unexpected error" in result.output
 
+    def test_scrape_compact(self, runner):
+        """Test --compact is passed to the scraper."""
+        with (
+            patch("websense.cli.Scraper") as MockScraper,
+            patch("websense.cli.Config"),
+            patch("websense.cli.Fetcher"),
+        ):
+            MockScraper.return_value.scrape.return_value = {}
+            result = runner.invoke(
+                main, ["scrape", "https://example.com", "-e", '{"a": 1}', "--compact"]
+            )
+
+            assert result.exit_code == 0
+            assert MockScraper.call_args.kwargs["compact"] is True
+
+    def test_scrape_cascade(self, runner):
+        """Test --cascade builds a model cascade and reports escalations."""
+        with (
+            patch("websense.scraper.Fetcher"),
+            patch("websense.scraper.Cleaner"),
+            patch("websense.cli.Fetcher") as MockFetcher,
+            patch("websense.cli.Config") as MockConfig,
+        ):
+            MockConfig.from_env.return_value = Config(api_key="key")
+            MockFetcher.return_value.fetch.return_value = MagicMock(
+                content=b"<p>Lamp</p>", encoding="utf-8", status_code=200
+            )
+
+            def generate(prompt, schema, config):
+                return {"title": "Lamp" if config.model == "strong" else ""}
+
+            with patch("websense.parser.generate_api_response", generate):
+                result = runner.invoke(
+                    main,
+                    [
+                        "scrape",
+                        "https://example.com",
+                        "-e",
+                        '{"title": "x"}',
+                        "--cascade",
+                        "cheap, strong",
+                        "--verbose",
+                    ],
+                )
+
+            assert result.exit_code == 0, result.output
+            assert '"title": "Lamp"' in result.output
+            assert "Cascade: 1/1 pages escalated (100%)" in result.output
+
 
 class TestContentCommand:
     """Tests for the content command."""
@@ -691,6 +825,24 @@ class TestContentCommand:
             assert output_path.exists()
             assert "# Test" in output_path.read_text()
 
+    def test_content_compact(self, runner):
+        """Test compact markdown output reports the size reduction."""
+        html = b'<h1>Title</h1><p><b>See</b> <a href="https://a.com/?utm_source=x">a</a></p>'
+        with patch("websense.cli.Fetcher") as MockFetcher:
+            MockFetcher.return_value.fetch.return_value = MagicMock(
+                content=html, encoding="utf-8", url="https://example.com"
+            )
+
+            result = runner.invoke(
+                main, ["content", "https://example.com", "--compact", "--verbose"]
+            )
+
+            assert result.exit_code == 0
+            assert "Format: compact markdown" in result.output
+            assert "smaller than markdown" in result.output
+            assert "[a][1]" in result.output
+            assert "[1]: https://a.com/" in result.output
+
     def test_content_verbose(self, runner):
         """Test content with verbose output."""
         with (
@@ -773,6 +925,23 @@ class TestContentCommand:
             assert result.exit_code == 1
             assert "Unexpected" in result.output
 
+    def test_content_with_profile(self, runner):
+        """Test content profiles the fetch and clean stages."""
+        with (
+            patch("websense.cli.Fetcher") as MockFetcher,
+            patch("websense.cli.Cleaner") as MockCleaner,
+        ):
+            MockFetcher.return_value.fetch.return_value = MagicMock(text="html")
+            MockCleaner.return_value.to_markdown.return_value = "md"
+
+            result = runner.invoke(
+                main, ["content", "https://example.com", "--profile"]
+            )
+
+        assert result.exit_code == 0
+        assert "== fetch: 1 spans" in result.output
+        assert "== clean: 1 spans" in result.output
+
     def test_content_verbose_saved_output(self, runner, tmp_path):
         """Test content with verbose and output file to cover line 274."""
         output_path = tmp_path / "v_content.md"
@@ -892,6 +1061,55 @@ class TestSearchScrapeCommand:
             assert "Search query: q" in result.output
             assert "Successfully scraped 1/1 sources" in result.output
 
+    def test_search_scrape_trace_written_on_error(self, runner, tmp_path):
+        """Test search-scrape writes the trace even when scraping fails."""
+        trace_path = tmp_path / "trace.json"
+        with (
+            patch("websense.cli.Scraper") as MockScraper,
+            patch("websense.cli.Config"),
+        ):
+            MockScraper.return_value.search_and_scrape.side_effect = RuntimeError(
+                "Scrape failed"
+            )
+
+            result = runner.invoke(
+                main,
+                ["search-scrape", "q", "-e", '{"x":1}', "--trace", str(trace_path)],
+            )
+
+        assert result.exit_code == 1
+        instrumentation = MockScraper.call_args.kwargs["instrumentation"]
+        assert isinstance(instrumentation.sinks[0], ChromeTraceSink)
+        assert json.loads(trace_path.read_text())["traceEvents"] == []
+
+    def test_search_scrape_profile_without_spans(self, runner, tmp_path):
+        """Test search-scrape skips the .prof dump when nothing was profiled."""
+        prof_path = tmp_path / "out.prof"
+        with (
+            patch("websense.cli.Scraper") as MockScraper,
+            patch("websense.cli.Config"),
+        ):
+            MockScraper.return_value.search_and_scrape.side_effect = RuntimeError(
+                "Scrape failed"
+            )
+
+            result = runner.invoke(
+                main,
+                [
+                    "search-scrape",
+                    "q",
+                    "-e",
+                    '{"x":1}',
+                    "--profile-output",
+                    str(prof_path),
+                ],
+            )
+
+        assert result.exit_code == 1
+        instrumentation = MockScraper.call_args.kwargs["instrumentation"]
+        assert isinstance(instrumentation.sinks[0], StageProfiler)
+        assert not prof_path.exists()
+
     def test_search_scrape_error(self, runner):
         """Test search-scrape handles errors."""
         with (
@@ -905,3 +1123,78 @@ class TestSearchScrapeCommand:
 
             assert result.exit_code == 1
             assert "Scrape failed" in result.output
+
+
+class TestBenchCommand:
+    """Tests for the bench command."""
+
+    REPORT = {
+        "pages": 2,
+        "llm_latency": 0.0,
+        "workloads": {
+            "content": {
+                "items": 2,
+                "errors": 0,
+                "wall": 0.1,
+                "throughput": 20.0,
+                "peak_rss_mb": 40.0,
+                "stages": {
+                    "fetch": {"p50": 0.001, "p95": 0.002, "p99": 0.003},
+                },
+            }
+        },
+    }
+
+    def test_bench_synthetic(self, runner, tmp_path):
+        """Test bench runs the requested workloads on a synthetic corpus."""
+        output = tmp_path / "report.json"
+        with patch("websense.cli.benchmarks.run_bench") as mock_run:
+            mock_run.return_value = self.REPORT
+            result = runner.invoke(
+                main, ["bench", "-w", "content", "--pages", "2", "-o", str(output)]
+            )
+
+        assert result.exit_code == 0
+        args, kwargs = mock_run.call_args
+        assert args[0] == ("content",)
+        assert len(args[1]) == 2
+        assert kwargs == {"llm_latency": 0.0, "repeat": 1}
+        assert "20.0/s" in result.output
+        assert "fetch" in result.output
+        assert json.loads(output.read_text()) == self.REPORT
+
+    def test_bench_recorded_corpus(self, runner, tmp_path):
+        """Test bench loads a recorded corpus directory."""
+        (tmp_path / "a.html").write_text("<p>a</p>")
+        with patch("websense.cli.benchmarks.run_bench") as mock_run:
+            mock_run.return_value = self.REPORT
+            result = runner.invoke(main, ["bench", "--corpus", str(tmp_path)])
+
+        assert result.exit_code == 0
+        args, _ = mock_run.call_args
+        assert args == (benchmarks.WORKLOADS, {"a.html": b"<p>a</p>"})
+
+    def test_bench_empty_corpus(self, runner, tmp_path):
+        """Test bench reports an empty corpus directory."""
+        result = runner.invoke(main, ["bench", "--corpus", str(tmp_path)])
+
+        assert result.exit_code == 1
+        assert "No .html files" in result.output
+
+    def test_bench_baseline(self, runner, tmp_path):
+        """Test bench passes and fails against a baseline."""
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps(self.REPORT))
+        with patch("websense.cli.benchmarks.run_bench") as mock_run:
+            mock_run.return_value = self.REPORT
+            result = runner.invoke(main, ["bench", "--baseline", str(baseline)])
+            assert result.exit_code == 0
+            assert "No regressions" in result.output
+
+            slower = json.loads(json.dumps(self.REPORT))
+            slower["workloads"]["content"]["throughput"] = 10.0
+            mock_run.return_value = slower
+            result = runner.invoke(main, ["bench", "--baseline", str(baseline)])
+
+        assert result.exit_code == 1
+        assert "Regression: content: throughput" in result.output
@@ -0,0 +1,71 @@
+"""Unit tests for the compact LLM markdown dialect."""
+
+import pytest
+from bs4 import BeautifulSoup
+
+from websense.compact import (
+    CompactMarkdownConverter,
+    compact_markdown,
+    reduction,
+    strip_tracking,
+)
+
+
+def _compact(html, links="reference"):
+    return compact_markdown(BeautifulSoup(html, "html.parser"), links)
+
+
+class TestStripTracking:
+    def test_removes_tracking_params(self):
+        url = "https://a.com/p?utm_source=x&id=3&fbclid=abc&UTM_Medium=y"
+        assert strip_tracking(url) == "https://a.com/p?id=3"
+
+    def test_keeps_urls_without_query(self):
+        assert strip_tracking("https://a.com/p#frag") == "https://a.com/p#frag"
+
+    def test_drops_empty_query(self):
+        assert strip_tracking("/p?gclid=1") == "/p"
+
+
+class TestCompactMarkdown:
+    def test_links_become_deduplicated_references(self):
+        html = (
+            '<p><a href="https://a.com/?utm_source=x">A</a> '
+            '<a href="https://a.com/">again</a> <a href="/b">B</a></p>'
+        )
+        assert _compact(html) == (
+            "[A][1] [again][1] [B][2]\n\n[1]: https://a.com/\n[2]: /b"
+        )
+
+    def test_drop_links(self):
+        html = '<p><a href="https://a.com/">A</a> and <a href="/b">B</a></p>'
+        assert _compact(html, links="drop") == "A and B"
+
+    def test_local_and_empty_links_keep_text(self):
+        html = '<p><a href="#top">Top</a> <a href="javascript:x()">Go</a><a></a></p>'
+        assert _compact(html) == "Top Go"
+
+    def test_strips_images_and_emphasis(self):
+        html = (
+            '<h1>Big <em>deal</em></h1><p><b>Bold</b> <img src="a.png" alt="x"></p><hr>'
+        )
+        assert _compact(html) == "# Big deal\n\nBold"
+
+    def test_normalizes_tables(self):
+        html = (
+            "<table><tr><td>a</td><td>b</td></tr>"
+            "<tr><td></td><td></td></tr><tr><td>1</td><td>2</td></tr></table>"
+        )
+        assert _compact(html) == "| a | b |\n|---|---|\n| 1 | 2 |"
+
+    def test_collapses_whitespace_outside_code(self):
+        html = "<p>a    b</p><br><br><br><pre>x    y</pre>"
+        assert _compact(html) == "a b\n\n```\nx    y\n```"
+
+    def test_unknown_link_mode(self):
+        with pytest.raises(ValueError, match="Unknown link mode"):
+            CompactMarkdownConverter(links="inline")
+
+    def test_reduction(self):
+        assert reduction("abcd", "ab") == 0.5
+        assert reduction("", "") == 0.0
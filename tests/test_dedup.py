@@ -0,0 +1,49 @@
+from websense.dedup import NearDuplicateFilter, hamming_distance, simhash
+
+
+ARTICLE = (
+    "SpaceX launched its Starship rocket from the Boca Chica site on Tuesday. "
+    "The booster returned to the launch tower while the upper stage reached "
+    "orbit and splashed down in the Indian Ocean an hour later."
+)
+
+
+class TestSimhash:
+    def test_identical_texts_match(self):
+        assert simhash(ARTICLE) == simhash(ARTICLE)
+
+    def test_near_duplicate_is_close(self):
+        mirror = ARTICLE + " Copyright Example Wire."
+        assert hamming_distance(simhash(ARTICLE), simhash(mirror)) <= 10
+
+    def test_different_texts_are_far(self):
+        other = "Nvidia shares fell four percent after quarterly guidance missed."
+        assert hamming_distance(simhash(ARTICLE), simhash(other)) > 10
+
+    def test_short_and_empty_text(self):
+        assert simhash("") == 0
+        assert simhash("two words") == simhash("Two  words!")
+
+    def test_hamming_distance(self):
+        assert hamming_distance(0b1010, 0b0110) == 2
+
+
+class TestNearDuplicateFilter:
+    def test_add_rejects_duplicates(self):
+        seen = NearDuplicateFilter()
+        assert seen.add(ARTICLE) is True
+        assert seen.add(ARTICLE.upper()) is False
+        assert seen.add("A completely unrelated page about gardening tools.") is True
+        assert len(seen.fingerprints) == 2
+
+    def test_threshold_zero_only_rejects_exact_fingerprints(self):
+        seen = NearDuplicateFilter(threshold=0)
+        assert seen.add(ARTICLE) is True
+        assert seen.add(ARTICLE) is False
+        assert seen.add(ARTICLE + " Copyright Example Wire.") is True
+
+    def test_negative_threshold_disables_dedup(self):
+        # No distance is below zero, so even identical pages are kept
+        seen = NearDuplicateFilter(threshold=-1)
+        assert seen.add(ARTICLE) is True
+        assert seen.add(ARTICLE) is True
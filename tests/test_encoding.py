@@ -0,0 +1,85 @@
+"""Unit tests for encoding detection."""
+
+import codecs
+from unittest.mock import patch
+
+import pytest
+
+from websense.encoding import decode_html, sniff_encoding
+
+
+class TestSniffEncoding:
+    @pytest.mark.parametrize(
+        "bom, expected",
+        [
+            (codecs.BOM_UTF8, "utf-8-sig"),
+            (codecs.BOM_UTF16_LE, "utf-16"),
+            (codecs.BOM_UTF16_BE, "utf-16"),
+            (codecs.BOM_UTF32_LE, "utf-32"),
+        ],
+    )
+    def test_bom_wins(self, bom, expected):
+        body = bom + b"<p>x</p>"
+        assert sniff_encoding(body, "text/html; charset=iso-8859-2") == expected
+
+    def test_content_type_charset(self):
+        assert sniff_encoding(b"<p>x</p>", "text/html; charset=ISO-8859-2") == (
+            "iso8859-2"
+        )
+        assert sniff_encoding(b"<p>x</p>", 'text/html; charset="Shift_JIS"') == (
+            "shift_jis"
+        )
+
+    def test_latin1_labels_mean_windows_1252(self):
+        assert sniff_encoding(b"<p>x</p>", "text/html; charset=iso-8859-1") == "cp1252"
+        assert sniff_encoding(b"<p>x</p>", "text/html; charset=us-ascii") == "cp1252"
+
+    def test_meta_charset(self):
+        body = b'<html><head><meta charset="koi8-r"></head></html>'
+        assert sniff_encoding(body, "text/html") == "koi8-r"
+
+    def test_meta_http_equiv(self):
+        body = b'<meta http-equiv="Content-Type" content="text/html; charset=euc-jp">'
+        assert sniff_encoding(body) == "euc_jp"
+
+    def test_meta_utf16_means_utf8(self):
+        assert sniff_encoding(b'<meta charset="utf-16">') == "utf-8"
+
+    def test_unknown_labels_are_ignored(self):
+        body = '<meta charset="bogus"><p>é</p>'.encode("utf-8")
+        assert sniff_encoding(body, "text/html; charset=nonsense") == "utf-8"
+
+    def test_utf8_prefix(self):
+        body = ("é" * 100).encode("utf-8")
+        # The prefix boundary splits a two-byte character
+        assert sniff_encoding(body, prefix=51) == "utf-8"
+
+    def test_statistical_fallback_on_prefix(self):
+        body = ("<p>Привет, как дела? Всё хорошо.</p>" * 50).encode("cp1251")
+        with patch("websense.encoding.from_bytes") as mock_detect:
+            mock_detect.return_value.best.return_value.encoding = "windows-1251"
+            assert sniff_encoding(body, prefix=100) == "cp1251"
+        assert mock_detect.call_args.args[0] == body[:100]
+
+    def test_statistical_fallback_real_detection(self):
+        body = ("<p>Привет, как дела? Всё хорошо.</p>" * 50).encode("cp1251")
+        assert body.decode(sniff_encoding(body)) == body.decode("cp1251")
+
+    def test_undetectable_defaults_to_utf8(self):
+        with patch("websense.encoding.from_bytes") as mock_detect:
+            mock_detect.return_value.best.return_value = None
+            assert sniff_encoding(b"\xfd\xfe\xff\x81") == "utf-8"
+
+
+class TestDecodeHtml:
+    def test_text_passthrough(self):
+        assert decode_html("<p>x</p>") == "<p>x</p>"
+
+    def test_declared_encoding(self):
+        assert decode_html("é".encode("cp1252"), "windows-1252") == "é"
+
+    def test_sniffs_without_encoding(self):
+        assert decode_html("é".encode("utf-8")) == "é"
+
+    def test_replaces_undecodable_bytes(self):
+        assert decode_html(b"a\xffb", "utf-8") == "a�b"
@@ -1,7 +1,11 @@
+import asyncio
+
+import httpx
 import pytest
 import requests
 from unittest.mock import Mock, patch
 from websense.fetcher import Fetcher
+from websense.metrics import MetricsRegistry
 
 
 class TestFetcher:
@@ -20,12 +24,14 @@ class TestFetcher:
         with patch.object(fetcher.session, "get") as mock_get:
             mock_response = Mock()
             mock_response.status_code = 200
-            mock_response.text = "Success"
+            mock_response.content = b"Success"
+            mock_response.headers = {"Content-Type": "text/html; charset=ISO-8859-2"}
             mock_get.return_value = mock_response
 
             response = fetcher.fetch("http://example.com")
 
             assert response == mock_response
+            assert response.encoding == "iso8859-2"
             mock_get.assert_called_once_with("http://example.com", timeout=10)
             mock_response.raise_for_status.assert_called_once()
 
@@ -53,3 +59,152 @@ class TestFetcher:
                 fetcher.fetch("http://example.com")
 
             assert "Failed to fetch http://example.com" in str(excinfo.value)
+
+    def test_fetch_records_metrics(self):
+        metrics = MetricsRegistry()
+        fetcher = Fetcher(metrics=metrics)
+        with patch.object(fetcher.session, "get") as mock_get:
+            mock_get.return_value = Mock(status_code=200, content=b"12345", headers={})
+            fetcher.fetch("https://Example.com/page")
+
+            error = requests.HTTPError("404 Not Found", response=Mock(status_code=404))
+            mock_get.return_value.raise_for_status.side_effect = error
+            with pytest.raises(RuntimeError):
+                fetcher.fetch("https://example.com/missing")
+
+            mock_get.side_effect = requests.ConnectionError("Connection invalid")
+            with pytest.raises(RuntimeError):
+                fetcher.fetch("https://example.com/down")
+
+        requests_total = metrics.get("websense_fetch_requests_total")
+        assert requests_total.value(domain="example.com", status=200) == 1
+        assert requests_total.value(domain="example.com", status=404) == 1
+        assert requests_total.value(domain="example.com", status="error") == 1
+        duration = metrics.get("websense_fetch_duration_seconds")
+        assert duration.count(domain="example.com") == 3
+        size = metrics.get("websense_fetch_response_bytes")
+        assert size.count(domain="example.com") == 1
+
+    def test_fetch_calls_recorders(self):
+        recorder = Mock()
+        fetcher = Fetcher(recorders=[recorder])
+        with patch.object(fetcher.session, "get") as mock_get:
+            mock_get.return_value = Mock(status_code=200, content=b"", headers={})
+            response = fetcher.fetch("http://example.com")
+
+            mock_get.return_value.raise_for_status.side_effect = requests.HTTPError(
+                "500"
+            )
+            with pytest.raises(RuntimeError):
+                fetcher.fetch("http://example.com/error")
+
+        recorder.record.assert_called_once_with(response)
+
+
+def afetch(fetcher, handler, url="http://example.com/"):
+    """Run Fetcher.afetch against a mock transport."""
+
+    async def main():
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await fetcher.afetch(url, client)
+
+    return asyncio.run(main())
+
+
+class TestAsyncFetch:
+    def test_afetch_success(self):
+        recorder = Mock()
+        metrics = MetricsRegistry()
+        fetcher = Fetcher(user_agent="AsyncBot", metrics=metrics, recorders=[recorder])
+        seen = {}
+
+        def handler(request):
+            seen["agent"] = request.headers["User-Agent"]
+            return httpx.Response(
+                200,
+                headers={"Content-Type": "text/html; charset=ISO-8859-2"},
+                content=b"Success",
+            )
+
+        response = afetch(fetcher, handler)
+
+        assert isinstance(response, requests.Response)
+        assert response.content == b"Success"
+        assert response.encoding == "iso8859-2"
+        assert seen["agent"] == "AsyncBot"
+        recorder.record.assert_called_once_with(response)
+        requests_total = metrics.get("websense_fetch_requests_total")
+        assert requests_total.value(domain="example.com", status=200) == 1
+
+    def test_afetch_follows_redirects(self):
+        def handler(request):
+            if request.url.path == "/":
+                return httpx.Response(302, headers={"Location": "/final"})
+            return httpx.Response(200, content=b"done")
+
+        response = afetch(Fetcher(), handler)
+
+        assert response.url == "http://example.com/final"
+        assert response.history[0].status_code == 302
+
+    def test_afetch_retries_then_succeeds(self):
+        fetcher = Fetcher(retries=2, backoff_factor=0)
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("refused")
+            if len(calls) == 2:
+                return httpx.Response(503)
+            return httpx.Response(200, content=b"ok")
+
+        assert afetch(fetcher, handler).content == b"ok"
+        assert len(calls) == 3
+
+    def test_afetch_error_status(self):
+        metrics = MetricsRegistry()
+        fetcher = Fetcher(retries=1, backoff_factor=0, metrics=metrics)
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(404)
+
+        with pytest.raises(RuntimeError, match="Failed to fetch http://example.com/"):
+            afetch(fetcher, handler)
+        # 404 is not retried
+        assert len(calls) == 1
+        requests_total = metrics.get("websense_fetch_requests_total")
+        assert requests_total.value(domain="example.com", status=404) == 1
+
+    def test_afetch_connection_error_exhausts_retries(self):
+        metrics = MetricsRegistry()
+        fetcher = Fetcher(retries=1, backoff_factor=0, metrics=metrics)
+
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        with pytest.raises(RuntimeError, match="refused"):
+            afetch(fetcher, handler)
+        requests_total = metrics.get("websense_fetch_requests_total")
+        assert requests_total.value(domain="example.com", status="error") == 1
+
+    def test_retry_delay(self):
+        fetcher = Fetcher(backoff_factor=0.5)
+        assert fetcher._retry_delay(0, None) == 0.5
+        assert fetcher._retry_delay(2, httpx.Response(503)) == 2.0
+        limited = httpx.Response(429, headers={"Retry-After": "7"})
+        assert fetcher._retry_delay(0, limited) == 7.0
+
+    def test_afetch_without_client(self):
+        fetcher = Fetcher()
+        transport = httpx.MockTransport(lambda request: httpx.Response(200))
+
+        def client():
+            return httpx.AsyncClient(transport=transport)
+
+        with patch("websense.fetcher.async_client", client):
+            response = asyncio.run(fetcher.afetch("http://example.com/"))
+        assert response.status_code == 200
@@ -0,0 +1,101 @@
+import pytest
+
+from websense.index import LocalIndex, tokenize
+from websense.searcher import Searcher
+from websense.store import PageStore
+from websense.warc import WarcWriter
+
+
+PAGES = [
+    (
+        "https://example.com/starship",
+        "<html><head><title>Starship</title></head><body>"
+        "<nav>Home News</nav><p>Starship launch from Boca Chica.</p></body></html>",
+    ),
+    (
+        "https://example.com/falcon",
+        "<html><body><p>Falcon 9 launch and landing. Falcon reuse.</p></body></html>",
+    ),
+    (
+        "https://example.com/garden",
+        "<html><body><p>Gardening tools for spring.</p></body></html>",
+    ),
+]
+
+
+class TestLocalIndex:
+    def test_tokenize(self):
+        assert tokenize("Falcon-9, LAUNCH!") == ["falcon", "9", "launch"]
+
+    def test_search_ranks_by_bm25(self):
+        index = LocalIndex().build(PAGES)
+
+        results = index.search("falcon launch", max_results=5)
+
+        assert [r["url"] for r in results] == [
+            "https://example.com/falcon",
+            "https://example.com/starship",
+        ]
+        assert results[1]["title"] == "Starship"
+        assert "Home" not in results[1]["description"]
+
+    def test_search_empty_index_and_unknown_terms(self):
+        index = LocalIndex()
+        assert index.search("anything") == []
+        index.add("https://a.com", "some text")
+        assert index.search("missing") == []
+
+    def test_add_replaces_url(self):
+        index = LocalIndex()
+        index.add("https://a.com", "old rocket text")
+        index.add("https://a.com", "new garden text")
+
+        assert len(index) == 1
+        assert index.search("rocket") == []
+        assert index.search("garden")[0]["url"] == "https://a.com"
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "index.json"
+        index = LocalIndex(path).build(PAGES)
+        index.add("https://example.com/garden", "Replaced page about rockets")
+        index.save()
+
+        loaded = LocalIndex(path)
+
+        assert len(loaded) == 3
+        assert loaded.search("falcon")[0]["url"] == "https://example.com/falcon"
+        assert loaded.search("gardening") == []
+        assert loaded.search("rockets")[0]["url"] == "https://example.com/garden"
+
+    def test_save_without_path(self):
+        with pytest.raises(ValueError, match="No path"):
+            LocalIndex().save()
+
+    def test_as_searcher_backend(self):
+        searcher = Searcher(backend=LocalIndex().build(PAGES))
+        results = searcher.search("gardening", max_results=1)
+        assert results[0]["url"] == "https://example.com/garden"
+
+    def test_from_store(self, tmp_path):
+        with PageStore(tmp_path / "store") as store:
+            for url, html in PAGES:
+                store.put(url, html.encode("utf-8"))
+            index = LocalIndex.from_store(store, tmp_path / "index.json")
+
+        assert len(index) == 3
+        assert index.search("boca chica")[0]["title"] == "Starship"
+        assert len(LocalIndex(tmp_path / "index.json")) == 3
+
+    def test_from_warc(self, tmp_path):
+        archive = tmp_path / "pages.warc"
+        with WarcWriter(archive) as writer:
+            for url, html in PAGES:
+                writer.write_response(
+                    url, 200, "OK", {"Content-Type": "text/html"}, html.encode()
+                )
+            writer.write_response("https://example.com/gone", 404, "", {}, b"falcon")
+
+        index = LocalIndex.from_warc(archive)
+
+        assert len(index) == 3
+        assert index.search("falcon")[0]["url"] == "https://example.com/falcon"
@@ -0,0 +1,122 @@
+import json
+import logging
+
+import pytest
+
+from websense.instrumentation import (
+    ChromeTraceSink,
+    Instrumentation,
+    JsonlSink,
+    LoggingSink,
+    MemorySink,
+    Span,
+    percentile,
+)
+
+
+class TestInstrumentation:
+    def test_span_without_sinks_is_noop(self):
+        inst = Instrumentation()
+        with inst.span("fetch", url="u") as span:
+            span.set(bytes=1)
+        assert not span
+        assert inst.span("clean") is inst.span("extract")
+
+    def test_span_records_timing_and_attrs(self):
+        sink = MemorySink()
+        inst = Instrumentation(sink)
+
+        with inst.span("fetch", url="u") as span:
+            span.set(bytes=10)
+
+        recorded = sink.spans[0]
+        assert recorded.stage == "fetch"
+        assert recorded.attrs == {"url": "u", "bytes": 10}
+        assert recorded.outcome == "ok"
+        assert recorded.duration >= 0
+        assert recorded.start > 0
+        assert recorded.thread_name
+
+    def test_span_records_errors(self):
+        sink = MemorySink()
+        inst = Instrumentation()
+        inst.add_sink(sink)
+
+        with pytest.raises(RuntimeError):
+            with inst.span("fetch"):
+                raise RuntimeError("boom")
+
+        assert sink.spans[0].outcome == "error"
+        assert sink.spans[0].error == "boom"
+
+    def test_start_hook_is_called(self):
+        class StartSink(MemorySink):
+            started = []
+
+            def start(self, span):
+                self.started.append(span.stage)
+
+        sink = StartSink()
+        with Instrumentation(sink).span("clean"):
+            assert sink.started == ["clean"]
+        assert len(sink.spans) == 1
+
+
+class TestSinks:
+    def test_logging_sink(self, caplog):
+        with caplog.at_level(logging.INFO, logger="websense"):
+            LoggingSink().emit(Span("fetch", duration=0.5, attrs={"url": "u"}))
+        assert "fetch ok 500.0ms url=u" in caplog.text
+
+    def test_jsonl_sink(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        sink = JsonlSink(path)
+        sink.emit(Span("fetch", attrs={"url": "u"}))
+        sink.emit(Span("clean"))
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["stage"] for line in lines] == ["fetch", "clean"]
+        assert lines[0]["attrs"] == {"url": "u"}
+
+    def test_memory_sink_summary(self):
+        sink = MemorySink()
+        for d in (0.1, 0.2, 0.3, 0.4):
+            sink.emit(Span("fetch", duration=d))
+        sink.emit(Span("extract", duration=1.0, outcome="error"))
+
+        summary = sink.summary()
+
+        assert summary["fetch"]["count"] == 4
+        assert summary["fetch"]["p50"] == pytest.approx(0.25)
+        assert summary["fetch"]["mean"] == pytest.approx(0.25)
+        assert summary["extract"]["errors"] == 1
+
+    def test_percentile(self):
+        assert percentile([], 50) == 0.0
+        assert percentile([3, 1, 2], 50) == 2
+        assert percentile([1, 2], 99) == pytest.approx(1.99)
+
+
+class TestChromeTraceSink:
+    def test_trace_events(self, tmp_path):
+        trace = ChromeTraceSink()
+        inst = Instrumentation(trace)
+        with inst.span("fetch", url="u"):
+            pass
+        with pytest.raises(ValueError):
+            with inst.span("extract"):
+                raise ValueError("bad json")
+
+        path = tmp_path / "trace.json"
+        trace.write(path)
+        data = json.loads(path.read_text())
+
+        events = data["traceEvents"]
+        assert events[0]["ph"] == "M"
+        assert events[0]["args"]["name"] == "MainThread"
+        fetch, extract = events[1:]
+        assert fetch["name"] == "fetch" and fetch["ph"] == "X"
+        assert fetch["args"] == {"url": "u", "outcome": "ok"}
+        assert fetch["tid"] == extract["tid"]
+        assert extract["ts"] >= fetch["ts"] + fetch["dur"] - 1
+        assert extract["args"]["error"] == "bad json"
@@ -0,0 +1,97 @@
+import urllib.request
+
+import pytest
+
+from websense.metrics import Counter, Histogram, MetricsRegistry
+
+
+class TestCounter:
+    def test_inc_and_value(self):
+        counter = Counter("requests_total", "Requests.", ("status",))
+        counter.inc(status=200)
+        counter.inc(2, status=200)
+        counter.inc(status=404)
+
+        assert counter.value(status=200) == 3
+        assert counter.value(status=500) == 0
+        assert counter.samples() == [
+            'requests_total{status="200"} 3',
+            'requests_total{status="404"} 1',
+        ]
+
+    def test_unlabelled_and_escaped(self):
+        counter = Counter("bytes_total", "Bytes.")
+        counter.inc(1.5)
+        assert counter.samples() == ["bytes_total 1.5"]
+
+        labelled = Counter("x_total", "X.", ("path",))
+        labelled.inc(path='a"b\\c\nd')
+        assert labelled.samples() == ['x_total{path="a\\"b\\\\c\\nd"} 1']
+
+
+class TestHistogram:
+    def test_observe_and_samples(self):
+        hist = Histogram("latency_seconds", "Latency.", ("domain",), (0.1, 1))
+        hist.observe(0.05, domain="a.com")
+        hist.observe(0.5, domain="a.com")
+        hist.observe(5, domain="a.com")
+
+        assert hist.count(domain="a.com") == 3
+        assert hist.count(domain="b.com") == 0
+        assert hist.samples() == [
+            'latency_seconds_bucket{domain="a.com",le="0.1"} 1',
+            'latency_seconds_bucket{domain="a.com",le="1"} 2',
+            'latency_seconds_bucket{domain="a.com",le="+Inf"} 3',
+            'latency_seconds_sum{domain="a.com"} 5.55',
+            'latency_seconds_count{domain="a.com"} 3',
+        ]
+
+
+class TestMetricsRegistry:
+    def test_get_or_create(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("a_total", "A.")
+        assert registry.counter("a_total", "A.") is counter
+        assert registry.get("a_total") is counter
+        with pytest.raises(ValueError, match="already registered as a counter"):
+            registry.histogram("a_total", "A.")
+
+    def test_render(self):
+        registry = MetricsRegistry()
+        registry.histogram("b_seconds", "B.", buckets=(1,)).observe(0.5)
+        registry.counter("a_total", "A.").inc()
+
+        assert registry.render() == (
+            "# HELP a_total A.\n"
+            "# TYPE a_total counter\n"
+            "a_total 1\n"
+            "# HELP b_seconds B.\n"
+            "# TYPE b_seconds histogram\n"
+            'b_seconds_bucket{le="1"} 1\n'
+            'b_seconds_bucket{le="+Inf"} 1\n'
+            "b_seconds_sum 0.5\n"
+            "b_seconds_count 1\n"
+        )
+
+    def test_write_textfile(self, tmp_path):
+        registry = MetricsRegistry()
+        registry.counter("a_total", "A.").inc()
+        path = tmp_path / "websense.prom"
+
+        registry.write_textfile(path)
+
+        assert path.read_text() == registry.render()
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_serve(self):
+        registry = MetricsRegistry()
+        registry.counter("a_total", "A.").inc()
+        server = registry.serve(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert body == registry.render()
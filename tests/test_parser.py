@@ -1,6 +1,14 @@
+import asyncio
+import json
+
+import httpx
 import pytest
+from ask2api import Config
 from unittest.mock import patch, MagicMock
-from websense.parser import Parser
+from websense.cascade import ModelCascade
+from websense.metrics import MetricsRegistry
+from websense.parser import DEFAULT_PROMPT, Parser, estimate_tokens
+from websense.schema import clear_cache
 
 
 class TestParser:
@@ -26,9 +34,10 @@ class TestParser:
         assert args[1] == schema
         assert args[2] == mock_config
 
-    @patch("websense.parser.convert_example_to_schema")
+    @patch("websense.schema.convert_example_to_schema")
     @patch("websense.parser.generate_api_response")
     def test_extract_with_example(self, mock_generate, mock_convert):
+        clear_cache()
         mock_config = MagicMock()
         parser = Parser(config=mock_config)
         example = {"title": "Example Title"}
@@ -41,10 +50,10 @@ class TestParser:
         mock_generate.return_value = {"title": "Extracted Title"}
 
         result = parser.extract("content", example=example)
+        parser.extract("other content", example=dict(example))
 
         assert result == {"title": "Extracted Title"}
         mock_convert.assert_called_once_with(example)
-        mock_generate.assert_called_once()
         args, _ = mock_generate.call_args
         assert args[1] == generated_schema
 
@@ -128,3 +137,326 @@ class TestParser:
         args, _ = mock_generate.call_args
         prompt = args[0]
         assert "Extract structured data from the following webpage content" in prompt
+
+    @patch("websense.parser.generate_api_response")
+    def test_extract_records_metrics(self, mock_generate):
+        metrics = MetricsRegistry()
+        parser = Parser(config=MagicMock(model="gpt-test"), metrics=metrics)
+        mock_generate.return_value = {"title": "ok"}
+
+        parser.extract("a" * 400, schema={"type": "object"}, prompt="p")
+        mock_generate.side_effect = Exception("API down")
+        with pytest.raises(Exception, match="API down"):
+            parser.extract("b", schema={"type": "object"})
+
+        requests_total = metrics.get("websense_llm_requests_total")
+        assert requests_total.value(model="gpt-test", outcome="ok") == 1
+        assert requests_total.value(model="gpt-test", outcome="error") == 1
+        assert metrics.get("websense_llm_duration_seconds").count(model="gpt-test") == 2
+        tokens = metrics.get("websense_llm_prompt_tokens_total")
+        assert tokens.value(model="gpt-test") > 100
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 1
+        assert estimate_tokens("a" * 400) == 100
+
+    @patch("websense.parser.generate_api_response")
+    def test_extract_uses_custom_generate(self, mock_generate):
+        generate = MagicMock(return_value={"title": "stub"})
+        config = MagicMock()
+        parser = Parser(config=config, generate=generate)
+
+        result = parser.extract("content", schema={"type": "object"})
+
+        assert result == {"title": "stub"}
+        mock_generate.assert_not_called()
+        args, _ = generate.call_args
+        assert args[1:] == ({"type": "object"}, config)
+
+    def test_extract_prunes_content(self):
+        generate = MagicMock(return_value={"price": 1.0})
+        metrics = MetricsRegistry()
+        parser = Parser(config=MagicMock(), metrics=metrics, generate=generate)
+        filler = "\n".join("Lorem ipsum dolor sit amet." for _ in range(100))
+        content = f"{filler}\nPrice: $19.99\n{filler}"
+
+        parser.extract(content, example={"price": 9.99}, prune=200)
+
+        prompt = generate.call_args.args[0]
+        assert "Price: $19.99" in prompt
+        assert len(prompt) < 400
+        chars = metrics.get("websense_prune_chars_total")
+        assert chars.value(direction="in") == len(content)
+        assert chars.value(direction="out") <= 200
+
+    def test_extract_multi_single_call(self):
+        generate = MagicMock(
+            return_value={"product": {"name": "Widget"}, "seller": {"city": "Oslo"}}
+        )
+        parser = Parser(config=MagicMock(), generate=generate)
+        product = {"type": "object", "properties": {"name": {"type": "string"}}}
+
+        result = parser.extract_multi(
+            "content",
+            schemas={"product": product},
+            examples={"seller": {"city": "Paris"}, "product": {"ignored": 1}},
+        )
+
+        assert result == {"product": {"name": "Widget"}, "seller": {"city": "Oslo"}}
+        generate.assert_called_once()
+        prompt, schema, _ = generate.call_args.args
+        assert "(seller, product)" in prompt
+        assert prompt.endswith("content")
+        assert schema["required"] == ["seller", "product"]
+        assert schema["properties"]["product"] is product
+        assert schema["properties"]["seller"]["properties"]["city"] == {
+            "type": "string"
+        }
+
+    def test_extract_multi_groups(self):
+        generate = MagicMock(side_effect=[{"a": {"x": 1}, "b": {"x": 2}}, {}])
+        parser = Parser(config=MagicMock(), generate=generate)
+
+        result = parser.extract_multi(
+            "content",
+            examples={"a": {"x": 0}, "b": {"x": 0}, "c": {"x": 0}},
+            group_size=2,
+            prompt="Custom",
+            truncate_length=3,
+        )
+
+        assert result == {"a": {"x": 1}, "b": {"x": 2}, "c": None}
+        assert generate.call_count == 2
+        second_prompt, second_schema, _ = generate.call_args.args
+        assert second_prompt.startswith("Custom\n")
+        assert second_prompt.endswith("con")
+        assert list(second_schema["properties"]) == ["c"]
+
+    def test_extract_multi_requires_schemas(self):
+        with pytest.raises(ValueError, match="at least one schema"):
+            Parser(config=MagicMock()).extract_multi("content")
+
+
+class TestExtractAsync:
+    SCHEMA = {"type": "object", "properties": {"title": {"type": "string"}}}
+
+    def test_uses_custom_generate_in_thread(self):
+        generate = MagicMock(return_value={"title": "T"})
+        metrics = MetricsRegistry()
+        config = MagicMock(model="m")
+        parser = Parser(config=config, metrics=metrics, generate=generate)
+
+        result = asyncio.run(
+            parser.extract_async("content", schema=self.SCHEMA, prompt="Custom")
+        )
+
+        assert result == {"title": "T"}
+        generate.assert_called_once_with("Custom\n\ncontent", self.SCHEMA, config)
+        calls = metrics.get("websense_llm_requests_total")
+        assert calls.value(model="m", outcome="ok") == 1
+
+    def test_posts_through_async_client(self):
+        config = Config(api_key="key", model="m")
+        metrics = MetricsRegistry()
+        parser = Parser(config=config, metrics=metrics)
+        prompts = []
+
+        def handler(request):
+            prompts.append(json.loads(request.content)["messages"][-1]["content"])
+            message = {"content": json.dumps({"title": "Async"})}
+            return httpx.Response(200, json={"choices": [{"message": message}]})
+
+        async def main():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await asyncio.gather(
+                    *(
+                        parser.extract_async(
+                            f"page {i}", example={"title": "x"}, client=client
+                        )
+                        for i in range(3)
+                    )
+                )
+
+        assert asyncio.run(main()) == [{"title": "Async"}] * 3
+        assert sorted(p[-6:] for p in prompts) == ["page 0", "page 1", "page 2"]
+        calls = metrics.get("websense_llm_requests_total")
+        assert calls.value(model="m", outcome="ok") == 3
+
+    def test_creates_client_and_records_errors(self):
+        metrics = MetricsRegistry()
+        parser = Parser(config=Config(api_key="key", model="m"), metrics=metrics)
+        transport = httpx.MockTransport(lambda request: httpx.Response(500))
+
+        def client():
+            return httpx.AsyncClient(transport=transport)
+
+        with patch("websense.parser.async_client", client):
+            with pytest.raises(httpx.HTTPStatusError):
+                asyncio.run(parser.extract_async("content", schema=self.SCHEMA))
+
+        calls = metrics.get("websense_llm_requests_total")
+        assert calls.value(model="m", outcome="error") == 1
+
+    def test_requires_schema(self):
+        with pytest.raises(ValueError, match="schema or a JSON example"):
+            asyncio.run(Parser(config=MagicMock()).extract_async("content"))
+
+
+class TestCascade:
+    SCHEMA = {
+        "type": "object",
+        "properties": {"title": {"type": "string"}, "price": {"type": "number"}},
+        "required": ["title", "price"],
+    }
+
+    @staticmethod
+    def generate(prompt, schema, config):
+        if config.model == "cheap":
+            if prompt.endswith("{"):
+                raise ValueError("Unterminated JSON")
+            return {"title": "T", "price": None}
+        return {name: 1.5 for name in schema["properties"]}
+
+    def test_extract_escalates_fields(self):
+        metrics = MetricsRegistry()
+        cascade = ModelCascade(["cheap", "strong"])
+        parser = Parser(
+            config=Config(api_key="key", model="base"),
+            metrics=metrics,
+            generate=MagicMock(side_effect=self.generate),
+            cascade=cascade,
+        )
+
+        result = parser.extract("content", schema=self.SCHEMA)
+
+        assert result == {"title": "T", "price": 1.5}
+        _, schema, config = parser.generate.call_args.args
+        assert list(schema["properties"]) == ["price"]
+        assert config.model == "strong"
+        calls = metrics.get("websense_llm_requests_total")
+        assert calls.value(model="cheap", outcome="ok") == 1
+        assert calls.value(model="strong", outcome="ok") == 1
+
+    def test_extract_escalates_unparsable_answer(self):
+        parser = Parser(
+            config=Config(api_key="key"),
+            generate=self.generate,
+            cascade=ModelCascade(["cheap", "strong"]),
+        )
+
+        result = parser.extract("{", schema=self.SCHEMA)
+
+        assert result == {"title": 1.5, "price": 1.5}
+
+    def test_extract_async_cascade(self):
+        cascade = ModelCascade(["cheap", "strong"], escalate="page")
+        parser = Parser(
+            config=Config(api_key="key"), generate=self.generate, cascade=cascade
+        )
+
+        results = (
+            asyncio.run(parser.extract_async("content", schema=self.SCHEMA)),
+            asyncio.run(parser.extract_async("{", schema=self.SCHEMA)),
+        )
+
+        assert results == ({"title": 1.5, "price": 1.5},) * 2
+        assert cascade.stats["escalated_pages"] == 2
+
+
+class TestRepair:
+    SCHEMA = {
+        "type": "object",
+        "properties": {"title": {"type": "string"}, "price": {"type": "number"}},
+        "required": ["title", "price"],
+    }
+    CONTENT = "Welcome to our shop.\n" * 100 + "Price: $9.50\n" + "Thanks!\n" * 100
+
+    def test_extract_reasks_failing_fields_with_pruned_content(self):
+        generate = MagicMock(
+            side_effect=[{"title": "T", "price": None}, {"price": 9.5}]
+        )
+        parser = Parser(config=MagicMock(), generate=generate)
+
+        result = parser.extract(
+            self.CONTENT, schema=self.SCHEMA, repair=1, repair_budget=200
+        )
+
+        assert result == {"title": "T", "price": 9.5}
+        prompt, schema, _ = generate.call_args.args
+        assert list(schema["properties"]) == ["price"]
+        assert "Extract only these fields: price." in prompt
+        assert "Price: $9.50" in prompt
+        assert len(prompt) < 400
+
+    def test_valid_result_is_not_repaired(self):
+        generate = MagicMock(return_value={"title": "T", "price": 1})
+        parser = Parser(config=MagicMock(), generate=generate)
+
+        parser.extract("content", schema=self.SCHEMA, repair=3)
+
+        generate.assert_called_once()
+
+    def test_keeps_values_of_invalid_answers(self):
+        metrics = MetricsRegistry()
+        generate = MagicMock(
+            side_effect=[
+                {"title": "T", "price": "n/a"},
+                {"price": "still n/a", "title": "ignored"},
+                ValueError("bad json"),
+                {"price": 3},
+            ]
+        )
+        parser = Parser(config=MagicMock(), metrics=metrics, generate=generate)
+
+        result = parser.extract(self.CONTENT, schema=self.SCHEMA, repair=3)
+
+        assert result == {"title": "T", "price": 3}
+        assert generate.call_count == 4
+        repaired = metrics.get("websense_llm_repaired_fields_total")
+        assert repaired.value(outcome="fixed") == 1
+        assert repaired.value(outcome="failed") == 2
+
+    def test_keeps_values_when_answer_is_empty(self):
+        schema = {
+            "type": "object",
+            "properties": {"code": {"type": "string"}},
+        }
+        generate = MagicMock(side_effect=[{"code": 42}, {"code": ""}])
+        parser = Parser(config=MagicMock(), generate=generate)
+
+        result = parser.extract("content", schema=schema, repair=1)
+
+        assert result == {"code": 42}
+        assert generate.call_count == 2
+
+    def test_non_object_result_is_returned(self):
+        generate = MagicMock(return_value=["x"])
+        parser = Parser(config=MagicMock(), generate=generate)
+
+        assert parser.extract("content", schema=self.SCHEMA, repair=1) == ["x"]
+        generate.assert_called_once()
+
+    def test_repair_existing_result(self):
+        generate = MagicMock(return_value={"title": "Lamp"})
+        parser = Parser(config=MagicMock(), generate=generate)
+
+        result = parser.repair(
+            "Lamp, $5", {"title": "", "price": 5}, example={"title": "x", "price": 1}
+        )
+
+        assert result == {"title": "Lamp", "price": 5}
+        prompt, schema, _ = generate.call_args.args
+        assert list(schema["properties"]) == ["title"]
+        assert prompt.startswith(DEFAULT_PROMPT)
+
+    def test_extract_async_repair(self):
+        generate = MagicMock(side_effect=[{"title": None, "price": 2}, {"title": "T"}])
+        parser = Parser(config=MagicMock(), generate=generate)
+
+        result = asyncio.run(
+            parser.extract_async("content", schema=self.SCHEMA, repair=1)
+        )
+
+        assert result == {"title": "T", "price": 2}
+        assert generate.call_count == 2
@@ -0,0 +1,105 @@
+"""Unit tests for the per-stage profiler."""
+
+import pstats
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+
+from websense.instrumentation import Instrumentation
+from websense.profiling import StageProfiler
+
+
+def _work(n: int) -> list[str]:
+    return [str(i) * 10 for i in range(n)]
+
+
+class TestStageProfiler:
+    def test_profiles_each_stage(self):
+        profiler = StageProfiler(memory=False)
+        instrumentation = Instrumentation(profiler)
+
+        for _ in range(2):
+            with instrumentation.span("clean"):
+                _work(1000)
+        with instrumentation.span("fetch"):
+            _work(10)
+
+        assert profiler.calls == {"clean": 2, "fetch": 1}
+        assert set(profiler.stats) == {"clean", "fetch"}
+        functions = {func[2] for func in profiler.stats["clean"].stats}
+        assert "_work" in functions
+        assert profiler.allocations["clean"] == {}
+
+    def test_tracks_allocations(self):
+        with StageProfiler() as profiler:
+            assert tracemalloc.is_tracing()
+            with Instrumentation(profiler).span("clean"):
+                kept = _work(5000)
+        assert not tracemalloc.is_tracing()
+
+        top = profiler.top_allocations("clean", top=3)
+        assert top
+        site, size, count = top[0]
+        assert site.startswith(__file__)
+        assert size > 0 and count > 0
+        assert len(kept) == 5000
+
+    def test_leaves_existing_tracing_running(self):
+        tracemalloc.start()
+        try:
+            with StageProfiler():
+                pass
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    def test_records_failed_spans(self):
+        profiler = StageProfiler(memory=False)
+        with pytest.raises(RuntimeError):
+            with Instrumentation(profiler).span("fetch"):
+                raise RuntimeError("boom")
+        assert profiler.calls == {"fetch": 1}
+
+    def test_skips_when_another_profiler_is_active(self):
+        profiler = StageProfiler(memory=False)
+        with patch("websense.profiling.cProfile.Profile") as MockProfile:
+            MockProfile.return_value.enable.side_effect = ValueError("active")
+            with Instrumentation(profiler).span("fetch"):
+                pass
+
+        assert profiler.skipped == 1
+        assert profiler.stats == {}
+        assert "1 spans not profiled" in profiler.summary()
+
+    def test_summary(self):
+        with StageProfiler() as profiler:
+            with Instrumentation(profiler).span("clean"):
+                kept = _work(1000)
+
+        summary = profiler.summary(top=5)
+
+        assert "== clean: 1 spans" in summary
+        assert "_work" in summary
+        assert "Top allocations (clean):" in summary
+        assert kept
+
+    def test_dump(self, tmp_path):
+        profiler = StageProfiler(memory=False)
+        instrumentation = Instrumentation(profiler)
+        with instrumentation.span("clean"):
+            _work(100)
+        with instrumentation.span("fetch"):
+            _work(100)
+
+        profiler.dump(tmp_path / "all.prof")
+        profiler.dump(tmp_path / "clean.prof", stage="clean")
+
+        merged = pstats.Stats(str(tmp_path / "all.prof"))
+        calls = [v[1] for k, v in merged.stats.items() if k[2] == "_work"]
+        assert calls == [2]
+        assert pstats.Stats(str(tmp_path / "clean.prof")).total_calls > 0
+
+    def test_dump_without_data(self, tmp_path):
+        with pytest.raises(ValueError, match="No profile data"):
+            StageProfiler().dump(tmp_path / "empty.prof")
@@ -0,0 +1,83 @@
+"""Unit tests for schema-driven content pruning."""
+
+from websense.pruning import CURRENCY, DATE, EMAIL, NUMBER, RATING, prune, schema_terms
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "productName": {"type": "string"},
+        "price": {"type": "number"},
+        "reviews": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "rating": {"type": "integer"},
+                    "published_at": {"type": "string", "format": "date"},
+                },
+            },
+        },
+        "condition": {"type": "string", "enum": ["New", "Used"]},
+        "contact": {"type": "string", "format": "email"},
+        "extra": True,
+    },
+}
+FILLER = "\n".join(
+    f"Our brand story, chapter {i}, is about passion." for i in range(50)
+)
+
+
+class TestSchemaTerms:
+    def test_keywords_and_patterns(self):
+        keywords, patterns = schema_terms(SCHEMA)
+
+        assert keywords == {
+            "product",
+            "name",
+            "price",
+            "reviews",
+            "rating",
+            "published",
+            "new",
+            "used",
+            "condition",
+            "contact",
+        }
+        assert set(patterns) == {NUMBER, CURRENCY, RATING, DATE, EMAIL}
+
+    def test_empty_schema(self):
+        assert schema_terms({"type": "object"}) == (set(), [])
+
+
+class TestPrune:
+    def test_keeps_relevant_lines_with_context(self):
+        content = (
+            f"# Store\n{FILLER}\n## Widget\nPrice: $19.99\nIn stock.\n{FILLER}\n"
+            f"Rated 4 out of 5 on 2024-01-02\n{FILLER}"
+        )
+
+        pruned = prune(content, SCHEMA, budget=300, window=1)
+
+        assert len(pruned) <= 300
+        assert "## Widget\nPrice: $19.99\nIn stock." in pruned
+        assert "Rated 4 out of 5 on 2024-01-02" in pruned
+
+    def test_content_within_budget_unchanged(self):
+        assert prune("short", SCHEMA, budget=100) == "short"
+
+    def test_no_match_truncates(self):
+        content = "nothing to see here\n" * 50
+        assert prune(content, {"type": "object"}, budget=30) == content[:30]
+
+    def test_line_without_room_for_context(self):
+        content = "x" * 80 + "\nprice $5\n" + "y" * 80
+
+        assert prune(content, SCHEMA, budget=20) == "price $5"
+
+    def test_best_lines_win(self):
+        content = f"{FILLER}\nProduct name: Widget\n{FILLER}"
+
+        pruned = prune(content, SCHEMA, budget=60, window=0)
+
+        assert pruned.startswith("Product name: Widget")
@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+import requests
+from unittest.mock import MagicMock, Mock
+from websense.metrics import MetricsRegistry
+from websense.parser import Parser
+from websense.scheduler import LLMScheduler, retry_after
+
+
+def rate_limited(retry_after_header=None):
+    response = requests.Response()
+    response.status_code = 429
+    if retry_after_header is not None:
+        response.headers["Retry-After"] = retry_after_header
+    return requests.HTTPError("429 Too Many Requests", response=response)
+
+
+class TestRetryAfter:
+    def test_seconds(self):
+        assert retry_after(rate_limited("3")) == 3.0
+
+    def test_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        delay = retry_after(rate_limited(format_datetime(when, usegmt=True)))
+        assert 25 < delay <= 30
+
+    def test_missing_or_invalid_header(self):
+        assert retry_after(rate_limited()) == 0.0
+        assert retry_after(rate_limited("soon")) == 0.0
+
+    def test_httpx_error(self):
+        request = httpx.Request("POST", "https://api.example.com")
+        response = httpx.Response(429, headers={"Retry-After": "2"}, request=request)
+        error = httpx.HTTPStatusError("429", request=request, response=response)
+        assert retry_after(error) == 2.0
+
+    def test_not_a_rate_limit(self):
+        assert retry_after(ValueError("bad")) is None
+        assert retry_after(requests.HTTPError(response=Mock(status_code=500))) is None
+
+
+class TestLLMScheduler:
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="positive"):
+            LLMScheduler(rpm=0)
+        with pytest.raises(ValueError, match="headroom"):
+            LLMScheduler(tpm=100, headroom=1.5)
+
+    def test_unlimited_does_not_wait(self):
+        scheduler = LLMScheduler()
+        start = time.monotonic()
+        for _ in range(50):
+            scheduler.acquire(1000)
+        assert time.monotonic() - start < 0.1
+
+    def test_paces_requests_per_minute(self):
+        # 1200 rpm = one request per 50 ms, no burst beyond one request
+        scheduler = LLMScheduler(rpm=1200, headroom=1, burst=0)
+        start = time.monotonic()
+        for _ in range(5):
+            scheduler.acquire(10)
+        assert time.monotonic() - start >= 0.18
+
+    def test_paces_tokens_per_minute(self):
+        # 60000 tpm = 1000 tokens per second, burst of 100 tokens
+        scheduler = LLMScheduler(tpm=60000, headroom=1, burst=0.1, output_tokens=0)
+        start = time.monotonic()
+        for _ in range(3):
+            scheduler.acquire(100)
+        assert time.monotonic() - start >= 0.18
+
+    def test_grants_by_priority(self):
+        scheduler = LLMScheduler(rpm=1200, headroom=1, burst=0)
+        scheduler.acquire(1)
+        scheduler.throttled(0.2)
+        order = []
+
+        def call(priority):
+            scheduler.acquire(1, priority=priority)
+            order.append(priority)
+
+        threads = [threading.Thread(target=call, args=(p,)) for p in (0, 2, 1)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+
+        assert order == [2, 1, 0]
+
+    def test_run_retries_rate_limited_calls(self):
+        metrics = MetricsRegistry()
+        scheduler = LLMScheduler(rpm=6000, backoff=0.01, metrics=metrics)
+        fn = MagicMock(side_effect=[rate_limited("0"), {"ok": True}])
+
+        assert scheduler.run(fn, "a", tokens=5) == {"ok": True}
+        assert fn.call_count == 2
+        fn.assert_called_with("a")
+        assert scheduler.throttles == 1
+        assert scheduler.rate_factor == pytest.approx(0.77)
+        assert metrics.get("websense_llm_throttled_total").value() == 1
+        assert metrics.get("websense_llm_queue_seconds").count() == 2
+
+    def test_run_gives_up_after_max_retries(self):
+        scheduler = LLMScheduler(max_retries=1, backoff=0.01)
+        fn = MagicMock(side_effect=rate_limited())
+
+        with pytest.raises(requests.HTTPError):
+            scheduler.run(fn, tokens=5)
+        assert fn.call_count == 2
+
+    def test_run_reraises_other_errors(self):
+        scheduler = LLMScheduler()
+        fn = MagicMock(side_effect=ValueError("bad"))
+
+        with pytest.raises(ValueError):
+            scheduler.run(fn, tokens=5)
+        assert scheduler.throttles == 0
+
+    def test_rate_recovers_after_throttling(self):
+        scheduler = LLMScheduler(backoff=0)
+        for _ in range(20):
+            scheduler.throttled(0)
+        assert scheduler.rate_factor == 0.1
+        for _ in range(100):
+            scheduler.run(lambda: None, tokens=1)
+        assert scheduler.rate_factor == 1.0
+
+
+class TestLLMSchedulerAsync:
+    def test_arun(self):
+        scheduler = LLMScheduler(backoff=0.01)
+        calls = []
+
+        async def fn(value):
+            calls.append(value)
+            if len(calls) == 1:
+                raise rate_limited()
+            return value * 2
+
+        assert asyncio.run(scheduler.arun(fn, 21, tokens=5)) == 42
+        assert scheduler.throttles == 1
+
+    def test_aacquire_by_priority(self):
+        scheduler = LLMScheduler(rpm=1200, headroom=1, burst=0)
+        order = []
+
+        async def call(priority):
+            await scheduler.aacquire(1, priority=priority)
+            order.append(priority)
+
+        async def main():
+            await scheduler.aacquire(1)
+            await asyncio.gather(*(call(p) for p in (0, 1, 2)))
+
+        asyncio.run(main())
+        assert order == [2, 1, 0]
+
+    def test_cancelled_waiter_leaves_queue(self):
+        scheduler = LLMScheduler()
+        scheduler.throttled(5)
+
+        async def main():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(scheduler.aacquire(1), 0.05)
+
+        asyncio.run(main())
+        assert scheduler._queue == []
+
+
+class TestParserScheduling:
+    def test_extract_goes_through_scheduler(self):
+        scheduler = LLMScheduler(backoff=0.01)
+        generate = MagicMock(side_effect=[rate_limited(), {"title": "T"}])
+        metrics = MetricsRegistry()
+        parser = Parser(
+            config=MagicMock(model="m"),
+            metrics=metrics,
+            generate=generate,
+            scheduler=scheduler,
+        )
+
+        assert parser.extract("content", example={"title": "x"}) == {"title": "T"}
+        assert scheduler.throttles == 1
+        calls = metrics.get("websense_llm_requests_total")
+        assert calls.value(model="m", outcome="error") == 1
+        assert calls.value(model="m", outcome="ok") == 1
+
+    def test_extract_async_goes_through_scheduler(self):
+        scheduler = Mock(wraps=LLMScheduler())
+        generate = MagicMock(return_value={"title": "T"})
+        parser = Parser(config=MagicMock(), generate=generate, scheduler=scheduler)
+
+        result = asyncio.run(
+            parser.extract_async("content", example={"title": "x"}, priority=3)
+        )
+
+        assert result == {"title": "T"}
+        assert scheduler.arun.call_args.kwargs["priority"] == 3
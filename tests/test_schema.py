@@ -0,0 +1,174 @@
+from unittest.mock import patch
+
+import pytest
+
+from websense import schema as schema_module
+from websense.schema import (
+    CompiledSchema,
+    cache_info,
+    clear_cache,
+    compile_schema,
+    compile_validator,
+    invalid_fields,
+    schema_key,
+    subschema,
+    validate,
+)
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "price": {"type": "number"},
+        "stock": {"type": "integer"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "seller": {
+            "type": "object",
+            "properties": {"name": {"type": "string"}},
+            "required": ["name"],
+        },
+        "status": {"type": "string", "enum": ["new", "used"]},
+        "note": {"type": ["string", "null"]},
+    },
+    "required": ["title", "price", "tags", "seller"],
+}
+
+VALID = {
+    "title": "Lamp",
+    "price": 10,
+    "stock": 0,
+    "tags": ["home"],
+    "seller": {"name": "Acme"},
+    "status": "new",
+    "note": None,
+}
+
+
+class TestValidate:
+    def test_valid(self):
+        assert validate(VALID, SCHEMA) == []
+
+    def test_missing_and_empty_required(self):
+        data = {**VALID, "title": "  ", "tags": []}
+        del data["price"]
+        paths = [path for path, _ in validate(data, SCHEMA)]
+        assert paths == ["title", "price", "tags"]
+
+    def test_types(self):
+        data = {**VALID, "price": "10", "stock": True, "tags": ["a", 1]}
+        issues = dict(validate(data, SCHEMA))
+        assert issues["price"] == "expected number, got str"
+        assert issues["stock"] == "expected integer, got bool"
+        assert issues["tags[1]"] == "expected string, got int"
+
+    def test_nested_and_enum(self):
+        data = {**VALID, "seller": {"name": None}, "status": "broken"}
+        issues = dict(validate(data, SCHEMA))
+        assert issues["seller.name"] == "missing or empty"
+        assert "not one of" in issues["status"]
+
+    def test_root_type(self):
+        assert validate(["x"], SCHEMA) == [("", "expected object, got list")]
+
+    def test_unconstrained_schema(self):
+        assert validate({"anything": 1}, {}) == []
+
+    def test_compiled_validator_is_reusable(self):
+        check = compile_validator(SCHEMA)
+        assert check(VALID) == []
+        assert check({**VALID, "price": None}) == [("price", "missing or empty")]
+
+
+class TestInvalidFields:
+    def test_top_level_fields_in_schema_order(self):
+        issues = [("tags[0]", "x"), ("seller.name", "x"), ("title", "x")]
+        assert invalid_fields(issues, SCHEMA) == ["title", "tags", "seller"]
+
+    def test_root_failure_means_all_fields(self):
+        assert invalid_fields([("", "x")], SCHEMA) == list(SCHEMA["properties"])
+
+
+class TestSubschema:
+    def test_keeps_only_fields(self):
+        reduced = subschema(SCHEMA, ["price", "stock"])
+        assert list(reduced["properties"]) == ["price", "stock"]
+        assert reduced["required"] == ["price"]
+        assert reduced["type"] == "object"
+        assert list(SCHEMA["properties"])[0] == "title"
+
+    def test_without_required(self):
+        schema = {"type": "object", "properties": {"a": {}, "b": {}}}
+        assert subschema(schema, ["b"]) == {"type": "object", "properties": {"b": {}}}
+
+
+class TestCompiledSchema:
+    def test_attributes(self):
+        compiled = CompiledSchema(SCHEMA)
+        assert compiled.schema is SCHEMA
+        assert compiled.fields[:2] == ("title", "price")
+        assert compiled.field_list.startswith("title, price, stock")
+        assert compiled.validate(VALID) == []
+
+    def test_key_ignores_key_order(self):
+        reordered = dict(reversed(list(SCHEMA.items())))
+        assert schema_key(reordered) == schema_key(SCHEMA)
+        assert schema_key({"a": 1}) != schema_key({"a": 2})
+
+    def test_derive_is_memoized(self):
+        compiled = CompiledSchema(SCHEMA)
+        calls = []
+
+        def build(schema):
+            calls.append(schema)
+            return {"wrapped": schema}
+
+        assert compiled.derive("x", build) is compiled.derive("x", build)
+        assert calls == [SCHEMA]
+        assert compiled.subschema(["price"]) is compiled.subschema(["price"])
+        assert list(compiled.subschema(["price"])["properties"]) == ["price"]
+
+    def test_valid_fields(self):
+        compiled = CompiledSchema(SCHEMA)
+        answer = {"title": "T", "price": "cheap", "stock": None}
+
+        assert compiled.valid_fields(answer, ["title", "price", "stock"]) == ["title"]
+
+
+class TestCompileSchema:
+    def setup_method(self):
+        clear_cache()
+
+    def test_caches_schemas(self):
+        first = compile_schema(SCHEMA)
+        assert compile_schema(dict(SCHEMA)) is first
+        assert cache_info() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_converts_examples_once(self):
+        with patch.object(
+            schema_module, "convert_example_to_schema", return_value=SCHEMA
+        ) as convert:
+            first = compile_schema(example={"title": "x"})
+            second = compile_schema(example={"title": "x"})
+        assert first is second
+        assert first.schema is SCHEMA
+        convert.assert_called_once_with({"title": "x"})
+
+    def test_passes_compiled_through(self):
+        compiled = CompiledSchema(SCHEMA)
+        assert compile_schema(compiled) is compiled
+        assert cache_info()["misses"] == 0
+
+    def test_requires_schema_or_example(self):
+        with pytest.raises(ValueError, match="schema or a JSON example"):
+            compile_schema()
+
+    def test_evicts_least_recently_used(self):
+        with patch.object(schema_module, "_CACHE_SIZE", 2):
+            first = compile_schema({"type": "string"})
+            compile_schema({"type": "number"})
+            compile_schema({"type": "string"})
+            compile_schema({"type": "integer"})
+            assert cache_info()["size"] == 2
+            assert compile_schema({"type": "string"}) is first
+            assert cache_info()["misses"] == 3
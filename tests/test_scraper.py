@@ -1,5 +1,13 @@
-from unittest.mock import Mock, patch, MagicMock
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+from websense.cascade import ModelCascade
+from websense.index import LocalIndex
+from websense.instrumentation import Instrumentation, MemorySink
+from websense.metrics import MetricsRegistry
+from websense.schema import CompiledSchema
 from websense.scraper import Scraper
+from websense.searcher import SearchCache, Searcher
+from websense.store import PageStore, StoreFetcher
 import pytest
 
 
@@ -18,6 +26,31 @@ class TestScraper:
         MockConfig.from_env.assert_called_once()
         assert scraper.searcher == MockSearcher.return_value
 
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Cleaner")
+    def test_clean_processes(self, MockCleaner, MockConfig):
+        boilerplate = Mock()
+        scraper = Scraper(clean_processes=4, boilerplate=boilerplate)
+
+        assert MockCleaner.call_args.kwargs["processes"] == 4
+        assert MockCleaner.call_args.kwargs["boilerplate"] is boilerplate
+        scraper.close()
+        MockCleaner.return_value.close.assert_called_once()
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Parser")
+    def test_cascade(self, MockParser, MockConfig):
+        metrics = MetricsRegistry()
+        Scraper(metrics=metrics, cascade=["cheap", "strong"])
+
+        cascade = MockParser.call_args.kwargs["cascade"]
+        assert cascade.models == ["cheap", "strong"]
+        assert cascade.metrics is metrics
+
+        existing = ModelCascade(["a", "b"], escalate="page")
+        Scraper(cascade=existing)
+        assert MockParser.call_args.kwargs["cascade"] is existing
+
     @patch("websense.scraper.Config")
     @patch("websense.scraper.Fetcher")
     @patch("websense.scraper.Cleaner")
@@ -30,7 +63,8 @@ class TestScraper:
         mock_cleaner_instance = MockCleaner.return_value
 
         mock_response = Mock()
-        mock_response.text = "<html>Raw Content</html>"
+        mock_response.content = b"<html>Raw Content</html>"
+        mock_response.encoding = "cp1252"
         mock_fetcher_instance.fetch.return_value = mock_response
 
         mock_cleaner_instance.to_markdown.return_value = "# Markdown Content"
@@ -39,6 +73,27 @@ class TestScraper:
         result = scraper.get_content("http://example.com")
 
         assert result == "# Markdown Content"
+        mock_cleaner_instance.to_markdown.assert_called_once_with(
+            b"<html>Raw Content</html>", "cp1252", "http://example.com"
+        )
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    def test_get_content_compact(self, MockCleaner, MockFetcher, MockConfig):
+        MockFetcher.return_value.fetch.return_value = Mock(
+            content=b"<p>a</p>", encoding="utf-8"
+        )
+        MockCleaner.return_value.to_compact_markdown.return_value = "a"
+
+        scraper = Scraper(compact=True)
+
+        assert scraper.get_content("http://example.com") == "a"
+        assert scraper.get_content("http://example.com", convert_markdown=False)
+        MockCleaner.return_value.to_compact_markdown.assert_called_once_with(
+            b"<p>a</p>", "utf-8", "http://example.com"
+        )
+        MockCleaner.return_value.to_text.assert_called_once()
 
     @patch("websense.scraper.Config")
     @patch("websense.scraper.Fetcher")
@@ -59,6 +114,64 @@ class TestScraper:
 
         assert result == {"key": "value"}
 
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Parser")
+    def test_scrape_multi(self, MockParser, MockCleaner, MockFetcher, MockConfig):
+        MockCleaner.return_value.to_markdown.return_value = "# Content"
+        MockParser.return_value.extract_multi.return_value = {"a": {}, "b": {}}
+        sink = MemorySink()
+
+        scraper = Scraper(instrumentation=Instrumentation(sink))
+        result = scraper.scrape_multi(
+            "http://example.com",
+            examples={"a": {"x": 1}, "b": {"y": 2}},
+            group_size=1,
+            extract_kwargs={"prune": 100},
+        )
+
+        assert result == {"a": {}, "b": {}}
+        MockFetcher.return_value.fetch.assert_called_once()
+        MockParser.return_value.extract_multi.assert_called_once_with(
+            "# Content",
+            schemas=None,
+            examples={"a": {"x": 1}, "b": {"y": 2}},
+            group_size=1,
+            prune=100,
+        )
+        assert [span.stage for span in sink.spans] == ["fetch", "clean", "extract"]
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Parser")
+    def test_scrape_many_batches_pages(
+        self, MockParser, MockCleaner, MockFetcher, MockConfig
+    ):
+        def fetch(url):
+            if url.endswith("bad"):
+                raise RuntimeError("down")
+            return Mock(content=url.encode(), encoding="utf-8")
+
+        MockFetcher.return_value.fetch.side_effect = fetch
+        MockCleaner.return_value.to_markdown.side_effect = lambda html, enc, url: url
+        MockParser.return_value.extract.return_value = {
+            "results": [{"index": 0, "data": {"n": 0}}, {"index": 1, "data": {"n": 1}}]
+        }
+
+        scraper = Scraper()
+        results = scraper.scrape_many(
+            ["https://a.com/0", "https://a.com/bad", "https://a.com/1"],
+            example={"n": 0},
+            batch_size=2,
+        )
+
+        assert results == [{"n": 0}, None, {"n": 1}]
+        MockParser.return_value.extract.assert_called_once()
+        content = MockParser.return_value.extract.call_args.args[0]
+        assert "### Page 1\nhttps://a.com/1" in content
+
     @patch("websense.scraper.Config")
     @patch("websense.scraper.Fetcher")
     @patch("websense.scraper.Cleaner")
@@ -71,7 +184,7 @@ class TestScraper:
         MockConfig.from_env.return_value = mock_config_instance
 
         mock_searcher = MockSearcher.return_value
-        mock_searcher.search.return_value = [{"url": "https://example.com/1"}]
+        mock_searcher.iter_search.return_value = [{"url": "https://example.com/1"}]
 
         mock_parser = MockParser.return_value
         mock_parser.extract.return_value = {"field": "data"}
@@ -94,19 +207,232 @@ class TestScraper:
         MockConfig.from_env.return_value = mock_config_instance
 
         mock_searcher = MockSearcher.return_value
-        mock_searcher.search.return_value = [
+        mock_searcher.iter_search.return_value = [
             {"url": "https://example.com/1"},
             {"url": "https://example.com/2"},
         ]
 
+        MockCleaner.return_value.to_markdown.side_effect = [
+            "Starship launch report from the Boca Chica site",
+            "Quarterly earnings summary for a chip maker",
+        ]
+
         mock_parser = MockParser.return_value
         # side_effect: first two for individual scrapes, third for consolidation (judge)
         mock_parser.extract.side_effect = [{"f": 1}, {"f": 2}, {"f": "consolidated"}]
 
+        scraper = Scraper()
+        result = scraper.search_and_scrape(
+            "query", example={"f": 0}, max_results=2, extract_kwargs={}
+        )
+
+        assert result == {"f": "consolidated"}
+        mock_searcher.iter_search.assert_called_once_with("query", 4, "wt-wt")
+        # The example is compiled once and shared by the sources and the judge
+        calls = mock_parser.extract.call_args_list
+        compiled = calls[0].kwargs["schema"]
+        assert isinstance(compiled, CompiledSchema)
+        assert "example" not in calls[0].kwargs
+        assert [c.kwargs["schema"] for c in calls] == [compiled] * 3
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Parser")
+    @patch("websense.scraper.Searcher")
+    def test_search_and_scrape_skips_duplicates(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, MockConfig
+    ):
+        MockConfig.from_env.return_value = MagicMock()
+        MockSearcher.return_value.iter_search.return_value = [
+            {"url": "https://example.com/1"},
+            {"url": "https://mirror.example.com/1"},
+            {"url": "https://example.com/2"},
+            {"url": "https://example.com/3"},
+        ]
+        article = "Starship launch report from the Boca Chica site on Tuesday"
+        pages = {
+            "https://example.com/1": article,
+            "https://mirror.example.com/1": article,
+            "https://example.com/3": "Quarterly earnings summary for a chip maker",
+        }
+
+        def fetch(url):
+            if url not in pages:
+                raise RuntimeError("Failed to fetch")
+            return Mock(content=pages[url], encoding="utf-8")
+
+        MockFetcher.return_value.fetch.side_effect = fetch
+        MockCleaner.return_value.to_markdown.side_effect = lambda html, enc, url: html
+        mock_parser = MockParser.return_value
+        mock_parser.extract.side_effect = [{"f": 1}, {"f": 2}, {"f": "consolidated"}]
+
         scraper = Scraper()
         result = scraper.search_and_scrape("query", max_results=2, extract_kwargs={})
 
         assert result == {"f": "consolidated"}
+        contents = {c.args[0] for c in mock_parser.extract.call_args_list[:2]}
+        assert contents == {article, "Quarterly earnings summary for a chip maker"}
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Parser")
+    @patch("websense.scraper.Searcher")
+    def test_search_and_scrape_all_duplicates_skips_judge(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, MockConfig
+    ):
+        MockConfig.from_env.return_value = MagicMock()
+        MockSearcher.return_value.iter_search.return_value = [
+            {"url": "https://example.com/1"},
+            {"url": "https://mirror.example.com/1"},
+        ]
+        MockCleaner.return_value.to_markdown.return_value = "Same syndicated article"
+        MockParser.return_value.extract.return_value = {"f": 1}
+
+        scraper = Scraper()
+        result = scraper.search_and_scrape("query", max_results=2, extract_kwargs={})
+
+        assert result == {"f": 1}
+        MockParser.return_value.extract.assert_called_once()
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Parser")
+    @patch("websense.scraper.Searcher")
+    def test_search_and_scrape_no_dedup(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, MockConfig
+    ):
+        MockConfig.from_env.return_value = MagicMock()
+        mock_searcher = MockSearcher.return_value
+        mock_searcher.iter_search.return_value = [
+            {"url": "https://example.com/1"},
+            {"url": "https://mirror.example.com/1"},
+        ]
+        MockCleaner.return_value.to_markdown.return_value = "Same syndicated article"
+        MockParser.return_value.extract.side_effect = [{"f": 1}, {"f": 1}, {"f": 1}]
+
+        scraper = Scraper()
+        scraper.search_and_scrape(
+            "query", max_results=2, extract_kwargs={}, dedup=False
+        )
+
+        mock_searcher.iter_search.assert_called_once_with("query", 2, "wt-wt")
+        assert MockParser.return_value.extract.call_count == 3
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Parser")
+    @patch("websense.scraper.Searcher")
+    def test_search_and_scrape_stops_consuming_stream(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, MockConfig
+    ):
+        MockConfig.from_env.return_value = MagicMock()
+        yielded = []
+
+        def stream(query, max_results, region):
+            for i in range(max_results):
+                yielded.append(i)
+                yield {"url": f"https://example.com/{i}"}
+
+        MockSearcher.return_value.iter_search.side_effect = stream
+        MockFetcher.return_value.fetch.side_effect = lambda url: Mock(content=url)
+        MockCleaner.return_value.to_markdown.side_effect = lambda html, enc, url: (
+            f"Distinct article about topic {html[-1]} " * (int(html[-1]) + 1)
+        )
+        MockParser.return_value.extract.return_value = {"f": 1}
+
+        scraper = Scraper()
+        scraper.search_and_scrape("query", max_results=2, extract_kwargs={})
+
+        assert yielded == [0, 1]
+        assert MockFetcher.return_value.fetch.call_count == 2
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Searcher")
+    def test_search_and_scrape_all_fetches_fail(
+        self, MockSearcher, MockCleaner, MockFetcher, MockConfig, caplog
+    ):
+        MockConfig.from_env.return_value = MagicMock()
+        MockSearcher.return_value.iter_search.return_value = [
+            {"url": "https://example.com/1"},
+            {"url": "https://example.com/2"},
+        ]
+        MockFetcher.return_value.fetch.side_effect = RuntimeError("Failed to fetch")
+
+        scraper = Scraper()
+        with pytest.raises(RuntimeError, match="Failed to fetch any result"):
+            scraper.search_and_scrape("query", max_results=2, extract_kwargs={})
+        assert "Skipping search result: Failed to fetch" in caplog.text
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Parser")
+    def test_search_and_scrape_offline(self, MockParser, MockConfig, tmp_path):
+        MockConfig.from_env.return_value = MagicMock()
+        MockParser.return_value.extract.return_value = {"f": 1}
+        with PageStore(tmp_path / "store") as store:
+            store.put("https://a.com/", b"<p>Starship launch report</p>")
+            store.put("https://b.com/", b"<p>Gardening tools</p>")
+            scraper = Scraper(
+                searcher=Searcher(backend=LocalIndex.from_store(store)),
+                fetcher=StoreFetcher(store),
+            )
+
+            result = scraper.search_and_scrape("starship", extract_kwargs={})
+
+        assert result == {"f": 1}
+        content = MockParser.return_value.extract.call_args.args[0]
+        assert "Starship launch report" in content
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Parser")
+    def test_search_and_scrape_reuses_cached_search(
+        self, MockParser, MockCleaner, MockFetcher, MockConfig
+    ):
+        backend = MagicMock(min_interval=0.0)
+        backend.search.return_value = [
+            {"url": f"https://example.com/{i}"} for i in range(4)
+        ]
+        MockCleaner.return_value.to_markdown.side_effect = lambda html, enc, url: (
+            f"Distinct article at {url} " * 5
+        )
+        MockParser.return_value.extract.return_value = {"f": 1}
+        searcher = Searcher(backend=backend, cache=SearchCache(ttl=60))
+        scraper = Scraper(searcher=searcher)
+
+        for _ in range(3):
+            scraper.search_and_scrape("query", max_results=2, extract_kwargs={})
+
+        backend.search.assert_called_once_with("query", 4, "wt-wt")
+        backend.iter_search.assert_not_called()
+
+    @patch("websense.searcher.DDGS")
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Parser")
+    def test_search_and_scrape_records_search_metrics(
+        self, MockParser, MockCleaner, MockFetcher, MockConfig, MockDDGS
+    ):
+        MockConfig.from_env.return_value = MagicMock()
+        MockDDGS.return_value.text.return_value = [{"href": "https://a.com"}]
+        MockParser.return_value.extract.return_value = {"f": 1}
+        metrics = MetricsRegistry()
+
+        scraper = Scraper(metrics=metrics)
+        scraper.searcher.backend.min_interval = 0
+        scraper.search_and_scrape("query", max_results=1, extract_kwargs={})
+
+        queries = metrics.get("websense_search_requests_total")
+        assert queries.value(backend="DuckDuckGoBackend", outcome="ok") == 1
+        latency = metrics.get("websense_search_duration_seconds")
+        assert latency.count(backend="DuckDuckGoBackend") == 1
 
     def test_judge(self):
         """Test the _judge method directly."""
@@ -128,6 +454,43 @@ class TestScraper:
             # Verify data was passed in the prompt
             call_args = mock_parser.extract.call_args
             assert "test query" in call_args[1]["prompt"]
+            assert call_args[1]["priority"] == 1
+
+    @patch("websense.scraper.Config")
+    @patch("websense.scraper.Fetcher")
+    @patch("websense.scraper.Cleaner")
+    @patch("websense.scraper.Parser")
+    @patch("websense.scraper.Searcher")
+    def test_search_and_scrape_emits_spans(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, MockConfig
+    ):
+        MockConfig.from_env.return_value = MagicMock()
+        MockSearcher.return_value.iter_search.return_value = [
+            {"url": "https://example.com/1"},
+            {"url": "https://example.com/2"},
+        ]
+        MockFetcher.return_value.fetch.side_effect = lambda url: Mock(
+            text=f"<p>{url}</p>", content=url.encode(), status_code=200
+        )
+        MockCleaner.return_value.to_markdown.side_effect = [
+            "Starship launch report from the Boca Chica site",
+            "Quarterly earnings summary for a chip maker",
+        ]
+        MockParser.return_value.extract.return_value = {"f": 1}
+        sink = MemorySink()
+
+        scraper = Scraper(instrumentation=Instrumentation(sink))
+        scraper.search_and_scrape("query", max_results=2, extract_kwargs={})
+
+        stages = sorted(s.stage for s in sink.spans)
+        assert stages == sorted(
+            ["search"] + ["fetch", "clean", "extract"] * 2 + ["judge"]
+        )
+        fetch = next(s for s in sink.spans if s.stage == "fetch")
+        assert fetch.attrs["status"] == 200
+        assert fetch.attrs["bytes"] == len(fetch.attrs["url"])
+        clean = next(s for s in sink.spans if s.stage == "clean")
+        assert clean.attrs["chars"] > 0
 
     @patch("websense.scraper.Config")
     @patch("websense.scraper.Searcher")
@@ -135,7 +498,154 @@ class TestScraper:
         """Test search_and_scrape raising error when no results."""
         mock_config_instance = MagicMock()
         MockConfig.from_env.return_value = mock_config_instance
-        MockSearcher.return_value.search.return_value = []
+        MockSearcher.return_value.iter_search.return_value = []
         scraper = Scraper()
         with pytest.raises(RuntimeError, match="No search results found"):
             scraper.search_and_scrape("query", extract_kwargs={})
+
+
+@patch("websense.scraper.Config")
+@patch("websense.scraper.Fetcher")
+@patch("websense.scraper.Cleaner")
+@patch("websense.scraper.Parser")
+@patch("websense.scraper.Searcher")
+class TestAsyncScraper:
+    def test_ascrape(self, MockSearcher, MockParser, MockCleaner, MockFetcher, _):
+        MockFetcher.return_value.afetch = AsyncMock(
+            return_value=Mock(content=b"<p>hi</p>", encoding="utf-8", status_code=200)
+        )
+        MockCleaner.return_value.to_markdown.return_value = "hi"
+        MockParser.return_value.extract_async = AsyncMock(return_value={"f": 1})
+        sink = MemorySink()
+        scraper = Scraper(instrumentation=Instrumentation(sink))
+
+        result = asyncio.run(
+            scraper.ascrape(
+                "http://example.com", example={"f": 0}, extract_kwargs={"prune": 100}
+            )
+        )
+
+        assert result == {"f": 1}
+        url, client = MockFetcher.return_value.afetch.call_args.args
+        assert url == "http://example.com"
+        MockCleaner.return_value.to_markdown.assert_called_once_with(
+            b"<p>hi</p>", "utf-8", "http://example.com"
+        )
+        kwargs = MockParser.return_value.extract_async.call_args.kwargs
+        assert kwargs["client"] is client
+        assert kwargs["prune"] == 100
+        assert [s.stage for s in sink.spans] == ["fetch", "clean", "extract"]
+
+    def test_asearch_and_scrape_single(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, _
+    ):
+        MockSearcher.return_value.search.return_value = [{"url": "https://a.com"}]
+        MockFetcher.return_value.afetch = AsyncMock(
+            return_value=Mock(content=b"", encoding="utf-8")
+        )
+        MockCleaner.return_value.to_markdown.return_value = "page"
+        MockParser.return_value.extract_async = AsyncMock(return_value={"f": 1})
+        scraper = Scraper()
+        extract_kwargs = {}
+
+        result = asyncio.run(
+            scraper.asearch_and_scrape(
+                "query", schema={"type": "object"}, extract_kwargs=extract_kwargs
+            )
+        )
+
+        assert result == {"f": 1}
+        MockSearcher.return_value.search.assert_called_once_with("query", 1, "wt-wt")
+        kwargs = MockParser.return_value.extract_async.call_args.kwargs
+        assert "'query'" in kwargs["prompt"]
+        assert kwargs["schema"].schema == {"type": "object"}
+        assert extract_kwargs == {}
+
+    def test_asearch_and_scrape_multi(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, _
+    ):
+        MockSearcher.return_value.search.return_value = [
+            {"url": "https://example.com/1"},
+            {"url": "https://mirror.example.com/1"},
+            {"url": "https://example.com/2"},
+            {"url": "https://example.com/3"},
+        ]
+        article = "Starship launch report from the Boca Chica site on Tuesday"
+        pages = {
+            "https://example.com/1": article,
+            "https://mirror.example.com/1": article,
+            "https://example.com/3": "Quarterly earnings summary for a chip maker",
+        }
+
+        async def afetch(url, client):
+            if url not in pages:
+                raise RuntimeError("Failed to fetch")
+            return Mock(content=pages[url], encoding="utf-8")
+
+        MockFetcher.return_value.afetch = afetch
+        MockCleaner.return_value.to_markdown.side_effect = lambda html, enc, url: html
+        mock_parser = MockParser.return_value
+        mock_parser.extract_async = AsyncMock(
+            side_effect=[{"f": 1}, {"f": 2}, {"f": "consolidated"}]
+        )
+        scraper = Scraper()
+
+        result = asyncio.run(
+            scraper.asearch_and_scrape("query", max_results=2, max_concurrency=2)
+        )
+
+        assert result == {"f": "consolidated"}
+        MockSearcher.return_value.search.assert_called_once_with("query", 4, "wt-wt")
+        calls = mock_parser.extract_async.call_args_list
+        contents = [c.args[0] for c in calls[:2]]
+        assert contents == [article, "Quarterly earnings summary for a chip maker"]
+        judge = calls[2].kwargs
+        assert judge["example"] == {"f": 1}
+        assert judge["priority"] == 1
+        assert judge["client"] is calls[0].kwargs["client"]
+        mock_parser.extract.assert_not_called()
+
+    def test_asearch_and_scrape_fetches_extra_results_lazily(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, _
+    ):
+        MockSearcher.return_value.search.return_value = [
+            {"url": f"https://example.com/{i}"} for i in range(4)
+        ]
+        fetched = []
+
+        async def afetch(url, client):
+            fetched.append(url)
+            return Mock(content=f"Distinct article number {url[-1]} " * 5)
+
+        MockFetcher.return_value.afetch = afetch
+        MockCleaner.return_value.to_markdown.side_effect = lambda html, enc, url: html
+        MockParser.return_value.extract_async = AsyncMock(return_value={"f": 1})
+        scraper = Scraper()
+
+        asyncio.run(scraper.asearch_and_scrape("query", max_results=2))
+
+        assert fetched == ["https://example.com/0", "https://example.com/1"]
+
+    def test_asearch_and_scrape_all_fetches_fail(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, _
+    ):
+        MockSearcher.return_value.search.return_value = [
+            {"url": "https://example.com/1"},
+            {"url": "https://example.com/2"},
+        ]
+        MockFetcher.return_value.afetch = AsyncMock(
+            side_effect=RuntimeError("Failed to fetch")
+        )
+        scraper = Scraper()
+
+        with pytest.raises(RuntimeError, match="Failed to fetch any result"):
+            asyncio.run(scraper.asearch_and_scrape("query", max_results=2))
+
+    def test_asearch_and_scrape_no_results(
+        self, MockSearcher, MockParser, MockCleaner, MockFetcher, _
+    ):
+        MockSearcher.return_value.search.return_value = []
+        scraper = Scraper()
+
+        with pytest.raises(RuntimeError, match="No search results found"):
+            asyncio.run(scraper.asearch_and_scrape("query"))
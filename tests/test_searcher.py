@@ -1,6 +1,8 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 import pytest
-from websense.searcher import Searcher
+from ddgs.exceptions import DDGSException
+from websense.metrics import MetricsRegistry
+from websense.searcher import SearchCache, Searcher, merge_results, normalize_url
 
 
 class TestSearcher:
@@ -78,3 +80,357 @@ class TestSearcher:
             searcher.search("test query", max_results=5, region="wt-wt")
 
         assert "Search failed for query 'test query'" in str(exc_info.value)
+
+    def test_search_with_custom_backend(self):
+        """Test search delegates to a custom backend."""
+        backend = MagicMock()
+        backend.search.return_value = [{"title": "T", "url": "u", "description": ""}]
+
+        searcher = Searcher(backend=backend)
+        results = searcher.search("test query", max_results=3, region="us-en")
+
+        assert results == backend.search.return_value
+        backend.search.assert_called_once_with("test query", 3, "us-en")
+
+
+class TestSearchCache:
+    """Tests for SearchCache and cached Searcher lookups."""
+
+    def test_get_miss(self):
+        """Test get returns None for unknown keys."""
+        assert SearchCache().get(("q", "wt-wt", 5)) == (None, False)
+
+    def test_set_and_get_fresh(self):
+        """Test stored results are returned as fresh copies."""
+        cache = SearchCache(ttl=60)
+        results = [{"title": "T", "url": "https://a.com", "description": ""}]
+        cache.set(("q", "wt-wt", 5), results)
+
+        cached, fresh = cache.get(("q", "wt-wt", 5))
+        assert cached == results and fresh
+        cached[0]["title"] = "changed"
+        assert cache.get(("q", "wt-wt", 5))[0] == results
+
+    @patch("websense.searcher.time.time")
+    def test_stale_and_expired(self, mock_time):
+        """Test entries turn stale after ttl and expire after stale_ttl."""
+        cache = SearchCache(ttl=10, stale_ttl=20)
+        mock_time.return_value = 100
+        cache.set(("q", "wt-wt", 5), [{"url": "https://a.com"}])
+
+        mock_time.return_value = 115
+        assert cache.get(("q", "wt-wt", 5)) == ([{"url": "https://a.com"}], False)
+        mock_time.return_value = 131
+        assert cache.get(("q", "wt-wt", 5)) == (None, False)
+
+    def test_disk_tier(self, tmp_path):
+        """Test results persist across cache instances sharing a directory."""
+        SearchCache(directory=tmp_path).set(("q", "wt-wt", 5), [{"url": "u"}])
+
+        cache = SearchCache(directory=tmp_path)
+        assert cache.get(("q", "wt-wt", 5)) == ([{"url": "u"}], True)
+        assert cache.get(("other", "wt-wt", 5)) == (None, False)
+
+        cache.clear()
+        assert SearchCache(directory=tmp_path).get(("q", "wt-wt", 5))[0] is None
+
+    def test_evicts_least_recently_used(self):
+        """Test the memory tier keeps at most max_entries results."""
+        cache = SearchCache(max_entries=2)
+        cache.set(("a",), [])
+        cache.set(("b",), [])
+        cache.get(("a",))
+        cache.set(("c",), [])
+
+        assert list(cache._entries) == [("a",), ("c",)]
+
+    @patch("websense.searcher.time.time")
+    def test_prunes_expired_entries(self, mock_time, tmp_path):
+        """Test expired entries are dropped on get and set."""
+        cache = SearchCache(ttl=10, directory=tmp_path)
+        mock_time.return_value = 100
+        cache.set(("a",), [])
+        cache.set(("b",), [])
+
+        mock_time.return_value = 200
+        assert cache.get(("a",)) == (None, False)
+        assert not cache._path(("a",)).exists()
+        cache.set(("c",), [])
+        assert list(cache._entries) == [("c",)]
+
+    def test_disk_writes_are_atomic(self, tmp_path):
+        """Test a failed write leaves the previous entry readable."""
+        cache = SearchCache(directory=tmp_path)
+        cache.set(("q",), [{"url": "old"}])
+
+        with (
+            patch("websense.searcher.os.replace", side_effect=OSError("disk full")),
+            pytest.raises(OSError),
+        ):
+            cache.set(("q",), [{"url": "new"}])
+
+        assert SearchCache(directory=tmp_path).get(("q",))[0] == [{"url": "old"}]
+        assert [p.name for p in tmp_path.glob("*.json")] == [cache._path(("q",)).name]
+
+    def test_disk_tier_ignores_corrupt_files(self, tmp_path):
+        """Test unreadable disk entries count as misses."""
+        cache = SearchCache(directory=tmp_path)
+        cache._path(("q", "wt-wt", 5)).write_text("not json", encoding="utf-8")
+        assert cache.get(("q", "wt-wt", 5)) == (None, False)
+
+    @patch("websense.searcher.DDGS")
+    def test_search_uses_cache(self, MockDDGS):
+        """Test repeated queries hit the cache instead of DDGS."""
+        MockDDGS.return_value.text.return_value = [{"href": "https://a.com"}]
+
+        searcher = Searcher(cache=SearchCache(ttl=60))
+        first = searcher.search("test query", max_results=5, region="wt-wt")
+        second = searcher.search("test query", max_results=5, region="wt-wt")
+
+        assert first == second
+        MockDDGS.return_value.text.assert_called_once()
+
+    @patch("websense.searcher.DDGS")
+    def test_search_stale_hit_refreshes_in_background(self, MockDDGS):
+        """Test stale hits are served while a background refresh updates them."""
+        MockDDGS.return_value.text.return_value = [{"href": "https://new.com"}]
+        cache = SearchCache(ttl=0, stale_ttl=60)
+        cache.set(("q", "wt-wt", 5), [{"url": "https://old.com"}])
+        searcher = Searcher(cache=cache)
+
+        with patch("websense.searcher.threading.Thread") as MockThread:
+            results = searcher.search("q", max_results=5, region="wt-wt")
+            searcher.search("q", max_results=5, region="wt-wt")
+            run = MockThread.call_args.kwargs["target"]
+
+        assert results == [{"url": "https://old.com"}]
+        MockThread.assert_called_once()
+        run()
+        assert cache.get(("q", "wt-wt", 5))[0][0]["url"] == "https://new.com"
+        assert searcher._refreshing == set()
+
+    @patch("websense.searcher.DDGS")
+    def test_background_refresh_failure_keeps_stale(self, MockDDGS):
+        """Test a failed refresh leaves the stale entry in place."""
+        MockDDGS.return_value.text.side_effect = Exception("Network error")
+        cache = SearchCache(ttl=0, stale_ttl=60)
+        cache.set(("q", "wt-wt", 5), [{"url": "https://old.com"}])
+        searcher = Searcher(cache=cache)
+
+        with patch("websense.searcher.threading.Thread") as MockThread:
+            searcher.search("q", max_results=5, region="wt-wt")
+        MockThread.call_args.kwargs["target"]()
+
+        assert cache.get(("q", "wt-wt", 5))[0] == [{"url": "https://old.com"}]
+        assert searcher._refreshing == set()
+
+
+class TestSearchMany:
+    """Tests for batched searches and result merging."""
+
+    @staticmethod
+    def _backend():
+        backend = MagicMock(min_interval=0.0)
+        backend.search.side_effect = lambda q, n, r: [
+            {"title": q, "url": f"https://{r}.example.com/{q}", "description": ""},
+            {"title": "shared", "url": "https://Shared.com/page/", "description": ""},
+        ]
+        return backend
+
+    def test_search_many_fans_out_over_queries_and_regions(self):
+        """Test every (query, region) pair is searched and merged per query."""
+        backend = self._backend()
+        searcher = Searcher(backend=backend)
+
+        results = searcher.search_many(
+            ["a", "b", "a"], max_results=2, regions=["us-en", "de-de"]
+        )
+
+        assert list(results) == ["a", "b"]
+        assert backend.search.call_count == 4
+        assert [r["url"] for r in results["a"]] == [
+            "https://us-en.example.com/a",
+            "https://Shared.com/page/",
+            "https://de-de.example.com/a",
+        ]
+
+    def test_search_many_empty(self):
+        """Test no queries returns an empty mapping."""
+        assert Searcher(backend=self._backend()).search_many([]) == {}
+
+    def test_search_many_raises_on_error(self):
+        """Test a failing query raises RuntimeError."""
+        backend = MagicMock(min_interval=0.0)
+        backend.search.side_effect = Exception("Network error")
+        with pytest.raises(RuntimeError, match="Search failed for query 'a'"):
+            Searcher(backend=backend).search_many(["a"])
+
+    def test_merge_results(self):
+        """Test merged results are unique, rank-interleaved and keep queries."""
+        merged = merge_results(
+            {
+                "a": [{"url": "https://x.com/1"}, {"url": "https://y.com"}],
+                "b": [{"url": "https://y.com/#top"}],
+            }
+        )
+        assert merged == [
+            {"url": "https://x.com/1", "queries": ["a"]},
+            {"url": "https://y.com/#top", "queries": ["b", "a"]},
+        ]
+
+    def test_normalize_url(self):
+        """Test URL normalization for de-duplication."""
+        assert normalize_url("HTTPS://Example.com/Path/?q=1#frag") == (
+            "https://example.com/Path?q=1"
+        )
+
+    @patch("websense.searcher.time.sleep")
+    @patch("websense.searcher.time.monotonic")
+    def test_throttle_spaces_backend_calls(self, mock_monotonic, mock_sleep):
+        """Test min_interval delays back-to-back queries."""
+        mock_monotonic.return_value = 100.0
+        searcher = Searcher(backend=self._backend(), min_interval=2.0)
+
+        searcher.search("a")
+        searcher.search("b")
+
+        mock_sleep.assert_called_once_with(2.0)
+
+    @patch("websense.searcher.DDGS")
+    def test_duckduckgo_backend_reuses_client(self, MockDDGS):
+        """Test the DuckDuckGo backend creates a single client."""
+        MockDDGS.return_value.text.return_value = []
+        searcher = Searcher(min_interval=0)
+        searcher.search("a")
+        searcher.search("b")
+
+        MockDDGS.assert_called_once()
+        assert searcher.backend.min_interval == 0.5
+
+
+class TestIterSearch:
+    """Tests for streaming search results."""
+
+    @patch("websense.searcher.DDGS")
+    def test_duckduckgo_iter_search_pages(self, MockDDGS):
+        """Test results are yielded page by page until max_results."""
+        MockDDGS.return_value.text.side_effect = [
+            [{"href": "https://a.com"}, {"href": "https://b.com"}],
+            [{"href": "https://b.com"}, {"href": "https://c.com"}],
+        ]
+        searcher = Searcher(min_interval=0)
+
+        urls = [r["url"] for r in searcher.iter_search("q", max_results=3)]
+
+        assert urls == ["https://a.com", "https://b.com", "https://c.com"]
+        assert MockDDGS.return_value.text.call_args.kwargs["page"] == 2
+
+    @patch("websense.searcher.DDGS")
+    def test_duckduckgo_iter_search_throttles_each_page(self, MockDDGS):
+        """Test the rate limit is applied before every page request."""
+        MockDDGS.return_value.text.side_effect = [
+            [{"href": "https://a.com"}],
+            [{"href": "https://b.com"}],
+            [],
+        ]
+        searcher = Searcher(min_interval=0)
+
+        with patch.object(searcher, "_throttle") as throttle:
+            assert len(list(searcher.iter_search("q", max_results=5))) == 2
+
+        assert throttle.call_count == 3
+
+    @patch("websense.searcher.DDGS")
+    def test_duckduckgo_iter_search_stops_when_exhausted(self, MockDDGS):
+        """Test streaming stops on an empty or failing later page."""
+        MockDDGS.return_value.text.side_effect = [
+            [{"href": "https://a.com"}],
+            [{"href": "https://a.com"}],
+        ]
+        searcher = Searcher(min_interval=0)
+        assert len(list(searcher.iter_search("q", max_results=5))) == 1
+
+        MockDDGS.return_value.text.side_effect = [
+            [{"href": "https://a.com"}],
+            DDGSException("No results found."),
+        ]
+        assert len(list(searcher.iter_search("q", max_results=5))) == 1
+
+    @patch("websense.searcher.DDGS")
+    def test_duckduckgo_iter_search_first_page_error(self, MockDDGS):
+        """Test a failing first page raises RuntimeError."""
+        MockDDGS.return_value.text.side_effect = DDGSException("No results found.")
+        searcher = Searcher(min_interval=0)
+        with pytest.raises(RuntimeError, match="Search failed for query 'q'"):
+            list(searcher.iter_search("q"))
+
+    def test_iter_search_falls_back_to_search(self):
+        """Test backends without iter_search are searched in one call."""
+        backend = MagicMock(spec=["search"])
+        backend.search.return_value = [{"url": "https://a.com"}]
+        searcher = Searcher(backend=backend, min_interval=0)
+
+        assert list(searcher.iter_search("q")) == [{"url": "https://a.com"}]
+
+    def test_iter_search_with_cache_fills_it_when_stopped_early(self):
+        """Test a cached searcher stores full results even if not drained."""
+        backend = MagicMock(min_interval=0.0)
+        backend.search.return_value = [{"url": "https://a.com"}, {"url": "b"}]
+        cache = SearchCache(ttl=60)
+        searcher = Searcher(backend=backend, cache=cache)
+
+        assert next(searcher.iter_search("q", 5)) == {"url": "https://a.com"}
+        assert len(list(searcher.iter_search("q", 5))) == 2
+        backend.search.assert_called_once_with("q", 5, "wt-wt")
+        backend.iter_search.assert_not_called()
+
+
+class TestSearchMetrics:
+    """Tests for search metrics."""
+
+    def test_records_queries_and_cache_lookups(self):
+        """Test backend outcomes and cache hit/stale/miss counts are recorded."""
+        metrics = MetricsRegistry()
+        backend = MagicMock(min_interval=0.0)
+        backend.search.return_value = [{"url": "https://a.com"}]
+        cache = SearchCache(ttl=60)
+        searcher = Searcher(backend=backend, cache=cache, metrics=metrics)
+
+        searcher.search("q")
+        searcher.search("q")
+        cache.ttl, cache.stale_ttl = 0, 60
+        with patch.object(searcher, "_refresh"):
+            searcher.search("q")
+        backend.search.side_effect = Exception("Network error")
+        with pytest.raises(RuntimeError):
+            searcher.search("other")
+
+        lookups = metrics.get("websense_search_cache_total")
+        assert lookups.value(result="miss") == 2
+        assert lookups.value(result="hit") == 1
+        assert lookups.value(result="stale") == 1
+        queries = metrics.get("websense_search_requests_total")
+        assert queries.value(backend="MagicMock", outcome="ok") == 1
+        assert queries.value(backend="MagicMock", outcome="error") == 1
+        assert (
+            metrics.get("websense_search_duration_seconds").count(backend="MagicMock")
+            == 2
+        )
+
+    def test_records_streamed_searches_once(self):
+        """Test streamed searches record one outcome, even when closed early."""
+        metrics = MetricsRegistry()
+        backend = MagicMock(min_interval=0.0)
+        backend.iter_search.return_value = iter([{"url": "a"}, {"url": "b"}])
+        searcher = Searcher(backend=backend, metrics=metrics)
+
+        stream = searcher.iter_search("q")
+        next(stream)
+        stream.close()
+        backend.iter_search.side_effect = Exception("Network error")
+        with pytest.raises(RuntimeError):
+            list(searcher.iter_search("other"))
+
+        queries = metrics.get("websense_search_requests_total")
+        assert queries.value(backend="MagicMock", outcome="ok") == 1
+        assert queries.value(backend="MagicMock", outcome="error") == 1
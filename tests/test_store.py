@@ -0,0 +1,179 @@
+"""Unit tests for the compressed page store."""
+
+import asyncio
+import hashlib
+from unittest.mock import Mock
+
+import pytest
+
+from websense.cleaner import Cleaner
+from websense.metrics import MetricsRegistry
+from websense.store import PageRef, PageStore, StoreFetcher, _HashIndex, _key
+
+
+@pytest.fixture(params=["zstd", "zlib"])
+def store(request, tmp_path):
+    with PageStore(tmp_path / "store", compression=request.param) as store:
+        yield store
+
+
+class TestPageStore:
+    def test_put_and_get(self, store):
+        ref = store.put("https://a.com/", b"<p>a</p>")
+
+        assert isinstance(ref, PageRef)
+        assert store.get("https://a.com/") == b"<p>a</p>"
+        assert store.get("https://missing.com/") is None
+        assert "https://a.com/" in store
+        assert "https://missing.com/" not in store
+
+    def test_get_by_hash(self, store):
+        store.put("https://a.com/", b"<p>a</p>")
+        digest = hashlib.sha256(b"<p>a</p>").hexdigest()
+
+        assert store.get_by_hash(digest) == b"<p>a</p>"
+        assert store.get_by_hash("0" * 64) is None
+
+    def test_deduplicates_bodies(self, store):
+        first = store.put("https://a.com/", b"same body")
+        second = store.put("https://mirror.com/", b"same body")
+
+        assert first == second
+        assert store.get("https://mirror.com/") == b"same body"
+        assert list(store.iter_pages()) == [("https://a.com/", b"same body")]
+
+    def test_latest_body_wins(self, store):
+        store.put("https://a.com/", b"v1")
+        store.put("https://a.com/", b"v2")
+        assert store.get("https://a.com/") == b"v2"
+
+    def test_compresses(self, store):
+        body = b"<p>repetitive</p>" * 1000
+        ref = store.put("https://a.com/", body)
+        assert ref.length < len(body) / 10
+
+    def test_record_hook(self, store):
+        store.record(Mock(url="https://a.com/", content=b"<p>a</p>"))
+        assert store.get("https://a.com/") == b"<p>a</p>"
+
+    def test_cleaner_reads_bytes(self, store):
+        store.put("https://a.com/", "<h1>Café</h1>".encode("utf-8"))
+        assert Cleaner().to_markdown(store.get("https://a.com/")).strip() == "# Café"
+
+    def test_rotates_segments(self, tmp_path):
+        with PageStore(tmp_path, compression="zlib", segment_size=100) as store:
+            refs = [store.put(f"https://a.com/{i}", bytes([i]) * 200) for i in range(3)]
+
+            assert store.segments() == [0, 1, 2]
+            assert [r.segment for r in refs] == [0, 1, 2]
+            assert all(r.offset == 0 for r in refs)
+            assert store.get("https://a.com/1") == bytes([1]) * 200
+
+    def test_reads_while_segment_grows(self, store):
+        store.put("https://a.com/", b"first")
+        assert store.get("https://a.com/") == b"first"
+        store.put("https://b.com/", b"second")
+        assert store.get("https://b.com/") == b"second"
+
+    def test_iter_records_and_pages(self, store):
+        store.put("https://a.com/", b"a")
+        store.put("https://b.com/", b"b")
+
+        records = list(store.iter_records())
+
+        assert [url for _, url, _ in records] == ["https://a.com/", "https://b.com/"]
+        assert records[0][2] == hashlib.sha256(b"a").hexdigest()
+        assert list(store.iter_pages()) == [
+            ("https://a.com/", b"a"),
+            ("https://b.com/", b"b"),
+        ]
+
+    def test_reopen(self, tmp_path):
+        with PageStore(tmp_path) as store:
+            store.put("https://a.com/", b"a")
+        with PageStore(tmp_path) as store:
+            store.put("https://b.com/", b"b")
+            assert store.get("https://a.com/") == b"a"
+            assert store.segments() == [0]
+
+    def test_rebuilds_missing_index(self, tmp_path):
+        with PageStore(tmp_path) as store:
+            store.put("https://a.com/", b"a")
+        (tmp_path / "index.bin").unlink()
+
+        with PageStore(tmp_path) as store:
+            assert store.get("https://a.com/") == b"a"
+
+    def test_reads_mixed_codecs(self, tmp_path):
+        with PageStore(tmp_path, compression="zlib") as store:
+            store.put("https://a.com/", b"a")
+        with PageStore(tmp_path, compression="zstd") as store:
+            store.put("https://b.com/", b"b")
+            assert store.get("https://a.com/") == b"a"
+            assert store.get("https://b.com/") == b"b"
+
+    def test_corrupt_segment(self, tmp_path):
+        with PageStore(tmp_path) as store:
+            ref = store.put("https://a.com/", b"a")
+        (tmp_path / "segment-00000.dat").write_bytes(b"X" * ref.length)
+
+        with PageStore(tmp_path) as store:
+            with pytest.raises(ValueError, match="Corrupt"):
+                store.get("https://a.com/")
+            with pytest.raises(ValueError, match="Corrupt record in segment 0"):
+                list(store.iter_records())
+
+    def test_unknown_compression(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown compression"):
+            PageStore(tmp_path, compression="lz4")
+
+    def test_zstd_unavailable(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("websense.store.zstandard", None)
+        with pytest.raises(ValueError, match="zstandard"):
+            PageStore(tmp_path, compression="zstd")
+        with PageStore(tmp_path) as store:
+            store.put("https://a.com/", b"a")
+            assert store.get("https://a.com/") == b"a"
+
+
+class TestStoreFetcher:
+    def test_serves_stored_pages(self, store):
+        store.put("https://a.com/", "<p>caf\u00e9</p>".encode("utf-8"))
+        metrics = MetricsRegistry()
+        fetcher = StoreFetcher(store, metrics=metrics)
+
+        response = fetcher.fetch("https://a.com/")
+
+        assert response.status_code == 200
+        assert response.text == "<p>caf\u00e9</p>"
+        fetches = metrics.get("websense_fetch_requests_total")
+        assert fetches.value(domain="a.com", status=200) == 1
+
+    def test_missing_url(self, store):
+        fetcher = StoreFetcher(store)
+        with pytest.raises(RuntimeError, match="not in store"):
+            asyncio.run(fetcher.afetch("https://missing.com/"))
+
+
+class TestHashIndex:
+    def test_grows(self, tmp_path):
+        index = _HashIndex(tmp_path / "index.bin", capacity=4)
+        refs = {_key("u", str(i)): PageRef(0, i, 1) for i in range(20)}
+        for key, ref in refs.items():
+            index.put(key, ref)
+
+        assert index.capacity >= 32
+        assert index.used == 20
+        assert all(index.get(key) == ref for key, ref in refs.items())
+        assert index.get(_key("u", "missing")) is None
+        index.close()
+
+        reopened = _HashIndex(tmp_path / "index.bin")
+        assert reopened.get(_key("u", "7")) == PageRef(0, 7, 1)
+        reopened.close()
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "index.bin"
+        path.write_bytes(b"\0" * 64)
+        with pytest.raises(ValueError, match="Not a page store index"):
+            _HashIndex(path)
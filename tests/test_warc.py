@@ -0,0 +1,187 @@
+"""Unit tests for WARC recording and replay."""
+
+import asyncio
+import gzip
+import os
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from websense.metrics import MetricsRegistry
+from websense.warc import (
+    WarcReplayFetcher,
+    WarcWriter,
+    iter_pages,
+    iter_records,
+    parse_http_response,
+)
+
+
+def _response(url, body=b"<p>hi</p>", status=200, reason="OK", headers=None):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(
+        headers or {"Content-Type": "text/html; charset=utf-8"}
+    )
+    response._content = body
+    return response
+
+
+@pytest.fixture(params=["pages.warc", "pages.warc.gz"])
+def warc_path(request, tmp_path):
+    return tmp_path / request.param
+
+
+class TestWarcWriter:
+    def test_writes_records(self, warc_path):
+        with WarcWriter(warc_path) as writer:
+            writer.record(_response("https://a.com/"))
+            writer.record(_response("https://b.com/", body=b"<p>b</p>"))
+
+        records = list(iter_records(warc_path))
+
+        assert [h["WARC-Type"] for _, h, _ in records] == [
+            "warcinfo",
+            "response",
+            "response",
+        ]
+        _, headers, block = records[1]
+        assert headers["WARC-Target-URI"] == "https://a.com/"
+        assert headers["WARC-Payload-Digest"].startswith("sha1:")
+        assert block.startswith(b"HTTP/1.1 200 OK\r\n")
+        assert block.endswith(b"\r\n\r\n<p>hi</p>")
+
+    def test_drops_wire_encoding_headers(self, tmp_path):
+        path = tmp_path / "a.warc"
+        headers = {"Content-Encoding": "gzip", "Content-Length": "5", "X-Id": "1"}
+        with WarcWriter(path) as writer:
+            writer.record(_response("https://a.com/", headers=headers))
+
+        _, _, block = list(iter_records(path))[1]
+        head = block.split(b"\r\n\r\n")[0]
+        assert b"Content-Encoding" not in head
+        assert b"X-Id: 1" in head
+        assert b"Content-Length: 9" in head
+
+    def test_appends_to_existing_archive(self, tmp_path):
+        path = tmp_path / "a.warc"
+        with WarcWriter(path) as writer:
+            writer.record(_response("https://a.com/"))
+        with WarcWriter(path) as writer:
+            writer.record(_response("https://b.com/"))
+
+        kinds = [h["WARC-Type"] for _, h, _ in iter_records(path)]
+        assert kinds == ["warcinfo", "response", "response"]
+
+    def test_iter_pages_skips_redirects_and_errors(self, warc_path):
+        with WarcWriter(warc_path) as writer:
+            writer.record(_response("https://a.com/"))
+            writer.record(_response("https://b.com/", status=301, reason="Moved"))
+            writer.record(_response("https://c.com/", status=404, reason="Gone"))
+
+        assert list(iter_pages(warc_path)) == [("https://a.com/", b"<p>hi</p>")]
+
+    def test_not_a_warc(self, tmp_path):
+        path = tmp_path / "bad.warc"
+        path.write_bytes(b"HTTP/1.1 200 OK\r\n")
+        with pytest.raises(ValueError, match="Not a WARC record"):
+            list(iter_records(path))
+
+    def test_truncated_gzip(self, tmp_path):
+        path = tmp_path / "bad.warc.gz"
+        path.write_bytes(gzip.compress(b"WARC/1.1\r\n" * 100)[:20])
+        with pytest.raises(ValueError, match="Truncated"):
+            list(iter_records(path))
+
+
+class TestWarcReplayFetcher:
+    def test_replays_responses(self, warc_path):
+        with WarcWriter(warc_path) as writer:
+            writer.record(_response("https://a.com/"))
+            writer.record(_response("https://a.com/", body=b"<p>newer</p>"))
+            writer.record(_response("https://b.com/", body=b"<p>b</p>"))
+
+        fetcher = WarcReplayFetcher(warc_path)
+        response = fetcher.fetch("https://a.com/")
+
+        assert response.status_code == 200
+        assert response.content == b"<p>newer</p>"
+        assert response.text == "<p>newer</p>"
+        assert response.encoding == "utf-8"
+        assert response.headers["content-type"] == "text/html; charset=utf-8"
+        assert fetcher.fetch("https://b.com/").content == b"<p>b</p>"
+        assert "https://b.com/" in fetcher
+        assert "https://c.com/" not in fetcher
+
+    def test_afetch_replays_without_network(self, tmp_path):
+        path = tmp_path / "pages.warc"
+        with WarcWriter(path) as writer:
+            writer.record(_response("https://a.com/"))
+
+        response = asyncio.run(WarcReplayFetcher(path).afetch("https://a.com/"))
+
+        assert response.content == b"<p>hi</p>"
+
+    def test_rebuilds_missing_or_stale_index(self, warc_path):
+        with WarcWriter(warc_path) as writer:
+            writer.record(_response("https://a.com/"))
+        sidecar = warc_path.with_name(warc_path.name + ".idx")
+        sidecar.unlink()
+
+        assert list(WarcReplayFetcher(warc_path).index) == ["https://a.com/"]
+        assert sidecar.is_file()
+
+        sidecar.write_text("")
+        os.utime(sidecar, (0, 0))
+        assert list(WarcReplayFetcher(warc_path).index) == ["https://a.com/"]
+
+    def test_follows_archived_redirects(self, tmp_path):
+        path = tmp_path / "a.warc"
+        final = _response("https://a.com/new")
+        hop = _response(
+            "https://a.com/old",
+            body=b"",
+            status=301,
+            reason="Moved Permanently",
+            headers={"Location": "/new"},
+        )
+        final.history = [hop]
+        with WarcWriter(path) as writer:
+            writer.record(final)
+
+        response = WarcReplayFetcher(path).fetch("https://a.com/old")
+
+        assert response.url == "https://a.com/new"
+        assert response.content == b"<p>hi</p>"
+        assert [r.status_code for r in response.history] == [301]
+
+    def test_missing_url(self, tmp_path):
+        path = tmp_path / "a.warc"
+        WarcWriter(path).close()
+        metrics = MetricsRegistry()
+        fetcher = WarcReplayFetcher(path, metrics=metrics)
+
+        with pytest.raises(RuntimeError, match="not in archive"):
+            fetcher.fetch("https://a.com/")
+        requests_total = metrics.get("websense_fetch_requests_total")
+        assert requests_total.value(domain="a.com", status="error") == 1
+
+    def test_error_status(self, tmp_path):
+        path = tmp_path / "a.warc"
+        with WarcWriter(path) as writer:
+            writer.write_response("https://a.com/", 404, "Not Found", {}, b"")
+
+        with pytest.raises(RuntimeError, match="404 Not Found"):
+            WarcReplayFetcher(path).fetch("https://a.com/")
+
+
+class TestParseHttpResponse:
+    def test_without_reason(self):
+        response = parse_http_response(b"HTTP/1.1 204\r\nX-A:  b \r\nbad\r\n\r\n")
+        assert response.status_code == 204
+        assert response.reason == ""
+        assert dict(response.headers) == {"X-A": "b"}
+        assert response.content == b""